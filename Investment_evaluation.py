@@ -1,44 +1,197 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime, timedelta
+import os
 import warnings
-import matplotlib
+from contextlib import nullcontext
+
+from excel_cache import read_excel_cached
+from ingest import SHEET_PATTERN, load_workbooks, print_report
+from results_store import ResultsStore, STATUS_LABELS
+from nav_store import SUFFIX as NAV_STORE_SUFFIX, read_nav_file, records_to_frame
+from incremental import IncrementalMetrics
+from period_index import PeriodIndex
+from rolling_metrics import ROLLING_WINDOWS, calculate_rolling_metrics
+from downsample import DownsamplePyramid
+from drawdowns import DrawdownIndex
+from excel_writer import apply_metrics_formats, write_streaming_workbook, export_data_file
+from rendering import create_performance_chart, save_html_chart, close_figures
+from compact import EPOCH, CompactSeries, PeriodMetrics
+from bootstrap import bootstrap_intervals
+from relative_metrics import RELATIVE_KEYS, benchmark_arrays, align_benchmark, benchmark_returns, window_relative_metrics
 
 warnings.filterwarnings('ignore')
-matplotlib.rcParams['font.family'] = 'simHei'
-matplotlib.rcParams['font.sans-serif'] = 'simHei'
-plt.rcParams['axes.unicode_minus'] = False
+
+# 统计时间段 (按时间从短到长排序)
+PERIODS = {
+    '近三个月': timedelta(days=90),
+    '近半年': timedelta(days=180),
+    '近一年': timedelta(days=365),
+    '近三年': timedelta(days=1095),
+    '成立以来': timedelta(days=365*10)  # 足够长的时间
+}
 
 class InvestmentPerformanceAnalyzer:
-    def __init__(self, data_file, risk_free_rate=0.02, chart_title="投资组合净值曲线"):
+    def __init__(self, data_file, risk_free_rate=0.02, chart_title="投资组合净值曲线", use_cache=False,
+                 timer=None, compact=False, nav_dtype=np.float64, benchmark=None, sheet_pattern=None,
+                 results_store=None, portfolio_id=None, calendar=None):
         """
         初始化分析器
         
         参数:
-        data_file: Excel文件路径
+        data_file: Excel文件路径，或多个工作簿路径的列表 (按年份拆分的历史数据)，
+                   也可以是净值存储文件 (<组合ID>.nav，内存映射读取，无需解析Excel)
         risk_free_rate: 无风险年化收益率 (默认2%)
         chart_title: 图表标题
+        use_cache: 是否使用工作簿旁的二进制缓存 (默认不使用；缓存只保存日期与净值两列，其他列不会出现在 data 与导出中)
+        timer: 可选的 instrumentation.StageTimer，记录读取、计算、绘图与写出各阶段耗时
+        compact: 紧凑模式，计算指标后只保存日期 (int32 天数) 与净值，派生列在访问 data 时重新计算，
+                 各时间段指标以槽位对象保存 (适合缓存大量组合)
+        nav_dtype: 紧凑模式下净值的存储类型 (np.float32 可再减少一半)
+        benchmark: 可选的基准净值 (见 set_benchmark)，设置后各时间段指标增加相对基准的指标
+        sheet_pattern: 工作表名称的正则表达式；设置后 (或 data_file 为列表时) 读取所有匹配的工作表并合并，
+                       为空时只读取 '单元资产2025'
+        results_store: 可选的 results_store.ResultsStore，输入未变时直接读取已保存的结果，只追加新行时增量计算
+        portfolio_id: 结果库中的组合标识 (默认取数据文件名)
+        calendar: 可选的 trading_calendar.TradingCalendar，设置后各时间段按交易日序号切片，
+                  年化使用日历中完整年份的平均交易日数 (日历不足一整年时仍为251；统计日期须全部为日历中的交易日)
         """
         self.data_file = data_file
+        self.use_cache = use_cache
+        self.sheet_pattern = sheet_pattern
+        self.ingest_report = None
         self.risk_free_rate = risk_free_rate
         self.chart_title = chart_title
+        self.timer = timer
+        self.results_store = results_store
+        if portfolio_id is None and isinstance(data_file, str):
+            portfolio_id = os.path.splitext(os.path.basename(data_file))[0]
+        self.portfolio_id = portfolio_id
+        self.compact = compact
+        self.nav_dtype = nav_dtype
+        self.data_version = 0  # 数据或指标每次变化时递增，用于判断缓存是否过期
+        self.on_memory_change = None  # 派生缓存构建或清除后的回调 (注册表据此重新估算占用)
         self.data = None
         self.results = {}
         self.days_trade =251 # 年交易日数
+        self.calendar = calendar
+        if calendar is not None and calendar.days_per_year is not None:
+            self.days_trade = calendar.days_per_year
+        self.benchmark = None
+        if benchmark is not None:
+            self.set_benchmark(benchmark)
+        
+    @property
+    def data(self):
+        """
+        分析数据 (访问时合并通过 append 追加、尚未写入DataFrame的记录)；
+        紧凑模式下每次访问都由日期与净值重新生成，对返回的DataFrame的修改不会保留
+        """
+        if self._compact is not None:
+            if self._pending_rows:
+                pending = CompactSeries.from_frame(pd.DataFrame(self._pending_rows), self.nav_dtype)
+                self._pending_rows = []
+                self._compact = self._compact.extend(pending)
+            return self._compact.to_frame()
+        if self._pending_rows:
+            pending = pd.DataFrame(self._pending_rows)
+            self._pending_rows = []
+            self._data = pd.concat([self._data, pending], ignore_index=True)
+        return self._data
+    
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._compact = None
+        self._pending_rows = []
+        self._incremental = None
+        self._reset_derived_state()
+        
+    def __getstate__(self):
+        # 计时器的输出与内存回调可能持有锁或闭包，序列化 (送往工作进程) 时不携带
+        state = self.__dict__.copy()
+        state['timer'] = None
+        state['on_memory_change'] = None
+        return state
+    
+    def _compress(self):
+        """紧凑模式: 只保留日期与净值，指标字典转换为槽位对象"""
+        self._compact = CompactSeries.from_frame(self._data, self.nav_dtype)
+        self._data = None
+        self.results = {name: PeriodMetrics(metrics) for name, metrics in self.results.items()}
+    
+    def has_data(self):
+        """是否已加载数据 (不展开紧凑模式的数据)"""
+        return self._compact is not None or self._data is not None
+    
+    def statistic_dates(self):
+        """统计日期 (datetime64[D] 数组)，紧凑模式下由保存的天数得到，不展开数据"""
+        if self._compact is not None and not self._pending_rows:
+            return EPOCH + self._compact.days
+        return self.data['统计日期'].values.astype('datetime64[D]')
+    
+    def _metrics_ready(self):
+        """是否已计算计算列 (紧凑模式只在计算指标后才会出现)"""
+        return self._compact is not None or (self._data is not None and '回撤' in self._data)
+    
+    def memory_usage(self):
+        """分析数据与派生缓存 (区间索引、降采样金字塔、回撤事件索引、滚动指标) 占用的内存 (字节)"""
+        if self._compact is not None:
+            size = self._compact.nbytes
+        else:
+            data = self.data
+            size = 0 if data is None else int(data.memory_usage(deep=True).sum())
+        return size + self._derived_nbytes()
+    
+    def _derived_nbytes(self):
+        size = sum(int(frame.memory_usage(deep=True).sum()) for frame in self._rolling_cache.values())
+        for cache in (self._period_index, self._pyramid, self._drawdowns):
+            if cache is not None:
+                size += cache.nbytes
+        return size
+    
+    def _memory_changed(self):
+        """派生缓存构建或清除后通知注册表"""
+        if getattr(self, 'on_memory_change', None) is not None:
+            self.on_memory_change()
+    
+    def _stage(self, name):
+        """阶段计时上下文 (未设置 timer 时不计时)"""
+        return self.timer.stage(name) if self.timer is not None else nullcontext()
+        
+    def _reset_derived_state(self):
+        """数据变化后清除派生的缓存 (区间索引、滚动指标、降采样金字塔、回撤事件索引)"""
+        self.data_version += 1
+        self._period_index = None
+        self._rolling_cache = {}
+        self._pyramid = None
+        self._drawdowns = None
+        self._memory_changed()
         
     def load_data(self):
         """加载并预处理数据"""
         try:
-            # 读取Excel文件
-            self.data = pd.read_excel(self.data_file, sheet_name='单元资产2025')
+            # 读取Excel文件 (缓存有效时直接读取缓存)
+            with self._stage('excel_parse'):
+                if isinstance(self.data_file, str) and self.data_file.endswith(NAV_STORE_SUFFIX):
+                    self.data = records_to_frame(read_nav_file(self.data_file))
+                elif isinstance(self.data_file, (list, tuple)) or self.sheet_pattern:
+                    # 多工作表/多工作簿: 并行读取匹配的工作表，有序合并并按日期去重
+                    workbooks = list(self.data_file) if isinstance(self.data_file, (list, tuple)) else [self.data_file]
+                    self.data, self.ingest_report = load_workbooks(
+                        workbooks, self.sheet_pattern or SHEET_PATTERN, use_cache=self.use_cache)
+                    print_report(self.ingest_report)
+                elif self.use_cache:
+                    self.data = read_excel_cached(self.data_file, sheet_name='单元资产2025')
+                else:
+                    self.data = pd.read_excel(self.data_file, sheet_name='单元资产2025')
             
             # 确保日期列是datetime类型
             self.data['统计日期'] = pd.to_datetime(self.data['统计日期'])
             
-            # 按日期排序
-            self.data = self.data.sort_values('统计日期').reset_index(drop=True)
+            # 按日期排序 (多工作表合并的结果已有序)
+            if not self.data['统计日期'].is_monotonic_increasing:
+                self.data = self.data.sort_values('统计日期').reset_index(drop=True)
             
             print(f"数据加载成功，共{len(self.data)}条记录")
             print(f"数据时间范围: {self.data['统计日期'].min()} 到 {self.data['统计日期'].max()}")
@@ -54,25 +207,46 @@ class InvestmentPerformanceAnalyzer:
             print("请先加载数据")
             return
         
+        with self._stage('metrics'):
+            # 紧凑模式下先展开为完整的DataFrame再计算
+            if self._compact is not None:
+                self._data, self._compact = self.data, None
+            
+            # 有结果库时优先读取已保存的结果或只计算新增部分
+            if self.results_store is not None:
+                status = self.results_store.compute(self, self.portfolio_id or 'default')
+                print(f"结果库: {STATUS_LABELS[status]}")
+            else:
+                self._calculate_all()
+            
+            if self.compact:
+                self._compress()
+    
+    def _calculate_all(self):
+        """全量计算计算列与各项指标"""
         # 计算归一化净值 (起始值为1)
         initial_nav = self.data['单元资产净值(净价)'].iloc[0]
         self.data['归一化净值'] = self.data['单元资产净值(净价)'] / initial_nav
-        
+    
         # 计算每日收益率
         self.data['日收益率'] = self.data['归一化净值'].pct_change()
-        
+    
         # 计算累计收益率
         self.data['累计收益率'] = self.data['归一化净值'] - 1
-        
+    
         # 计算滚动最大净值 (用于计算回撤)
         self.data['滚动最大净值'] = self.data['归一化净值'].expanding().max()
-        
+    
         # 计算最大回撤率
         self.data['回撤'] = (self.data['归一化净值'] - self.data['滚动最大净值']) / self.data['滚动最大净值']
-        
+    
+        # 全量重算后，增量状态与派生缓存需重新构建
+        self._incremental = None
+        self._reset_derived_state()
+    
         # 计算关键投资评估指标 夏普比率、卡玛比率，总收益率等
         self.calculate_key_metrics()
-        
+    
         # 计算不同时间段的指标
         self.calculate_period_metrics()
         
@@ -84,8 +258,8 @@ class InvestmentPerformanceAnalyzer:
         # 总收益率
         total_return = self.data['归一化净值'].iloc[-1] - 1
         
-        # 年化收益率
-        years = total_days / trading_days_per_year
+        # 年化收益率 (有交易日历时按首尾之间日历中的交易日数)
+        years = self._total_years(self.data)
         annual_return = (1 + total_return) ** (1 / years) - 1 if years > 0 else 0
         
         # 年化波动率
@@ -112,27 +286,56 @@ class InvestmentPerformanceAnalyzer:
             '数据天数': total_days
         }
     
+    def _total_years(self, data):
+        """全部数据的年数: 行数 / 年交易日数，有交易日历时按首尾之间日历中的交易日数"""
+        if self.calendar is None:
+            return len(data) / self.days_trade
+        ordinals = self.calendar.ordinal(data['统计日期'].iloc[[0, -1]])
+        return (ordinals[1] + 1 - ordinals[0]) / self.days_trade
+    
+    def _period_windows(self, data):
+        """
+        各时间段在数据中的起始行与年数 (区间指标、相对基准的指标与置信区间共用):
+        默认按日期筛选，年数为行数 / 年交易日数；有交易日历时起始行由日历中预先计算的交易日序号确定，
+        年数按区间内日历中的交易日数
+
+        返回:
+        时间段名称 -> (起始行, 年数)；统计日期不全在交易日历中时返回 None
+        """
+        dates = data['统计日期']
+        end_date = dates.max()
+        if self.calendar is None:
+            windows = {}
+            for period_name, delta in PERIODS.items():
+                first = int(np.count_nonzero(dates < end_date - delta))
+                windows[period_name] = (first, (len(data) - first) / self.days_trade)
+            return windows
+        
+        if not self.calendar.contains(dates):
+            return None
+        ordinals = self.calendar.ordinal(dates)
+        windows = {}
+        for period_name, (start, end) in self.calendar.period_bounds(end_date, PERIODS).items():
+            first = int(np.searchsorted(ordinals, start))
+            windows[period_name] = (first, (end - ordinals[first]) / self.days_trade)
+        return windows
+    
     def calculate_period_metrics(self):
         """计算不同时间段的业绩指标"""
         if len(self.data) == 0:
             print("请先加载数据")
             return
             
-        end_date = self.data['统计日期'].max()
         trading_days_per_year = self.days_trade # 年交易日数
         
-        # 定义时间段
-        periods = {
-            '近三个月': timedelta(days=90),
-            '近半年': timedelta(days=180),
-            '近一年': timedelta(days=365),
-            '近三年': timedelta(days=1095),
-            '成立以来': timedelta(days=365*10)  # 足够长的时间
-        }
+        # 有交易日历时: 各时间段边界为日历中预先计算的交易日序号，按序号切片
+        windows = self._period_windows(self.data)
+        if windows is None:
+            print("统计日期不全在交易日历中，无法按交易日历计算")
+            return
         
-        for period_name, delta in periods.items():
-            start_date = end_date - delta
-            period_data = self.data[self.data['统计日期'] >= start_date]
+        for period_name, (first, period_years) in windows.items():
+            period_data = self.data.iloc[first:]
             
             if len(period_data) < 2:  # 至少需要2个数据点
                 continue
@@ -142,8 +345,6 @@ class InvestmentPerformanceAnalyzer:
             period_return = period_data['归一化净值'].iloc[-1] / period_data['归一化净值'].iloc[0] - 1
             # 区间有数
             period_days = len(period_data)
-            # 区间天数转换为年数
-            period_years = period_days / trading_days_per_year
             # 年收益率
             annual_return = (1 + period_return) ** (1 / period_years) - 1 if period_years > 0 else 0
             # 波动率
@@ -166,285 +367,329 @@ class InvestmentPerformanceAnalyzer:
                 '数据天数': period_days,
                 '开始日期': period_data['统计日期'].min()
             }
+        
+        if self.benchmark is not None:
+            self.calculate_relative_metrics()
     
-    def create_performance_chart(self):
-        """创建业绩图表"""
-        if self.data is None:
-            print("请先加载数据并计算指标")
+    def set_benchmark(self, benchmark):
+        """
+        设置基准净值，已计算指标时立即补充各时间段相对基准的指标
+        
+        参数:
+        benchmark: 以日期为索引的 Series，或包含 '统计日期' 与 '基准净值' 列的DataFrame；
+                   基准按日期有序合并，每个统计日期取不晚于该日的最近一个基准净值
+        """
+        self.benchmark = benchmark_arrays(benchmark)
+        if any(period in self.results for period in PERIODS):
+            self.calculate_relative_metrics()
+    
+    def calculate_relative_metrics(self):
+        """
+        计算各时间段相对基准的指标 (基准收益率、超额收益率、贝塔、阿尔法、跟踪误差、信息比率、上行/下行捕获率)；
+        append 追加数据后自动调用
+        """
+        if self.benchmark is None:
+            print("请先设置基准")
             return
+        data = self.data
+        dates = data['统计日期'].values.astype('datetime64[ns]').astype(np.int64)
+        aligned = align_benchmark(dates, *self.benchmark)
+        # 按 (日期 × 1个单元) 的矩阵形式复用批量计算
+        mask = np.ones((len(dates), 1), dtype=bool)
+        returns = data['日收益率'].to_numpy(dtype=np.float64)[:, None]
+        bench_returns = benchmark_returns(aligned, mask)
+        last = np.array([len(dates) - 1])
+        # 窗口与年数与区间指标一致 (有交易日历时按日历)
+        windows = self._period_windows(data)
+        if windows is None:
+            print("统计日期不全在交易日历中，无法按交易日历计算")
+            return
+        rows = np.arange(len(dates))
         
-        # 创建图表，调整布局为三个部分：净值图、回撤图、指标表格
-        fig = plt.figure(figsize=(15, 14))
-        gs = plt.GridSpec(3, 1, height_ratios=[3, 1, 1.5])
-        
-        ax1 = plt.subplot(gs[0])  # 净值图
-        ax2 = plt.subplot(gs[1])  # 回撤图
-        ax_table = plt.subplot(gs[2])  # 指标表格
-        
-        # 净值曲线
-        ax1.plot(self.data['统计日期'], self.data['归一化净值'], 
-                linewidth=2, color='#1f77b4', label='净值曲线')
-        
-        # 标记最后一个点的数值
-        last_date = self.data['统计日期'].iloc[-1]
-        last_value = self.data['归一化净值'].iloc[-1]
-        ax1.plot(last_date, last_value, 'ro', markersize=8)
-        ax1.annotate(f'{last_value:.3f}', 
-                    xy=(last_date, last_value),
-                    xytext=(10, 10), textcoords='offset points',
-                    fontsize=12, fontweight='bold',
-                    bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7),
-                    arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0'))
-        
-        ax1_chart_title = self.chart_title + ' 截止日期：' + self.data['统计日期'].max().strftime('%Y-%m-%d')
-        ax1.set_title(ax1_chart_title, fontsize=16, fontweight='bold')
-        ax1.set_ylabel('净值', fontsize=12)
-        ax1.grid(True, alpha=0.3)
-        ax1.legend()
-        
-        # 设置x轴格式
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-        ax1.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
-        
-        # 回撤图
-        ax2.fill_between(self.data['统计日期'], self.data['回撤']*100, 0, 
-                        alpha=0.3, color='red', label='回撤')
-        ax2.plot(self.data['统计日期'], self.data['回撤']*100, 
-                linewidth=1, color='red', alpha=0.8)
-        ax2.set_ylabel('回撤 (%)', fontsize=12)
-        ax2.set_xlabel('日期', fontsize=12)
-        ax2.grid(True, alpha=0.3)
-        ax2.legend()
-        
-        # 在图表下方添加指标表格
-        self._add_metrics_table(ax_table)
-        
-        plt.tight_layout()
-        return fig
-    
-    def _add_metrics_table(self, ax_table):
-        """在图表下方添加指标表格"""
-        # 确定可用的时间段 - 按时间从短到长排序
-        all_periods = ['近三个月', '近半年', '近一年', '近三年', '成立以来']
-        available_periods = []
+        for period_name, (first, period_years) in windows.items():
+            if period_name not in self.results:
+                continue
+            metrics = self.results[period_name]
+            window = (rows >= first)[:, None]
+            relative = window_relative_metrics(window, returns, bench_returns, aligned, np.array([first]), last,
+                                               metrics['总收益率'], metrics['年化收益率'],
+                                               self.risk_free_rate, self.days_trade, np.array([period_years]))
+            merged = dict(metrics)
+            merged.update({key: np.float64(values[0]) for key, values in relative.items()})
+            self.results[period_name] = PeriodMetrics(merged) if isinstance(metrics, PeriodMetrics) else merged
+    
+    def append(self, date, nav):
+        """
+        追加一条每日净值并以 O(1) 更新 results 中的总体指标与各时间段指标；
+        设置了基准时再重新计算相对基准的指标 (与全量计算的结果字段一致)
         
-        for period in all_periods:
-            if period in self.results:
-                available_periods.append(period)
+        参数:
+        date: 统计日期 (须晚于已有数据的最后日期)
+        nav: 单元资产净值(净价)
         
-        if not available_periods:
-            ax_table.axis('off')
-            ax_table.text(0.5, 0.5, '无足够数据计算指标', 
-                         ha='center', va='center', transform=ax_table.transAxes)
-            return
+        设置交易日历时，增量更新的年数按数据行数计算 (数据与日历的交易日一致时结果相同)
+        """
+        if self._incremental is None:
+            if self._compact is None and (self._data is None or '回撤' not in self._data):
+                print("请先加载数据并计算指标")
+                return False
+            self._incremental = IncrementalMetrics(self.data, PERIODS, self.risk_free_rate, self.days_trade)
         
-        # 准备表格数据
-        table_data = []
-        columns = ['时间段', '总收益率', '年化收益率', '年化波动率', 
-                  '夏普比率', '最大回撤', '卡玛比率']
-        
-        for period in available_periods:
-            metrics = self.results[period]
-            row = [
-                period,
-                f"{metrics['总收益率']:.2%}",
-                f"{metrics['年化收益率']:.2%}",
-                f"{metrics['年化波动率']:.2%}",
-                f"{metrics['夏普比率']:.2f}",
-                f"{metrics['最大回撤']:.2%}",
-                f"{metrics['卡玛比率']:.2f}"
-            ]
-            table_data.append(row)
+        try:
+            row = self._incremental.append(date, nav)
+        except ValueError as e:
+            print(f"追加数据失败: {e}")
+            return False
         
-        # 创建表格
-        ax_table.axis('off')
-        table = ax_table.table(cellText=table_data,
-                              colLabels=columns,
-                              cellLoc='center',
-                              loc='center',
-                              bbox=[0, 0, 1, 1])
+        self._pending_rows.append(row)
+        self._incremental.update_results(self.results)
+        if self._compact is not None:
+            self.results = {name: PeriodMetrics(metrics) for name, metrics in self.results.items()}
+        # update_results 覆盖了各时间段的指标字典，相对基准的指标需按追加后的数据重新计算
+        if self.benchmark is not None:
+            self.calculate_relative_metrics()
+        self._reset_derived_state()
+        return True
+    
+    def metrics_between(self, start=None, end=None):
+        """
+        计算任意日期区间的业绩指标 (基于预计算的前缀和/稀疏表索引，无需全量重算)
         
-        table.auto_set_font_size(False)
-        table.set_fontsize(10)
-        table.scale(1, 1.8)
+        参数:
+        start: 开始日期 (为空表示从第一条数据开始)
+        end: 结束日期 (为空表示到最后一条数据)
+        """
+        if not self._metrics_ready():
+            print("请先加载数据并计算指标")
+            return None
+        if self._period_index is None:
+            self._period_index = PeriodIndex(self.data, self.risk_free_rate, self.days_trade)
+            self._memory_changed()
+        return self._period_index.metrics_between(start, end)
+    
+    def rolling_metrics(self, window):
+        """
+        获取滚动窗口指标 (滚动年化波动率、滚动夏普比率、滚动最大回撤)，结果按窗口缓存
         
-        # 设置表头样式
-        for i in range(len(columns)):
-            table[(0, i)].set_facecolor('#4C72B0')
-            table[(0, i)].set_text_props(weight='bold', color='white')
+        参数:
+        window: 窗口长度 (交易日)
+        """
+        if not self._metrics_ready():
+            print("请先加载数据并计算指标")
+            return None
+        if window not in self._rolling_cache:
+            self._rolling_cache[window] = calculate_rolling_metrics(
+                self.data, window, self.risk_free_rate, self.days_trade)
+            self._memory_changed()
+        return self._rolling_cache[window]
+    
+    def bootstrap_intervals(self, n_resamples=2000, block_size=None, confidence=0.95, seed=0, max_workers=1):
+        """
+        块自助法估计总体指标与各时间段指标 (收益率、波动率、夏普比率、最大回撤、卡玛比率) 的置信区间；
+        重抽样路径的最大回撤从区间首日起算，不含区间之前的高点
+        
+        参数:
+        n_resamples: 重抽样次数
+        block_size: 块长度 (为空时取区间长度的立方根)
+        confidence: 置信水平
+        seed: 随机种子 (相同种子结果相同，与工作进程数无关)
+        max_workers: 工作进程数
+        
+        返回:
+        时间段 -> {指标名: (下限, 上限)}
+        """
+        if not self._metrics_ready() or not self.results:
+            print("请先加载数据并计算指标")
+            return None
+        data = self.data
+        windows = self._period_windows(data)
+        if windows is None:
+            print("统计日期不全在交易日历中，无法按交易日历计算")
+            return None
+        returns = data['日收益率'].to_numpy()
+        # 区间内的日收益率，不含区间首日 (与区间收益率的计算口径一致)；年数与区间指标一致
+        period_returns = {'总体指标': returns[1:]}
+        period_years = {'总体指标': self._total_years(data)}
+        for period_name, (first, years) in windows.items():
+            if period_name in self.results:
+                period_returns[period_name] = returns[first + 1:]
+                period_years[period_name] = years
+        return bootstrap_intervals(period_returns, self.risk_free_rate, self.days_trade, n_resamples, block_size,
+                                   confidence, seed, max_workers=max_workers, period_years=period_years)
+    
+    def downsample(self, start=None, end=None, max_points=None):
+        """
+        返回日期范围内降采样后的分析数据 (保留首尾点与回撤谷底)，金字塔按需构建并缓存
+        
+        参数:
+        start: 开始日期 (为空表示不限)
+        end: 结束日期 (为空表示不限)
+        max_points: 最多返回的点数 (为空表示不降采样)
+        """
+        if not self._metrics_ready():
+            print("请先加载数据并计算指标")
+            return None
+        if self._pyramid is None:
+            self._pyramid = DownsamplePyramid(self.data)
+            self._memory_changed()
+        rows = self._pyramid.select(start, end, max_points)
+        if self._compact is not None:
+            # 紧凑模式不展开整个DataFrame，只由金字塔保存的数组生成选中的行
+            return self._pyramid.frame(rows, self._compact.nav[rows])
+        return self.data.iloc[rows]
+    
+    def drawdown_episodes(self, k=None, start=None, end=None):
+        """
+        返回回撤事件 (峰值、谷底、恢复日期，回撤幅度，下跌/恢复/持续天数)，事件索引按需构建并缓存
+        
+        参数:
+        k: 只返回回撤幅度最大的 k 个事件，从深到浅排列 (为空表示全部，按峰值日期排列)
+        start: 开始日期，只返回与日期范围有重叠的事件 (为空表示不限)
+        end: 结束日期 (为空表示不限)
+        """
+        if not self._metrics_ready():
+            print("请先加载数据并计算指标")
+            return None
+        if self._drawdowns is None:
+            self._drawdowns = DrawdownIndex(self.data)
+            self._memory_changed()
+        index = self._drawdowns
+        if start is None and end is None:
+            episodes = index.top(k) if k is not None else index.episodes
+        else:
+            episodes = index.between(start, end)
+            if k is not None:
+                episodes = episodes[np.argsort(episodes['depth'], kind='stable')[:k]]
+        return index.to_records(episodes)
+    
+    def calculate_rolling_metrics(self, windows=ROLLING_WINDOWS):
+        """将各窗口的滚动指标作为新列加入分析数据 (位于归一化净值、回撤等列之后)"""
+        if self._compact is not None:
+            print("紧凑模式不保存额外的列，请通过 rolling_metrics 获取滚动指标")
+            return
+        for window in windows:
+            rolling = self.rolling_metrics(window)
+            if rolling is None:
+                return
+            for column in rolling.columns:
+                self.data[column] = rolling[column]
+    
+    def create_performance_chart(self, template=None):
+        """
+        创建业绩图表 (matplotlib 在首次绘图时才导入)
+        
+        参数:
+        template: 可复用的 ChartTemplate (为空时新建图表)
+        """
+        if not self.has_data():
+            print("请先加载数据并计算指标")
+            return
+        return create_performance_chart(self, template)
+    
+    def _metrics_summary(self):
+        """各时间段指标汇总行 (保留原始数值，由Excel单元格格式显示百分比)"""
+        metrics_summary = []
+        all_periods = ['近三个月', '近半年', '近一年', '近三年', '成立以来']
+        for period in all_periods:
+            if period in self.results:
+                metrics = self.results[period]
+                row = {'时间段': period}
+                for key in ['总收益率', '年化收益率', '年化波动率', '夏普比率', '最大回撤', '卡玛比率']:
+                    row[key] = float(metrics[key])
+                row['数据天数'] = int(metrics['数据天数'])
+                if '开始日期' in metrics:
+                    row['开始日期'] = pd.Timestamp(metrics['开始日期'])
+                for key in RELATIVE_KEYS:
+                    if key in metrics:
+                        row[key] = float(metrics[key])
+                metrics_summary.append(row)
+        return metrics_summary
     
     def save_results(self, output_excel="投资业绩分析结果.xlsx", 
-                    chart_png="净值曲线.png", chart_html="净值曲线.html"):
-        """保存分析结果"""
-        if self.data is None:
+                    chart_png="净值曲线.png", chart_html="净值曲线.html", chart_template=None,
+                    excel_mode='standard', data_format='xlsx'):
+        """
+        保存分析结果
+        
+        参数:
+        output_excel: Excel结果文件路径
+        chart_png: 图表PNG文件路径
+        chart_html: 交互式HTML图表路径
+        chart_template: 可复用的 ChartTemplate (批量生成报告时传入)
+        excel_mode: 'standard' 使用 pandas/openpyxl 写出；'streaming' 使用只写模式按块流式写出，内存占用恒定
+        data_format: 分析数据的格式，'xlsx' 写入工作簿，'csv'/'parquet' 另存为单独文件
+        """
+        if not self.has_data():
             print("请先加载数据并计算指标")
             return
         
         # 保存图表
-        fig = self.create_performance_chart()
-        fig.savefig(chart_png, dpi=300, bbox_inches='tight')
+        with self._stage('matplotlib'):
+            fig = self.create_performance_chart(template=chart_template)
+            fig.savefig(chart_png, dpi=300, bbox_inches='tight')
         print(f"图表已保存为: {chart_png}")
         
         # 保存为HTML (使用plotly)
-        try:
-            import plotly.graph_objects as go
-            from plotly.subplots import make_subplots
-            import plotly.offline as pyo
-            
-            # 确定可用的时间段
-            all_periods = ['近三个月', '近半年', '近一年', '近三年', '成立以来']
-            available_periods = [p for p in all_periods if p in self.results]
-            
-            # 创建Plotly图表 - 使用3个子图
-            fig_plotly = make_subplots(
-                rows=3, cols=1,
-                subplot_titles=(self.chart_title, "回撤", "业绩指标"),
-                vertical_spacing=0.08,
-                row_heights=[0.5, 0.2, 0.3],
-                specs=[
-                    [{"type": "scatter"}],
-                    [{"type": "scatter"}],
-                    [{"type": "table"}]
-                ]
-            )
-            
-            # 净值曲线
-            fig_plotly.add_trace(
-                go.Scatter(
-                    x=self.data['统计日期'], 
-                    y=self.data['归一化净值'],
-                    name='净值曲线', 
-                    line=dict(color='#1f77b4', width=2),
-                    hovertemplate='日期: %{x}<br>净值: %{y:.3f}<extra></extra>'
-                ),
-                row=1, col=1
-            )
-            
-            # 标记最后一个点
-            last_date = self.data['统计日期'].iloc[-1]
-            last_value = self.data['归一化净值'].iloc[-1]
-            fig_plotly.add_trace(
-                go.Scatter(
-                    x=[last_date], 
-                    y=[last_value],
-                    mode='markers+text',
-                    marker=dict(size=12, color='red'),
-                    text=[f'最新净值: {last_value:.3f}'],
-                    textposition="top center",
-                    showlegend=False,
-                    hovertemplate=f'最新净值: {last_value:.3f}<extra></extra>'
-                ),
-                row=1, col=1
-            )
-            
-            # 回撤图
-            fig_plotly.add_trace(
-                go.Scatter(
-                    x=self.data['统计日期'], 
-                    y=self.data['回撤']*100,
-                    name='回撤', 
-                    fill='tozeroy', 
-                    line=dict(color='red', width=1),
-                    hovertemplate='日期: %{x}<br>回撤: %{y:.2f}%<extra></extra>'
-                ),
-                row=2, col=1
-            )
-            
-            # 添加指标表格
-            if available_periods:
-                # 准备表格数据
-                header_values = ['时间段', '总收益率', '年化收益率', '年化波动率', '夏普比率', '最大回撤', '卡玛比率']
-                cell_values = [[] for _ in range(len(header_values))]
-                
-                for period in available_periods:
-                    metrics = self.results[period]
-                    cell_values[0].append(period)
-                    cell_values[1].append(f"{metrics['总收益率']:.2%}")
-                    cell_values[2].append(f"{metrics['年化收益率']:.2%}")
-                    cell_values[3].append(f"{metrics['年化波动率']:.2%}")
-                    cell_values[4].append(f"{metrics['夏普比率']:.2f}")
-                    cell_values[5].append(f"{metrics['最大回撤']:.2%}")
-                    cell_values[6].append(f"{metrics['卡玛比率']:.2f}")
-                
-                # 添加表格
-                fig_plotly.add_trace(
-                    go.Table(
-                        header=dict(
-                            values=header_values,
-                            fill_color='#4C72B0',
-                            align='center',
-                            font=dict(color='white', size=12)
-                        ),
-                        cells=dict(
-                            values=cell_values,
-                            fill_color='white',
-                            align='center',
-                            font=dict(size=11)
-                        )
-                    ),
-                    row=3, col=1
-                )
-            
-            # 更新布局
-            fig_plotly.update_layout(
-                height=1000,
-                showlegend=True,
-                title_text=f"{self.chart_title} (无风险利率: {self.risk_free_rate:.2%})",
-                title_x=0.5
-            )
-            
-            # 更新子图标题位置
-            fig_plotly.update_annotations(font_size=14)
-            
-            # 保存HTML文件
-            pyo.plot(fig_plotly, filename=chart_html, auto_open=False)
-            print(f"HTML图表已保存为: {chart_html}")
-            
-        except ImportError:
-            print("Plotly未安装，无法生成HTML图表")
+        with self._stage('plotly_html'):
+            self._save_html_chart(chart_html)
         
         # 保存Excel结果
-        with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
-            # 保存原始数据（含计算列）
-            self.data.to_excel(writer, sheet_name='分析数据', index=False)
-            
-            # 保存指标汇总
-            metrics_summary = []
-            all_periods = ['近三个月', '近半年', '近一年', '近三年', '成立以来']
-            for period in all_periods:
-                if period in self.results:
-                    metrics = self.results[period]
-                    row = {
-                        '时间段': period,
-                        '总收益率': f"{metrics['总收益率']:.4%}",
-                        '年化收益率': f"{metrics['年化收益率']:.4%}",
-                        '年化波动率': f"{metrics['年化波动率']:.4%}",
-                        '夏普比率': f"{metrics['夏普比率']:.4f}",
-                        '最大回撤': f"{metrics['最大回撤']:.4%}",
-                        '卡玛比率': f"{metrics['卡玛比率']:.4f}",
-                        '数据天数': metrics['数据天数']
-                    }
-                    if '开始日期' in metrics:
-                        row['开始日期'] = metrics['开始日期'].strftime('%Y-%m-%d')
-                    metrics_summary.append(row)
-            
-            pd.DataFrame(metrics_summary).to_excel(writer, sheet_name='业绩指标', index=False)
-            
-            # 保存详细计算
-            calculation_details = {
-                '参数': ['无风险利率', '年交易日数', '数据起始日期', '数据结束日期', '总数据点数'],
-                '数值': [
-                    f"{self.risk_free_rate:.2%}",
-                    self.days_trade,
-                    self.data['统计日期'].min().strftime('%Y-%m-%d'),
-                    self.data['统计日期'].max().strftime('%Y-%m-%d'),
-                    len(self.data)
-                ]
-            }
-            pd.DataFrame(calculation_details).to_excel(writer, sheet_name='计算参数', index=False)
+        with self._stage('excel_write'):
+            self._save_excel(output_excel, excel_mode, data_format)
+        close_figures()
+    
+    def _save_html_chart(self, chart_html):
+        """保存交互式HTML图表 (plotly 在此时才导入)"""
+        save_html_chart(self, chart_html)
+    
+    def _save_excel(self, output_excel, excel_mode, data_format):
+        """保存Excel结果 (业绩指标、计算参数，以及分析数据或单独的数据文件)"""
+        metrics_summary = self._metrics_summary()
+        drawdown_rows = self.drawdown_episodes()
+        data = self.data
+        calculation_details = {
+            '参数': ['无风险利率', '年交易日数', '数据起始日期', '数据结束日期', '总数据点数'],
+            '数值': [
+                f"{self.risk_free_rate:.2%}",
+                self.days_trade,
+                data['统计日期'].min().strftime('%Y-%m-%d'),
+                data['统计日期'].max().strftime('%Y-%m-%d'),
+                len(data)
+            ]
+        }
+        
+        # 大数据量时分析数据可导出为 CSV/Parquet，工作簿中不再包含 '分析数据' 表
+        excel_data = data
+        if data_format != 'xlsx':
+            data_file = os.path.splitext(output_excel)[0] + '_分析数据.' + data_format
+            data_file = export_data_file(data, data_file, data_format)
+            print(f"分析数据已保存为: {data_file}")
+            excel_data = None
+        
+        if excel_mode == 'streaming':
+            write_streaming_workbook(output_excel, excel_data, metrics_summary, calculation_details,
+                                     drawdown_rows=drawdown_rows)
+        else:
+            with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
+                # 保存原始数据（含计算列）
+                if excel_data is not None:
+                    excel_data.to_excel(writer, sheet_name='分析数据', index=False)
+                
+                # 保存指标汇总 (数值单元格 + 百分比格式)
+                metrics_frame = pd.DataFrame(metrics_summary)
+                metrics_frame.to_excel(writer, sheet_name='业绩指标', index=False)
+                apply_metrics_formats(writer.sheets['业绩指标'], metrics_frame.columns)
+                
+                # 保存回撤事件 (按峰值日期排列)
+                if drawdown_rows:
+                    drawdown_frame = pd.DataFrame(drawdown_rows)
+                    drawdown_frame.to_excel(writer, sheet_name='回撤事件', index=False)
+                    apply_metrics_formats(writer.sheets['回撤事件'], drawdown_frame.columns)
+                
+                # 保存详细计算
+                pd.DataFrame(calculation_details).to_excel(writer, sheet_name='计算参数', index=False)
         
         print(f"分析结果已保存为: {output_excel}")
-        plt.close('all')
 
 # 使用示例
 def main():
@@ -452,7 +697,9 @@ def main():
     analyzer = InvestmentPerformanceAnalyzer(
         data_file="林相宜单元资产.xlsx",
         risk_free_rate=0.015,  # 无风险利率，可以修改
-        chart_title="林相宜-投资业绩分析"  # 图表标题，可以修改
+        chart_title="林相宜-投资业绩分析",  # 图表标题，可以修改
+        # 设置 RESULTS_DB 后，数据未变时直接读取上次的结果，只追加了新数据时增量计算
+        results_store=ResultsStore(os.environ['RESULTS_DB']) if os.environ.get('RESULTS_DB') else None
     )
     
     # 加载数据
@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+
+
+def estimate_size(analyzer):
+    """估算分析器占用的内存 (字节): 分析数据与已构建的派生缓存"""
+    if hasattr(analyzer, 'memory_usage'):
+        return analyzer.memory_usage()
+    data = getattr(analyzer, 'data', None)
+    if data is None:
+        return 0
+    return int(data.memory_usage(deep=True).sum())
+
+
+class AnalyzerRegistry:
+    def __init__(self, builder, max_bytes=512 * 1024 * 1024, max_entries=None, on_evict=None):
+        """
+        组合分析器注册表: 按组合ID懒加载分析器，LRU 淘汰，控制内存预算
+
+        参数:
+        builder: 函数 builder(portfolio_id)，返回已计算指标的分析器，不存在时返回None
+        max_bytes: 内存预算 (字节)，超出后淘汰最久未使用的分析器
+        max_entries: 最多缓存的分析器个数 (为空表示不限)
+        on_evict: 淘汰回调 on_evict(portfolio_id, analyzer)
+        """
+        self.builder = builder
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._entries = OrderedDict()  # portfolio_id -> (analyzer, size)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, portfolio_id):
+        with self._lock:
+            entry = self._entries.get(portfolio_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(portfolio_id)
+            self.hits += 1
+            return entry[0]
+
+    def get(self, portfolio_id):
+        """获取组合的分析器；并发的首次请求只会触发一次构建"""
+        analyzer = self._lookup(portfolio_id)
+        if analyzer is not None:
+            return analyzer
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(portfolio_id, threading.Lock())
+
+        with key_lock:
+            # 等待期间可能已由其他线程构建完成
+            analyzer = self._lookup(portfolio_id)
+            if analyzer is not None:
+                return analyzer
+
+            with self._lock:
+                self.misses += 1
+            analyzer = self.builder(portfolio_id)
+            if analyzer is None:
+                with self._lock:
+                    self._key_locks.pop(portfolio_id, None)
+                return None
+            self._insert(portfolio_id, analyzer)
+            return analyzer
+
+    def _insert(self, portfolio_id, analyzer):
+        size = estimate_size(analyzer)
+        with self._lock:
+            self._entries[portfolio_id] = (analyzer, size)
+            self._total_bytes += size
+            evicted = self._evict_locked(portfolio_id)
+        # 分析器之后构建派生缓存 (区间索引、降采样金字塔等) 时重新估算占用
+        if hasattr(analyzer, 'on_memory_change'):
+            analyzer.on_memory_change = lambda: self.resize(portfolio_id, analyzer)
+        self._notify_evicted(evicted)
+
+    def resize(self, portfolio_id, analyzer):
+        """重新估算已缓存分析器的占用，超出预算时淘汰其他分析器"""
+        size = estimate_size(analyzer)
+        with self._lock:
+            entry = self._entries.get(portfolio_id)
+            if entry is None or entry[0] is not analyzer:
+                return
+            self._entries[portfolio_id] = (analyzer, size)
+            self._total_bytes += size - entry[1]
+            evicted = self._evict_locked(portfolio_id)
+        self._notify_evicted(evicted)
+
+    def _evict_locked(self, keep):
+        """按最久未使用淘汰，直到满足预算 (调用方持有锁，至少保留 keep)"""
+        evicted = []
+        while len(self._entries) > 1 and (
+                self._total_bytes > self.max_bytes or
+                (self.max_entries is not None and len(self._entries) > self.max_entries)):
+            old_id = next(iter(self._entries))
+            if old_id == keep:
+                self._entries.move_to_end(keep)
+                old_id = next(iter(self._entries))
+            old_analyzer, old_size = self._entries.pop(old_id)
+            self._total_bytes -= old_size
+            self._key_locks.pop(old_id, None)
+            self.evictions += 1
+            evicted.append((old_id, old_analyzer))
+        return evicted
+
+    def _notify_evicted(self, evicted):
+        for old_id, old_analyzer in evicted:
+            if hasattr(old_analyzer, 'on_memory_change'):
+                old_analyzer.on_memory_change = None
+            if self.on_evict is not None:
+                self.on_evict(old_id, old_analyzer)
+
+    def discard(self, portfolio_id):
+        """移除组合的分析器 (如数据文件更新后)"""
+        with self._lock:
+            entry = self._entries.pop(portfolio_id, None)
+            if entry is None:
+                return
+            self._total_bytes -= entry[1]
+            self._key_locks.pop(portfolio_id, None)
+        self._notify_evicted([(portfolio_id, entry[0])])
+
+    def __contains__(self, portfolio_id):
+        with self._lock:
+            return portfolio_id in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def stats(self):
+        """缓存统计"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,13 @@
+import os
+
+# 由 build_artifact.py 在构建时预先计算并序列化的响应，冷启动只读取该文件，不再导入 pandas 或重算指标
+# (文件名以下划线开头，Vercel 不会将本模块部署为接口)
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_artifact')
+
+def load_payload(name):
+    """读取预计算的响应 (name 为 _artifact 中的文件名)，文件不存在时返回None"""
+    try:
+        with open(os.path.join(ARTIFACT_DIR, name), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
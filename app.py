@@ -1,11 +1,19 @@
-from flask import Flask, render_template, jsonify, send_file
+from flask import Flask, render_template, jsonify, send_file, request, g, Response
 import pandas as pd
 import json
 from datetime import datetime
 import os
 import sys
 import glob
+import time
+import numpy as np
 from Investment_evaluation import InvestmentPerformanceAnalyzer
+from response_cache import ResponseCache, make_cached_response
+from analyzer_registry import AnalyzerRegistry
+from export_jobs import ExportJobManager
+from instrumentation import StageTimer, HistogramSink, format_histogram, format_gauge
+from results_store import ResultsStore
+from correlation import returns_matrix, correlation_matrix, top_pairs, cluster_order
 
 # 设置控制台编码
 if sys.platform == 'win32':
@@ -18,6 +26,39 @@ app = Flask(__name__)
 # 全局变量存储分析器实例
 analyzer = None
 
+# 预序列化、压缩后的接口响应
+response_cache = ResponseCache()
+
+# 运行指标: 分析各阶段耗时、接口延迟与响应大小 (通过 /metrics 以 Prometheus 文本格式导出)
+stage_histogram = HistogramSink()
+stage_timer = StageTimer([stage_histogram])
+request_histogram = HistogramSink()
+response_size_histogram = HistogramSink(buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216))
+
+# 多组合数据目录 (每个组合一个 <组合ID>.xlsx)、分析器缓存的内存预算，以及是否以紧凑模式缓存
+PORTFOLIO_DATA_DIR = os.environ.get('PORTFOLIO_DATA_DIR', '.')
+ANALYZER_CACHE_MB = int(os.environ.get('ANALYZER_CACHE_MB', '512'))
+ANALYZER_COMPACT = os.environ.get('ANALYZER_COMPACT', '0') == '1'
+
+# 是否使用工作簿旁的二进制缓存 (只保存日期与净值两列，工作簿中的其他列不会出现在数据与导出中)
+EXCEL_CACHE = os.environ.get('EXCEL_CACHE', '0') == '1'
+
+# 本地净值存储目录 (nav_store.py 导入的 <组合ID>.nav)，设置后优先于Excel读取，各工作进程以内存映射打开
+NAV_STORE_DIR = os.environ.get('NAV_STORE_DIR')
+
+# SQLite 结果库 (设置 RESULTS_DB 后，重启时数据未变的组合直接读取已保存的结果)
+RESULTS_DB = os.environ.get('RESULTS_DB')
+results_store = ResultsStore(RESULTS_DB) if RESULTS_DB else None
+
+# 相关系数矩阵分块计算的工作进程数 (1 表示在请求线程内计算)
+CORRELATION_WORKERS = int(os.environ.get('CORRELATION_WORKERS', '1'))
+
+# 后台导出任务 (有界进程池，每个任务独立的输出目录)
+export_jobs = ExportJobManager(
+    output_root=os.environ.get('EXPORT_DIR', 'exports'),
+    max_workers=int(os.environ.get('EXPORT_WORKERS', '2'))
+)
+
 def find_excel_file():
     """查找Excel文件"""
     # 在当前目录查找Excel文件
@@ -50,10 +91,14 @@ def initialize_analyzer():
         analyzer = InvestmentPerformanceAnalyzer(
             data_file=excel_file,
             risk_free_rate=0.015,
-            chart_title="投资业绩分析"
+            chart_title="投资业绩分析",
+            use_cache=EXCEL_CACHE,
+            timer=stage_timer,
+            results_store=results_store
         )
         if analyzer.load_data():
             analyzer.calculate_performance_metrics()
+            warm_response_cache()
             return True
     except Exception as e:
         print(f"初始化失败: {e}")
@@ -62,65 +107,116 @@ def initialize_analyzer():
         return False
     return False
 
+def portfolio_file(portfolio_id):
+    """组合ID对应的数据文件路径，ID不合法或文件不存在时返回None"""
+    if not portfolio_id or os.path.basename(portfolio_id) != portfolio_id or portfolio_id.startswith('.'):
+        return None
+    if NAV_STORE_DIR:
+        path = os.path.join(NAV_STORE_DIR, portfolio_id + '.nav')
+        if os.path.isfile(path):
+            return path
+    path = os.path.join(PORTFOLIO_DATA_DIR, portfolio_id + '.xlsx')
+    return path if os.path.isfile(path) else None
+
+def list_portfolio_ids():
+    """数据目录 (及净值存储) 中的组合ID列表"""
+    paths = glob.glob(os.path.join(PORTFOLIO_DATA_DIR, '*.xlsx'))
+    if NAV_STORE_DIR:
+        paths += glob.glob(os.path.join(NAV_STORE_DIR, '*.nav'))
+    return sorted({os.path.splitext(os.path.basename(path))[0] for path in paths})
+
+def build_portfolio_analyzer(portfolio_id):
+    """加载组合数据并计算指标，供注册表懒加载调用"""
+    path = portfolio_file(portfolio_id)
+    if path is None:
+        return None
+    portfolio_analyzer = InvestmentPerformanceAnalyzer(
+        data_file=path,
+        risk_free_rate=0.015,
+        chart_title=f"{portfolio_id}-投资业绩分析",
+        use_cache=EXCEL_CACHE,
+        timer=stage_timer,
+        compact=ANALYZER_COMPACT,
+        results_store=results_store,
+        portfolio_id=portfolio_id
+    )
+    if not portfolio_analyzer.load_data():
+        return None
+    portfolio_analyzer.calculate_performance_metrics()
+    return portfolio_analyzer
+
+# 组合分析器注册表: 按需构建，超出内存预算时按 LRU 淘汰，并清除对应的响应缓存
+registry = AnalyzerRegistry(
+    build_portfolio_analyzer,
+    max_bytes=ANALYZER_CACHE_MB * 1024 * 1024,
+    on_evict=lambda portfolio_id, _: response_cache.discard(portfolio_id)
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """按路由模板记录请求延迟与响应大小 (组合ID等路径参数不展开，避免标签数量无限增长)"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_histogram.record(endpoint, time.perf_counter() - start,
+                                 {'method': request.method, 'status': str(response.status_code)})
+        if response.content_length is not None:
+            response_size_histogram.record(endpoint, response.content_length)
+    return response
+
 @app.route('/')
 def index():
     """主页"""
     return render_template('index.html')
 
-@app.route('/api/data')
-def get_data():
-    """获取净值数据"""
-    if analyzer is None or analyzer.data is None:
-        return jsonify({'error': '数据未加载'}), 500
-
-    # 转换数据为JSON格式
-    data = {
-        'dates': analyzer.data['统计日期'].dt.strftime('%Y-%m-%d').tolist(),
-        'nav': analyzer.data['归一化净值'].tolist(),
-        'drawdown': (analyzer.data['回撤'] * 100).tolist(),
-        'cumulative_return': (analyzer.data['累计收益率'] * 100).tolist()
+def format_metrics(period, metrics):
+    """将指标字典转换为前端展示格式"""
+    return {
+        'period': period,
+        'total_return': f"{metrics['总收益率']:.2%}",
+        'annual_return': f"{metrics['年化收益率']:.2%}",
+        'annual_volatility': f"{metrics['年化波动率']:.2%}",
+        'sharpe_ratio': f"{metrics['夏普比率']:.2f}",
+        'max_drawdown': f"{metrics['最大回撤']:.2%}",
+        'calmar_ratio': f"{metrics['卡玛比率']:.2f}",
+        'days': metrics['数据天数']
     }
-    return jsonify(data)
 
-@app.route('/api/metrics')
-def get_metrics():
-    """获取业绩指标"""
-    if analyzer is None or not analyzer.results:
-        return jsonify({'error': '指标未计算'}), 500
+def build_data_payload(analyzer, data=None):
+    """净值数据 (data 为降采样后的数据，为空时返回全部)"""
+    if data is None:
+        data = analyzer.data
+    return {
+        'dates': data['统计日期'].dt.strftime('%Y-%m-%d').tolist(),
+        'nav': data['归一化净值'].tolist(),
+        'drawdown': (data['回撤'] * 100).tolist(),
+        'cumulative_return': (data['累计收益率'] * 100).tolist()
+    }
 
-    # 准备指标数据
+def build_metrics_payload(analyzer):
+    """各时间段业绩指标"""
     metrics_data = []
     all_periods = ['近三个月', '近半年', '近一年', '近三年', '成立以来']
 
     for period in all_periods:
         if period in analyzer.results:
-            metrics = analyzer.results[period]
-            metrics_data.append({
-                'period': period,
-                'total_return': f"{metrics['总收益率']:.2%}",
-                'annual_return': f"{metrics['年化收益率']:.2%}",
-                'annual_volatility': f"{metrics['年化波动率']:.2%}",
-                'sharpe_ratio': f"{metrics['夏普比率']:.2f}",
-                'max_drawdown': f"{metrics['最大回撤']:.2%}",
-                'calmar_ratio': f"{metrics['卡玛比率']:.2f}",
-                'days': metrics['数据天数']
-            })
-
-    return jsonify(metrics_data)
-
-@app.route('/api/summary')
-def get_summary():
-    """获取概览信息"""
-    if analyzer is None or analyzer.data is None:
-        return jsonify({'error': '数据未加载'}), 500
+            metrics_data.append(format_metrics(period, analyzer.results[period]))
+    return metrics_data
 
+def build_summary_payload(analyzer):
+    """概览信息"""
     latest_metrics = analyzer.results.get('成立以来', {})
+    data = analyzer.data
 
-    summary = {
-        'latest_nav': f"{analyzer.data['归一化净值'].iloc[-1]:.4f}",
-        'latest_date': analyzer.data['统计日期'].iloc[-1].strftime('%Y-%m-%d'),
-        'start_date': analyzer.data['统计日期'].iloc[0].strftime('%Y-%m-%d'),
-        'total_days': len(analyzer.data),
+    return {
+        'latest_nav': f"{data['归一化净值'].iloc[-1]:.4f}",
+        'latest_date': data['统计日期'].iloc[-1].strftime('%Y-%m-%d'),
+        'start_date': data['统计日期'].iloc[0].strftime('%Y-%m-%d'),
+        'total_days': len(data),
         'total_return': f"{latest_metrics.get('总收益率', 0):.2%}",
         'annual_return': f"{latest_metrics.get('年化收益率', 0):.2%}",
         'sharpe_ratio': f"{latest_metrics.get('夏普比率', 0):.2f}",
@@ -128,24 +224,325 @@ def get_summary():
         'risk_free_rate': f"{analyzer.risk_free_rate:.2%}"
     }
 
-    return jsonify(summary)
+PAYLOAD_BUILDERS = {
+    'data': build_data_payload,
+    'metrics': build_metrics_payload,
+    'summary': build_summary_payload
+}
+
+def cached_payload(key, analyzer, name):
+    """获取缓存的序列化响应，分析器数据版本变化时重建 (key 为组合ID，默认分析器为None)"""
+    return response_cache.get((key, name), analyzer.data_version,
+                              lambda: app.json.dumps(PAYLOAD_BUILDERS[name](analyzer)).encode('utf-8'))
 
-@app.route('/api/export/excel')
+def warm_response_cache():
+    """指标计算完成后预先生成各接口的响应"""
+    for name in PAYLOAD_BUILDERS:
+        cached_payload(None, analyzer, name)
+
+def data_response(key, analyzer):
+    if analyzer is None or not analyzer.has_data():
+        return jsonify({'error': '数据未加载'}), 500
+
+    # 日期范围与点数限制: 使用降采样金字塔，保留回撤谷底与最新点
+    start = request.args.get('start')
+    end = request.args.get('end')
+    max_points = request.args.get('max_points', type=int)
+    if start or end or max_points is not None:
+        if max_points is not None and max_points < 3:
+            return jsonify({'error': 'max_points 不能小于3'}), 400
+        try:
+            data = analyzer.downsample(start or None, end or None, max_points)
+        except ValueError:
+            return jsonify({'error': '日期格式错误'}), 400
+        return jsonify(build_data_payload(analyzer, data))
+
+    return make_cached_response(cached_payload(key, analyzer, 'data'), request)
+
+def metrics_response(key, analyzer):
+    if analyzer is None or not analyzer.results:
+        return jsonify({'error': '指标未计算'}), 500
+
+    start = request.args.get('start')
+    end = request.args.get('end')
+    if start or end:
+        try:
+            metrics = analyzer.metrics_between(start or None, end or None)
+        except ValueError:
+            return jsonify({'error': '日期格式错误'}), 400
+        if metrics is None:
+            return jsonify({'error': '区间内数据不足'}), 400
+        period = f"{metrics['开始日期']:%Y-%m-%d} 至 {metrics['结束日期']:%Y-%m-%d}"
+        return jsonify([format_metrics(period, metrics)])
+
+    return make_cached_response(cached_payload(key, analyzer, 'metrics'), request)
+
+def summary_response(key, analyzer):
+    if analyzer is None or not analyzer.has_data():
+        return jsonify({'error': '数据未加载'}), 500
+
+    return make_cached_response(cached_payload(key, analyzer, 'summary'), request)
+
+def drawdowns_response(analyzer):
+    if analyzer is None or not analyzer.has_data():
+        return jsonify({'error': '数据未加载'}), 500
+
+    k = request.args.get('k', type=int)
+    if k is not None and k < 1:
+        return jsonify({'error': 'k 不能小于1'}), 400
+    try:
+        episodes = analyzer.drawdown_episodes(k, request.args.get('start') or None, request.args.get('end') or None)
+    except ValueError:
+        return jsonify({'error': '日期格式错误'}), 400
+    if episodes is None:
+        return jsonify({'error': '指标未计算'}), 500
+
+    def format_date(value):
+        return value.strftime('%Y-%m-%d') if value is not None else None
+
+    return jsonify([{
+        'peak_date': format_date(episode['峰值日期']),
+        'trough_date': format_date(episode['谷底日期']),
+        'recovery_date': format_date(episode['恢复日期']),
+        'depth': episode['回撤幅度'] * 100,
+        'decline_days': episode['下跌天数'],
+        'recovery_days': episode['恢复天数'],
+        'duration_days': episode['持续天数']
+    } for episode in episodes])
+
+@app.route('/api/data')
+def get_data():
+    """获取净值数据 (支持 start、end、max_points 参数)"""
+    return data_response(None, analyzer)
+
+@app.route('/api/metrics')
+def get_metrics():
+    """获取业绩指标 (可通过 start/end 参数查询自定义区间)"""
+    return metrics_response(None, analyzer)
+
+@app.route('/api/summary')
+def get_summary():
+    """获取概览信息"""
+    return summary_response(None, analyzer)
+
+@app.route('/api/drawdowns')
+def get_drawdowns():
+    """获取回撤事件 (k: 按幅度取前k个；start/end: 与日期范围有重叠的事件)"""
+    return drawdowns_response(analyzer)
+
+@app.route('/api/portfolios')
+def list_portfolios():
+    """列出数据目录中的组合及分析器缓存状态"""
+    return jsonify({'portfolios': list_portfolio_ids(), 'cache': registry.stats()})
+
+@app.route('/api/<portfolio>/data')
+def get_portfolio_data(portfolio):
+    """获取指定组合的净值数据"""
+    portfolio_analyzer = registry.get(portfolio)
+    if portfolio_analyzer is None:
+        return jsonify({'error': f'组合不存在: {portfolio}'}), 404
+    return data_response(portfolio, portfolio_analyzer)
+
+@app.route('/api/<portfolio>/metrics')
+def get_portfolio_metrics(portfolio):
+    """获取指定组合的业绩指标"""
+    portfolio_analyzer = registry.get(portfolio)
+    if portfolio_analyzer is None:
+        return jsonify({'error': f'组合不存在: {portfolio}'}), 404
+    return metrics_response(portfolio, portfolio_analyzer)
+
+@app.route('/api/<portfolio>/summary')
+def get_portfolio_summary(portfolio):
+    """获取指定组合的概览信息"""
+    portfolio_analyzer = registry.get(portfolio)
+    if portfolio_analyzer is None:
+        return jsonify({'error': f'组合不存在: {portfolio}'}), 404
+    return summary_response(portfolio, portfolio_analyzer)
+
+@app.route('/api/<portfolio>/drawdowns')
+def get_portfolio_drawdowns(portfolio):
+    """获取指定组合的回撤事件"""
+    portfolio_analyzer = registry.get(portfolio)
+    if portfolio_analyzer is None:
+        return jsonify({'error': f'组合不存在: {portfolio}'}), 404
+    return drawdowns_response(portfolio_analyzer)
+
+@app.route('/api/rolling')
+def get_rolling():
+    """获取滚动窗口指标曲线 (window 参数为窗口交易日数，默认60)"""
+    return rolling_response(None, analyzer)
+
+@app.route('/api/<portfolio>/rolling')
+def get_portfolio_rolling(portfolio):
+    """获取指定组合的滚动窗口指标曲线"""
+    portfolio_analyzer = registry.get(portfolio)
+    if portfolio_analyzer is None:
+        return jsonify({'error': f'组合不存在: {portfolio}'}), 404
+    return rolling_response(portfolio, portfolio_analyzer)
+
+def build_rolling_payload(analyzer, window):
+    """滚动窗口指标曲线 (波动率与最大回撤为百分比，窗口不足处为 null)"""
+    rolling = analyzer.rolling_metrics(window)
+
+    def to_list(values, scale=1):
+        values = np.asarray(values, dtype=np.float64)
+        return np.where(np.isnan(values), None, values * scale).tolist()
+
+    return {
+        'window': window,
+        'dates': np.datetime_as_string(analyzer.statistic_dates(), unit='D').tolist(),
+        'volatility': to_list(rolling[f'滚动年化波动率({window}日)'], 100),
+        'sharpe_ratio': to_list(rolling[f'滚动夏普比率({window}日)']),
+        'max_drawdown': to_list(rolling[f'滚动最大回撤({window}日)'], 100)
+    }
+
+def rolling_response(key, analyzer):
+    if analyzer is None or not analyzer.has_data():
+        return jsonify({'error': '数据未加载'}), 500
+    if not analyzer.results:
+        return jsonify({'error': '指标未计算'}), 500
+
+    window = request.args.get('window', 60, type=int)
+    if window is None or window < 2:
+        return jsonify({'error': '窗口长度无效'}), 400
+
+    # 按 (组合, 窗口) 缓存序列化后的响应，数据版本变化时重建
+    payload = response_cache.get((key, 'rolling', window), analyzer.data_version,
+                                 lambda: app.json.dumps(build_rolling_payload(analyzer, window)).encode('utf-8'))
+    return make_cached_response(payload, request)
+
+def build_correlation_payload(series, k, min_periods, dtype):
+    """
+    计算组合间日收益率相关系数，返回相关性最高的组合对与层次聚类顺序
+
+    参数:
+    series: 组合ID -> (日期数组, 日收益率数组)
+    """
+    labels, _, returns = returns_matrix(series, dtype=dtype)
+    corr = correlation_matrix(returns, dtype=dtype, min_periods=min_periods, max_workers=CORRELATION_WORKERS)
+    order, method = cluster_order(corr)
+    return {
+        'portfolios': labels,
+        'order': [labels[i] for i in order],
+        'linkage': method,
+        'min_periods': min_periods,
+        'top_pairs': [{'a': a, 'b': b, 'correlation': value} for a, b, value in top_pairs(corr, labels, k)]
+    }
+
+@app.route('/api/correlation')
+def get_correlation():
+    """
+    获取组合间日收益率相关性 (k: 返回的组合对数，默认20；min_periods: 最少共同交易日数，默认20；
+    dtype: float32/float64；portfolios: 逗号分隔的组合ID，默认数据目录中的全部组合)
+    """
+    k = request.args.get('k', 20, type=int)
+    min_periods = request.args.get('min_periods', 20, type=int)
+    dtype = request.args.get('dtype', 'float32')
+    if k is None or k < 1 or min_periods is None or min_periods < 2:
+        return jsonify({'error': '参数无效'}), 400
+    if dtype not in ('float32', 'float64'):
+        return jsonify({'error': 'dtype 只支持 float32 或 float64'}), 400
+
+    requested = request.args.get('portfolios')
+    portfolio_ids = sorted({p for p in requested.split(',') if p} if requested else list_portfolio_ids())
+    # 版本取自数据文件的修改时间与大小，缓存命中时不加载任何组合
+    version = []
+    for portfolio_id in portfolio_ids:
+        path = portfolio_file(portfolio_id)
+        if path is None:
+            return jsonify({'error': f'组合不存在: {portfolio_id}'}), 404
+        stat = os.stat(path)
+        version.append((portfolio_id, stat.st_mtime_ns, stat.st_size))
+    if len(portfolio_ids) < 2:
+        return jsonify({'error': '至少需要两个组合'}), 400
+
+    def build():
+        series = correlation_series(portfolio_ids, dtype)
+        return app.json.dumps(build_correlation_payload(series, k, min_periods, np.dtype(dtype))).encode('utf-8')
+
+    try:
+        # 任一组合数据文件变化时重新计算
+        payload = response_cache.get(('correlation', tuple(portfolio_ids), k, min_periods, dtype), tuple(version),
+                                     build)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    return make_cached_response(payload, request)
+
+def correlation_series(portfolio_ids, dtype):
+    """
+    各组合的 (日期, 日收益率)；每个组合取出后只保留这两列，不持有分析器，注册表的内存预算仍然有效
+    """
+    series = {}
+    for portfolio_id in portfolio_ids:
+        portfolio_analyzer = registry.get(portfolio_id)
+        if portfolio_analyzer is None:
+            raise LookupError(f'组合不存在: {portfolio_id}')
+        data = portfolio_analyzer.data
+        series[portfolio_id] = (data['统计日期'].values.astype('datetime64[ns]'),
+                                data['日收益率'].to_numpy(dtype=dtype))
+        del data, portfolio_analyzer
+    return series
+
+@app.route('/api/export/excel', methods=['GET', 'POST'])
 def export_excel():
-    """导出Excel报告"""
-    if analyzer is None:
+    """提交导出Excel报告任务 (可通过 portfolio 参数指定组合)，返回任务ID"""
+    portfolio = request.args.get('portfolio')
+    export_analyzer = registry.get(portfolio) if portfolio else analyzer
+    if export_analyzer is None or not export_analyzer.has_data():
         return jsonify({'error': '数据未加载'}), 500
 
-    output_file = "投资业绩分析报告.xlsx"
     try:
-        analyzer.save_results(
-            output_excel=output_file,
-            chart_png="净值曲线图.png",
-            chart_html="净值曲线图.html"
-        )
-        return send_file(output_file, as_attachment=True)
+        job, created = export_jobs.submit(export_analyzer, prefix=portfolio)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        print(f"提交导出任务失败: {e}")
+        return jsonify({'error': f'提交导出任务失败: {e}'}), 500
+    if job is None:
+        return jsonify({'error': '导出任务繁忙，请稍后重试'}), 503
+
+    result = job.to_dict()
+    result['status_url'] = f'/api/export/{job.job_id}'
+    result['download_url'] = f'/api/export/{job.job_id}/download'
+    return jsonify(result), 202 if created else 200
+
+@app.route('/api/export/<job_id>')
+def export_status(job_id):
+    """查询导出任务状态"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/export/<job_id>/download')
+def export_download(job_id):
+    """下载导出任务生成的Excel报告"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 409
+    return send_file(os.path.abspath(job.files['excel']), as_attachment=True)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """以 Prometheus 文本格式导出阶段耗时、接口延迟、响应大小与缓存命中率"""
+    caches = {'response': response_cache, 'analyzer': registry}
+    counters = {}
+    ratios = {}
+    for name, cache in caches.items():
+        hits, misses = cache.hits, cache.misses
+        counters[(('cache', name), ('result', 'hit'))] = hits
+        counters[(('cache', name), ('result', 'miss'))] = misses
+        ratios[(('cache', name),)] = hits / (hits + misses) if hits + misses else 0.0
+
+    lines = []
+    lines += format_histogram('analysis_stage_duration_seconds', '分析各阶段耗时', stage_histogram)
+    lines += format_histogram('http_request_duration_seconds', '接口请求延迟', request_histogram, label='endpoint')
+    lines += format_histogram('http_response_size_bytes', '接口响应大小', response_size_histogram, label='endpoint')
+    lines += format_gauge('cache_requests_total', '缓存查询次数', counters, metric_type='counter')
+    lines += format_gauge('cache_hit_ratio', '缓存命中率', ratios)
+    lines += format_gauge('analyzer_cache_evictions_total', '分析器缓存淘汰次数', {(): registry.evictions},
+                          metric_type='counter')
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     print("正在初始化投资业绩分析系统...")
@@ -0,0 +1,274 @@
+import pandas as pd
+import numpy as np
+import warnings
+
+from Investment_evaluation import PERIODS
+from relative_metrics import benchmark_arrays, align_benchmark, benchmark_returns, window_relative_metrics
+
+
+class BatchPerformanceAnalyzer:
+    def __init__(self, risk_free_rate=0.02, days_trade=251, calendar=None):
+        """
+        批量业绩分析器: 将多个单元净值序列对齐到同一日期网格 (日期 × 单元)，
+        一次 NumPy 运算完成所有单元的计算列与指标
+
+        参数:
+        risk_free_rate: 无风险年化收益率 (默认2%)
+        days_trade: 年交易日数
+        calendar: 可选的 trading_calendar.TradingCalendar，设置后各时间段边界由日历按截止日期计算一次、
+                  截止日期相同的单元共用 (整数切片)，年化使用日历中完整年份的平均交易日数
+                  (忽略 days_trade；日历不足一整年时仍使用 days_trade)
+        """
+        self.risk_free_rate = risk_free_rate
+        self.days_trade = days_trade if calendar is None or calendar.days_per_year is None else calendar.days_per_year
+        self.calendar = calendar
+        self.ordinals = None
+        self.series = {}
+        self.portfolio_ids = []
+        self.dates = None
+        self.mask = None
+        self.nav = None
+        self.normalized = None
+        self.returns = None
+        self.cumulative = None
+        self.running_max = None
+        self.drawdown = None
+        self.first_index = None
+        self.last_index = None
+        self.benchmark = None
+        self.benchmark_nav = None
+        self.bench_returns = None
+        self.period_arrays = {}
+        self.results = {}
+
+    def add_series(self, portfolio_id, data):
+        """
+        添加一个单元的净值数据
+
+        参数:
+        portfolio_id: 单元标识
+        data: 包含 '统计日期' 与 '单元资产净值(净价)' 列的DataFrame
+        """
+        self.series[portfolio_id] = data
+
+    def load_series(self, series):
+        """批量添加单元净值数据 (字典: 单元标识 -> DataFrame)"""
+        for portfolio_id, data in series.items():
+            self.add_series(portfolio_id, data)
+
+    def set_benchmark(self, benchmark):
+        """
+        设置基准净值，所有单元共用一条基准: 基准与日期网格有序合并一次，
+        在同一次矩阵运算中计算各单元各时间段相对基准的指标
+
+        参数:
+        benchmark: 以日期为索引的 Series，或包含 '统计日期' 与 '基准净值' 列的DataFrame
+        """
+        self.benchmark = benchmark_arrays(benchmark)
+
+    def _build_matrix(self):
+        """将所有单元对齐到日期并集，缺失位置为NaN并记录掩码"""
+        self.portfolio_ids = list(self.series.keys())
+        columns = []
+        for portfolio_id in self.portfolio_ids:
+            data = self.series[portfolio_id]
+            dates = pd.to_datetime(data['统计日期']).values.astype('datetime64[ns]').astype(np.int64)
+            nav = data['单元资产净值(净价)'].to_numpy(dtype=np.float64)
+            order = np.argsort(dates, kind='stable')
+            columns.append((dates[order], nav[order]))
+
+        all_dates = np.unique(np.concatenate([dates for dates, _ in columns]))
+        n_dates, n_series = len(all_dates), len(columns)
+
+        nav = np.full((n_dates, n_series), np.nan)
+        mask = np.zeros((n_dates, n_series), dtype=bool)
+        for j, (dates, values) in enumerate(columns):
+            rows = np.searchsorted(all_dates, dates)
+            nav[rows, j] = values
+            mask[rows, j] = True
+
+        self.dates = all_dates
+        self.nav = nav
+        self.mask = mask
+        # 日期网格各行的交易日序号
+        if self.calendar is not None:
+            if not self.calendar.contains(all_dates.astype('datetime64[ns]')):
+                raise ValueError("统计日期不全在交易日历中")
+            self.ordinals = self.calendar.ordinal(all_dates.astype('datetime64[ns]'))
+
+    def calculate_performance_metrics(self):
+        """计算所有单元的业绩指标"""
+        if not self.series:
+            print("请先加载数据")
+            return
+
+        self._build_matrix()
+        mask = self.mask
+        n_dates, n_series = mask.shape
+        cols = np.arange(n_series)
+        rows = np.arange(n_dates)
+
+        # 每个单元首个/最后一个有效数据的位置
+        self.first_index = mask.argmax(axis=0)
+        self.last_index = n_dates - 1 - mask[::-1].argmax(axis=0)
+
+        # 计算归一化净值 (起始值为1)
+        initial_nav = self.nav[self.first_index, cols]
+        self.normalized = self.nav / initial_nav
+
+        # 计算每日收益率 (相对于该单元上一个有效数据点)
+        valid_pos = np.where(mask, rows[:, None], -1)
+        last_valid = np.maximum.accumulate(valid_pos, axis=0)
+        prev_pos = np.empty_like(last_valid)
+        prev_pos[0] = -1
+        prev_pos[1:] = last_valid[:-1]
+        has_prev = mask & (prev_pos >= 0)
+        prev_nav = self.normalized[np.maximum(prev_pos, 0), cols]
+        self.returns = np.where(has_prev, self.normalized / prev_nav - 1, np.nan)
+
+        # 计算累计收益率
+        self.cumulative = self.normalized - 1
+
+        # 计算滚动最大净值 (fmax 跳过缺失值)
+        running_max = np.fmax.accumulate(self.normalized, axis=0)
+        self.running_max = np.where(mask, running_max, np.nan)
+
+        # 计算回撤
+        self.drawdown = (self.normalized - self.running_max) / self.running_max
+
+        # 基准对齐到日期网格，并按各单元相邻有效日期计算基准收益率
+        if self.benchmark is not None:
+            self.benchmark_nav = align_benchmark(self.dates, *self.benchmark)
+            self.bench_returns = benchmark_returns(self.benchmark_nav, mask)
+        else:
+            self.benchmark_nav = self.bench_returns = None
+
+        self.calculate_key_metrics()
+        self.calculate_period_metrics()
+
+    def _years(self, period_days, first):
+        """区间年数: 数据行数 / 年交易日数，有交易日历时按区间首行到最后一行之间日历中的交易日数"""
+        if self.calendar is None:
+            return period_days / self.days_trade
+        return (self.ordinals[self.last_index] + 1 - self.ordinals[first]) / self.days_trade
+
+    def _window_metrics(self, window):
+        """对掩码窗口内的数据计算各单元的区间指标 (数组形式)"""
+        cols = np.arange(window.shape[1])
+        trading_days_per_year = self.days_trade
+
+        period_days = window.sum(axis=0)
+        first = window.argmax(axis=0)
+        period_return = self.normalized[self.last_index, cols] / self.normalized[first, cols] - 1
+
+        with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            period_years = self._years(period_days, first)
+            annual_return = np.where(period_years > 0,
+                                     (1 + period_return) ** (1 / period_years) - 1, 0.0)
+            # 与 pandas 一致: 样本标准差 (ddof=1)，跳过缺失值
+            window_returns = np.where(window, self.returns, np.nan).T
+            daily_volatility = np.nanstd(window_returns, axis=1, ddof=1)
+            annual_volatility = daily_volatility * np.sqrt(trading_days_per_year)
+            sharpe_ratio = np.where(annual_volatility > 0,
+                                    (annual_return - self.risk_free_rate) / annual_volatility, 0.0)
+            max_drawdown = np.nanmin(np.where(window, self.drawdown, np.nan).T, axis=1)
+            calmar_ratio = np.where(max_drawdown != 0, annual_return / np.abs(max_drawdown), 0.0)
+
+        return {
+            '总收益率': period_return,
+            '年化收益率': annual_return,
+            '年化波动率': annual_volatility,
+            '夏普比率': sharpe_ratio,
+            '最大回撤': max_drawdown,
+            '卡玛比率': calmar_ratio,
+            '数据天数': period_days,
+            '开始日期': self.dates[first]
+        }
+
+    @staticmethod
+    def _to_scalars(arrays, j):
+        """取出第j个单元的指标，转换为与单序列分析器一致的类型"""
+        metrics = {}
+        for key, values in arrays.items():
+            if key == '数据天数':
+                metrics[key] = int(values[j])
+            elif key == '开始日期':
+                metrics[key] = pd.Timestamp(values[j])
+            else:
+                metrics[key] = np.float64(values[j])
+        return metrics
+
+    def calculate_key_metrics(self):
+        """计算所有单元的关键业绩指标 (总体指标)"""
+        arrays = self._window_metrics(self.mask)
+        # 总体指标的收益率以首日为基准，与单序列分析器一致
+        arrays['总收益率'] = self.normalized[self.last_index, np.arange(self.mask.shape[1])] - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            years = self._years(arrays['数据天数'], self.first_index)
+            arrays['年化收益率'] = np.where(years > 0, (1 + arrays['总收益率']) ** (1 / years) - 1, 0.0)
+            vol = arrays['年化波动率']
+            arrays['夏普比率'] = np.where(vol > 0, (arrays['年化收益率'] - self.risk_free_rate) / vol, 0.0)
+            mdd = arrays['最大回撤']
+            arrays['卡玛比率'] = np.where(mdd != 0, arrays['年化收益率'] / np.abs(mdd), 0.0)
+        del arrays['开始日期']
+        self.period_arrays['总体指标'] = arrays
+
+        for j, portfolio_id in enumerate(self.portfolio_ids):
+            self.results[portfolio_id] = {'总体指标': self._to_scalars(arrays, j)}
+
+    def calculate_period_metrics(self):
+        """计算所有单元在不同时间段的业绩指标"""
+        cols = np.arange(self.mask.shape[1])
+        end_dates = self.dates[self.last_index]
+
+        windows = self._calendar_windows() if self.calendar is not None else None
+
+        for period_name, delta in PERIODS.items():
+            if windows is not None:
+                window = windows[period_name]
+            else:
+                start_dates = end_dates - pd.Timedelta(delta).value
+                window = self.mask & (self.dates[:, None] >= start_dates[None, :])
+            arrays = self._window_metrics(window)
+            arrays['开始日期'] = arrays['开始日期'].astype('datetime64[ns]')
+            if self.bench_returns is not None:
+                first = window.argmax(axis=0)
+                arrays.update(window_relative_metrics(window, self.returns, self.bench_returns, self.benchmark_nav,
+                                                      first, self.last_index,
+                                                      arrays['总收益率'], arrays['年化收益率'],
+                                                      self.risk_free_rate, self.days_trade,
+                                                      self._years(arrays['数据天数'], first)))
+            self.period_arrays[period_name] = arrays
+
+            # 至少需要2个数据点
+            for j in cols[arrays['数据天数'] >= 2]:
+                self.results[self.portfolio_ids[j]][period_name] = self._to_scalars(arrays, j)
+
+    def _calendar_windows(self):
+        """
+        按交易日历构建各时间段的窗口: 每个截止日期只向日历查询一次边界，
+        截止日期相同的单元共用起始行，窗口为掩码从起始行开始的整数切片
+        """
+        windows = {period_name: np.zeros_like(self.mask) for period_name in PERIODS}
+        for last in np.unique(self.last_index):
+            group = np.flatnonzero(self.last_index == last)
+            bounds = self.calendar.period_bounds(self.dates[last].astype('datetime64[ns]'), PERIODS)
+            for period_name, (start, _) in bounds.items():
+                row = int(np.searchsorted(self.ordinals, start))
+                windows[period_name][row:, group] = self.mask[row:, group]
+        return windows
+
+    def get_data(self, portfolio_id):
+        """返回单个单元的计算结果，列与 InvestmentPerformanceAnalyzer.data 一致"""
+        j = self.portfolio_ids.index(portfolio_id)
+        rows = self.mask[:, j]
+        return pd.DataFrame({
+            '统计日期': pd.to_datetime(self.dates[rows].astype('datetime64[ns]')),
+            '单元资产净值(净价)': self.nav[rows, j],
+            '归一化净值': self.normalized[rows, j],
+            '日收益率': self.returns[rows, j],
+            '累计收益率': self.cumulative[rows, j],
+            '滚动最大净值': self.running_max[rows, j],
+            '回撤': self.drawdown[rows, j]
+        })
@@ -0,0 +1,93 @@
+import os
+import glob
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rendering import init_worker
+
+# 每个工作进程复用的图表模板
+_chart_template = None
+
+
+def _generate_report(portfolio_id, data_file, output_dir, risk_free_rate):
+    """在工作进程中生成单个组合的报告，返回 (组合ID, 结果)"""
+    global _chart_template
+    try:
+        from Investment_evaluation import InvestmentPerformanceAnalyzer
+        from rendering import ChartTemplate
+        if _chart_template is None:
+            _chart_template = ChartTemplate()
+
+        analyzer = InvestmentPerformanceAnalyzer(
+            data_file=data_file,
+            risk_free_rate=risk_free_rate,
+            chart_title=f"{portfolio_id}-投资业绩分析"
+        )
+        if not analyzer.load_data():
+            return portfolio_id, {'success': False, 'error': '数据加载失败'}
+        analyzer.calculate_performance_metrics()
+
+        portfolio_dir = os.path.join(output_dir, portfolio_id)
+        os.makedirs(portfolio_dir, exist_ok=True)
+        files = {
+            'excel': os.path.join(portfolio_dir, "投资业绩分析报告.xlsx"),
+            'png': os.path.join(portfolio_dir, "净值曲线图.png"),
+            'html': os.path.join(portfolio_dir, "净值曲线图.html")
+        }
+        analyzer.save_results(output_excel=files['excel'], chart_png=files['png'],
+                              chart_html=files['html'], chart_template=_chart_template)
+        return portfolio_id, {'success': True, 'files': files}
+    except Exception as e:
+        return portfolio_id, {'success': False, 'error': str(e)}
+
+
+def generate_reports(portfolios, output_dir="投资经理业绩评估", max_workers=None, risk_free_rate=0.015):
+    """
+    用进程池并行生成多个组合的报告
+
+    参数:
+    portfolios: 组合ID -> Excel文件路径 的字典
+    output_dir: 输出根目录 (每个组合一个子目录)
+    max_workers: 工作进程数 (默认CPU核数)
+    risk_free_rate: 无风险年化收益率
+
+    返回:
+    组合ID -> {'success': bool, 'files' 或 'error'} 的字典
+    """
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, initializer=init_worker) as executor:
+        futures = [executor.submit(_generate_report, portfolio_id, data_file, output_dir, risk_free_rate)
+                   for portfolio_id, data_file in portfolios.items()]
+        for future in as_completed(futures):
+            portfolio_id, result = future.result()
+            results[portfolio_id] = result
+            status = '成功' if result['success'] else f"失败: {result['error']}"
+            print(f"[{len(results)}/{len(futures)}] {portfolio_id} {status}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量生成组合业绩报告")
+    parser.add_argument('inputs', nargs='+', help="Excel文件或包含Excel文件的目录")
+    parser.add_argument('--output', default="投资经理业绩评估", help="输出根目录")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数")
+    parser.add_argument('--risk-free-rate', type=float, default=0.015, help="无风险利率")
+    args = parser.parse_args()
+
+    portfolios = {}
+    for path in args.inputs:
+        files = sorted(glob.glob(os.path.join(path, '*.xlsx'))) if os.path.isdir(path) else [path]
+        for data_file in files:
+            portfolios[os.path.splitext(os.path.basename(data_file))[0]] = data_file
+
+    results = generate_reports(portfolios, args.output, args.workers, args.risk_free_rate)
+    failed = [portfolio_id for portfolio_id, result in results.items() if not result['success']]
+    print(f"\n完成: 成功 {len(results) - len(failed)} 个, 失败 {len(failed)} 个")
+    for portfolio_id in failed:
+        print(f"  {portfolio_id}: {results[portfolio_id]['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import threading
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Excel 单个工作表最多 1,048,576 行，超过该行数时跳过 load_data 基准
+EXCEL_MAX_ROWS = 1_048_575
+
+# 冷启动导入耗时预算 (秒)；绘图与写出库应在首次使用时才导入
+IMPORT_BUDGETS = {'Investment_evaluation': 1.0, 'app': 1.5,
+                  'api.data': 0.5, 'api.metrics': 0.5, 'api.summary': 0.5}
+LAZY_MODULES = ('matplotlib', 'plotly', 'openpyxl')
+
+
+def synthetic_nav(n_rows, seed=0, start='2000-01-03'):
+    """生成 n_rows 个交易日的合成净值序列"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_rows)
+    returns = rng.normal(0.0003, 0.01, n_rows)
+    returns[0] = 0.0
+    return pd.DataFrame({
+        '统计日期': dates,
+        '单元资产净值(净价)': np.cumprod(1 + returns)
+    })
+
+
+def make_analyzer(data, compute=True, **options):
+    from Investment_evaluation import InvestmentPerformanceAnalyzer
+    analyzer = InvestmentPerformanceAnalyzer('benchmark', risk_free_rate=0.015, **options)
+    analyzer.data = data.copy()
+    if compute:
+        analyzer.calculate_performance_metrics()
+    return analyzer
+
+
+def measure(run, setup=None, repeat=3, memory=True):
+    """
+    测量一个阶段: 取 repeat 次中的最短耗时，另运行一次记录 tracemalloc 峰值内存
+
+    参数:
+    run: 被测函数 run(state)
+    setup: 每次运行前调用，返回 state (不计入耗时)
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        state = setup() if setup else None
+        gc.collect()
+        tracemalloc.start()
+        run(state)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return {'seconds': min(times), 'peak_mb': peak_mb}
+
+
+def bench_pipeline(n_rows, workdir, repeat, memory, max_render_rows):
+    """单组合各阶段的基准"""
+    results = {}
+    data = synthetic_nav(n_rows)
+
+    if n_rows <= EXCEL_MAX_ROWS:
+        from Investment_evaluation import InvestmentPerformanceAnalyzer
+        path = os.path.join(workdir, f'nav_{n_rows}.xlsx')
+        data.to_excel(path, sheet_name='单元资产2025', index=False)
+
+        def load(use_cache):
+            def run(_):
+                analyzer = InvestmentPerformanceAnalyzer(path, use_cache=use_cache)
+                analyzer.load_data()
+            return run
+        results['load_data'] = measure(load(False), repeat=repeat, memory=memory)
+        load(True)(None)  # 生成缓存
+        results['load_data_cached'] = measure(load(True), repeat=repeat, memory=memory)
+
+    results['calculate_performance_metrics'] = measure(
+        lambda analyzer: analyzer.calculate_performance_metrics(),
+        setup=lambda: make_analyzer(data, compute=False), repeat=repeat, memory=memory)
+
+    computed = make_analyzer(data)
+    results['calculate_period_metrics'] = measure(
+        lambda analyzer: analyzer.calculate_period_metrics(),
+        setup=lambda: computed, repeat=repeat, memory=memory)
+
+    if n_rows <= max_render_rows:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        def chart(analyzer):
+            analyzer.create_performance_chart()
+            plt.close('all')
+        results['create_performance_chart'] = measure(chart, setup=lambda: computed, repeat=1, memory=memory)
+
+        def save(analyzer):
+            analyzer.save_results(output_excel=os.path.join(workdir, 'report.xlsx'),
+                                  chart_png=os.path.join(workdir, 'chart.png'),
+                                  chart_html=os.path.join(workdir, 'chart.html'))
+        results['save_results'] = measure(save, setup=lambda: computed, repeat=1, memory=memory)
+    return results
+
+
+def _deep_size(value):
+    """对象及其包含的字典、槽位与元素的 sys.getsizeof 之和"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k) + _deep_size(v) for k, v in value.items())
+    for slot in getattr(type(value), '__slots__', ()):
+        size += _deep_size(getattr(value, slot, None))
+    return size
+
+
+def bench_memory(n_rows):
+    """分析器常驻内存: 标准模式与紧凑模式 (float64 / float32) 的分析数据与指标结果字节数"""
+    import numpy as np
+    data = synthetic_nav(n_rows)
+    modes = {
+        'standard': {},
+        'compact': {'compact': True},
+        'compact_float32': {'compact': True, 'nav_dtype': np.float32}
+    }
+    results = {}
+    for mode, options in modes.items():
+        analyzer = make_analyzer(data, **options)
+        results[mode] = {'data_bytes': analyzer.memory_usage(), 'results_bytes': _deep_size(analyzer.results)}
+    return results
+
+
+def bench_batch(n_portfolios, n_rows, repeat, memory):
+    """多组合批量计算的基准 (批量引擎 vs 逐个分析器)"""
+    from batch_analyzer import BatchPerformanceAnalyzer
+    series = {f'p{i}': synthetic_nav(n_rows, seed=i) for i in range(n_portfolios)}
+
+    def batch(_):
+        analyzer = BatchPerformanceAnalyzer(risk_free_rate=0.015)
+        analyzer.load_series(series)
+        analyzer.calculate_performance_metrics()
+
+    def sequential(_):
+        for data in series.values():
+            make_analyzer(data)
+
+    return {
+        'batch_analyzer': measure(batch, repeat=repeat, memory=memory),
+        'sequential_analyzers': measure(sequential, repeat=1, memory=False)
+    }
+
+
+def bench_endpoints(n_rows, threads, requests_per_thread):
+    """Flask 接口在并发请求下的延迟 (使用测试客户端)"""
+    import app as web
+    web.analyzer = make_analyzer(synthetic_nav(n_rows))
+    web.warm_response_cache()
+
+    results = {}
+    for endpoint in ['/api/data', '/api/data?max_points=2000', '/api/metrics', '/api/summary', '/api/rolling?window=60']:
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            client = web.app.test_client()
+            local = []
+            for _ in range(requests_per_thread):
+                start = time.perf_counter()
+                response = client.get(endpoint, headers={'Accept-Encoding': 'gzip'})
+                response.get_data()
+                local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = np.array(latencies)
+        results[endpoint] = {
+            'seconds': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'p99': float(np.percentile(latencies, 99)),
+            'requests_per_second': len(latencies) / elapsed
+        }
+    return results
+
+
+def bench_imports(budgets, repeat):
+    """在新的解释器中测量模块的冷启动导入耗时 (取最短)，并记录被提前导入的绘图/写出库"""
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import {module}\n"
+            "print(time.perf_counter() - start)\n"
+            "print(','.join(m for m in {lazy!r} if m in sys.modules))")
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module, budget in budgets.items():
+        times = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', code.format(module=module, lazy=LAZY_MODULES)],
+                                    cwd=root, capture_output=True, text=True, check=True).stdout.split('\n')
+            times.append(float(output[0]))
+        results[module] = {
+            'seconds': min(times),
+            'budget': budget,
+            'eager_modules': [m for m in output[1].split(',') if m]
+        }
+    return results
+
+
+# 与基线对比的指标及输出单位: 耗时与峰值内存
+COMPARED_METRICS = {'seconds': 's', 'peak_mb': ' MB'}
+
+
+def compare(current, baseline, threshold):
+    """
+    与基线对比，返回耗时或峰值内存超出阈值的阶段列表
+
+    返回:
+    [(阶段, 指标名, 基线值, 当前值, 比值)]
+    """
+    regressions = []
+    for key, result in current.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            # 基线或本次未测量 (如 --no-memory) 的指标不比较
+            if not base.get(metric) or result.get(metric) is None:
+                continue
+            ratio = result[metric] / base[metric]
+            if ratio > 1 + threshold:
+                regressions.append((key, metric, base[metric], result[metric], ratio))
+    return regressions
+
+
+def parse_sizes(text):
+    return [int(float(x)) for x in text.split(',') if x]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="投资业绩分析流程的性能基准")
+    parser.add_argument('--rows', default='1e3,1e4,1e5', help="单组合数据行数 (逗号分隔，最大可到 1e7)")
+    parser.add_argument('--portfolios', default='1,100', help="批量计算的组合数 (逗号分隔，最大可到 5000)")
+    parser.add_argument('--memory-rows', default='1e4', help="测量常驻内存的行数 (逗号分隔)")
+    parser.add_argument('--batch-rows', type=int, default=1000, help="批量计算时每个组合的行数")
+    parser.add_argument('--max-render-rows', type=float, default=1e5, help="超过该行数时跳过绘图与保存阶段")
+    parser.add_argument('--repeat', type=int, default=3, help="每个阶段重复次数 (取最短耗时)")
+    parser.add_argument('--no-memory', action='store_true', help="不测量峰值内存")
+    parser.add_argument('--threads', type=int, default=8, help="接口基准的并发线程数")
+    parser.add_argument('--requests', type=int, default=50, help="接口基准每个线程的请求数")
+    parser.add_argument('--skip-endpoints', action='store_true', help="跳过接口基准")
+    parser.add_argument('--import-budget', type=float, help="统一的导入耗时预算 (秒，默认按模块设置)")
+    parser.add_argument('--skip-imports', action='store_true', help="跳过导入耗时检查")
+    parser.add_argument('--output', default='benchmark_results.json', help="结果JSON文件")
+    parser.add_argument('--baseline', help="基线结果JSON文件")
+    parser.add_argument('--threshold', type=float, default=0.2, help="允许的耗时与峰值内存回退比例 (默认20%%)")
+    args = parser.parse_args()
+
+    memory = not args.no_memory
+    results = {}
+    over_budget = []
+    if not args.skip_imports:
+        budgets = {m: args.import_budget or budget for m, budget in IMPORT_BUDGETS.items()}
+        for module, result in bench_imports(budgets, args.repeat).items():
+            results[f'import {module}'] = result
+            print(f"import {module:25s} {result['seconds']:10.4f}s  budget={result['budget']}s  "
+                  f"eager={','.join(result['eager_modules']) or '-'}")
+            if result['seconds'] > result['budget'] or result['eager_modules']:
+                over_budget.append(module)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in parse_sizes(args.rows):
+            for stage, result in bench_pipeline(n_rows, workdir, args.repeat, memory, args.max_render_rows).items():
+                results[f'{stage}[rows={n_rows}]'] = result
+                print(f"{stage:32s} rows={n_rows:<10d} {result['seconds']:10.4f}s  "
+                      f"peak={result['peak_mb'] if result['peak_mb'] is not None else '-'} MB")
+
+    for n_rows in parse_sizes(args.memory_rows):
+        memory_results = bench_memory(n_rows)
+        standard = sum(memory_results['standard'].values())
+        for mode, result in memory_results.items():
+            results[f'memory {mode}[rows={n_rows}]'] = result
+            total = sum(result.values())
+            print(f"memory {mode:25s} rows={n_rows:<10d} data={result['data_bytes'] / 1e3:10.1f} KB  "
+                  f"results={result['results_bytes'] / 1e3:6.1f} KB  节省 {1 - total / standard:.0%}")
+
+    for n_portfolios in parse_sizes(args.portfolios):
+        for stage, result in bench_batch(n_portfolios, args.batch_rows, args.repeat, memory).items():
+            results[f'{stage}[portfolios={n_portfolios},rows={args.batch_rows}]'] = result
+            print(f"{stage:32s} portfolios={n_portfolios:<6d} {result['seconds']:10.4f}s")
+
+    if not args.skip_endpoints:
+        for endpoint, result in bench_endpoints(10_000, args.threads, args.requests).items():
+            results[f'endpoint {endpoint}[threads={args.threads}]'] = result
+            print(f"{endpoint:32s} p50={result['seconds'] * 1000:.2f}ms p95={result['p95'] * 1000:.2f}ms "
+                  f"{result['requests_per_second']:.0f} req/s")
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n基准结果已保存为: {args.output}")
+
+    if over_budget:
+        print(f"\n以下模块导入超出预算或提前导入了绘图/写出库: {', '.join(over_budget)}")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n以下阶段耗时或峰值内存超出基线 {args.threshold:.0%}:")
+            for key, metric, base, current, ratio in regressions:
+                unit = COMPARED_METRICS[metric]
+                print(f"  {key} {metric}: {base:.4f}{unit} -> {current:.4f}{unit} ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"\n所有阶段均在基线 {args.threshold:.0%} 以内")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 给出置信区间的指标
+BOOTSTRAP_KEYS = ('总收益率', '年化收益率', '年化波动率', '夏普比率', '最大回撤', '卡玛比率')
+
+
+def block_indices(rng, n, n_resamples, block_size):
+    """
+    循环移动块自助法的下标矩阵 (重抽样次数 × n): 每行由随机起点的连续块拼接而成，保留收益率的短期自相关
+
+    参数:
+    rng: numpy.random.Generator
+    n: 序列长度
+    n_resamples: 重抽样次数
+    block_size: 块长度
+    """
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks))
+    indices = (starts[:, :, None] + np.arange(block_size)) % n
+    return indices.reshape(n_resamples, -1)[:, :n]
+
+
+def resample_metrics(returns, indices, risk_free_rate, days_trade, years=None):
+    """
+    按下标矩阵一次计算所有重抽样路径的指标，口径与 calculate_period_metrics 一致
+
+    参数:
+    returns: 区间内的日收益率 (不含区间首日)
+    indices: block_indices 生成的下标矩阵
+    years: 区间年数 (为空时按区间天数 / days_trade)
+
+    返回:
+    指标名 -> 各重抽样路径的指标数组
+    """
+    sampled = returns[indices]
+    nav = np.cumprod(1 + sampled, axis=1)
+    total_return = nav[:, -1] - 1
+    if years is None:
+        # 区间天数包含首日
+        years = (returns.shape[0] + 1) / days_trade
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual_return = (1 + total_return) ** (1 / years) - 1
+        annual_volatility = sampled.std(axis=1, ddof=1) * np.sqrt(days_trade)
+        sharpe_ratio = np.where(annual_volatility > 0, (annual_return - risk_free_rate) / annual_volatility, 0.0)
+        # 区间首日净值为1，回撤从首日起算
+        running_max = np.maximum(np.maximum.accumulate(nav, axis=1), 1)
+        max_drawdown = np.minimum(((nav - running_max) / running_max).min(axis=1), 0)
+        calmar_ratio = np.where(max_drawdown != 0, annual_return / np.abs(max_drawdown), 0.0)
+
+    return {
+        '总收益率': total_return,
+        '年化收益率': annual_return,
+        '年化波动率': annual_volatility,
+        '夏普比率': sharpe_ratio,
+        '最大回撤': max_drawdown,
+        '卡玛比率': calmar_ratio
+    }
+
+
+def _bootstrap_chunk(args):
+    """工作进程: 用独立的种子对每个区间完成一批重抽样"""
+    period_returns, period_years, seed, n_resamples, block_sizes, risk_free_rate, days_trade = args
+    rng = np.random.default_rng(seed)
+    chunk = {}
+    for period_name, returns in period_returns.items():
+        indices = block_indices(rng, len(returns), n_resamples, block_sizes[period_name])
+        chunk[period_name] = resample_metrics(returns, indices, risk_free_rate, days_trade,
+                                              period_years.get(period_name))
+    return chunk
+
+
+def bootstrap_intervals(period_returns, risk_free_rate=0.02, days_trade=251, n_resamples=2000, block_size=None,
+                        confidence=0.95, seed=0, chunk_size=250, max_workers=1, period_years=None):
+    """
+    块自助法估计各区间指标的百分位置信区间
+
+    参数:
+    period_returns: 区间名称 -> 区间内的日收益率数组 (不含区间首日)
+    n_resamples: 重抽样次数
+    block_size: 块长度 (为空时取 n 的立方根)
+    confidence: 置信水平
+    seed: 随机种子；重抽样按 chunk_size 分批，每批的种子由 SeedSequence 派生，结果与工作进程数无关
+    chunk_size: 每批 (每个任务) 的重抽样次数，也决定单次数组运算的内存 (chunk_size × n)
+    max_workers: 工作进程数 (1 表示在当前进程计算，None 表示CPU核数)
+    period_years: 区间名称 -> 区间年数 (有交易日历时由调用方按日历计算；未给出的区间按区间天数 / days_trade)
+
+    返回:
+    区间名称 -> {指标名: (下限, 上限)}
+    """
+    period_returns = {name: np.asarray(returns, dtype=np.float64)
+                      for name, returns in period_returns.items() if len(returns) >= 2}
+    if not period_returns:
+        return {}
+    block_sizes = {name: block_size or max(1, round(len(returns) ** (1 / 3)))
+                   for name, returns in period_returns.items()}
+
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    period_years = dict(period_years or {})
+    tasks = [(period_returns, period_years, chunk_seed, size, block_sizes, risk_free_rate, days_trade)
+             for chunk_seed, size in zip(seeds, sizes)]
+
+    if max_workers == 1 or len(tasks) == 1:
+        chunks = [_bootstrap_chunk(task) for task in tasks]
+    else:
+        context = multiprocessing.get_context('spawn')
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            chunks = list(executor.map(_bootstrap_chunk, tasks))
+
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for period_name in period_returns:
+        intervals[period_name] = {}
+        for key in BOOTSTRAP_KEYS:
+            values = np.concatenate([chunk[period_name][key] for chunk in chunks])
+            lower, upper = np.nanpercentile(values, [tail, 100 - tail])
+            intervals[period_name][key] = (float(lower), float(upper))
+    return intervals
@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+from create_sample_data import sample_data
+
+# Serverless 函数 (api/*.py) 读取的预计算结果目录
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api', '_artifact')
+
+# 预序列化的接口响应: 文件名 -> app.py 中的构建函数名
+PAYLOADS = {
+    'data.json': 'build_data_payload',
+    'metrics.json': 'build_metrics_payload',
+    'summary.json': 'build_summary_payload'
+}
+
+
+def _write_atomic(path, content):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def build_artifact(data_file=None, output_dir=ARTIFACT_DIR, risk_free_rate=0.015):
+    """
+    运行一次完整分析，写出 Serverless 函数使用的预计算结果:
+    各接口的JSON响应、净值序列二进制数组 (series.npy) 与 manifest.json
+
+    参数:
+    data_file: Excel数据文件 (为空时使用示例数据)
+    output_dir: 输出目录
+    risk_free_rate: 无风险利率
+    """
+    import app as web
+    from Investment_evaluation import InvestmentPerformanceAnalyzer
+
+    analyzer = InvestmentPerformanceAnalyzer(data_file or 'sample', risk_free_rate=risk_free_rate,
+                                             use_cache=False)
+    if data_file:
+        if not analyzer.load_data():
+            return None
+    else:
+        analyzer.data = sample_data()
+    analyzer.calculate_performance_metrics()
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {
+        'source': os.path.basename(data_file) if data_file else 'sample',
+        'rows': len(analyzer.data),
+        'risk_free_rate': risk_free_rate,
+        'days_trade': analyzer.days_trade,
+        'built_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'files': {}
+    }
+    for filename, builder in PAYLOADS.items():
+        body = web.app.json.dumps(getattr(web, builder)(analyzer)).encode('utf-8')
+        _write_atomic(os.path.join(output_dir, filename), body)
+        manifest['files'][filename] = hashlib.sha256(body).hexdigest()
+
+    # 定长结构化数组，可用 np.load(..., mmap_mode='r') 按需映射读取
+    series = np.empty(len(analyzer.data), dtype=[('date', 'datetime64[D]'), ('nav', 'f8'),
+                                                ('drawdown', 'f8'), ('cumulative_return', 'f8')])
+    series['date'] = analyzer.data['统计日期'].values.astype('datetime64[D]')
+    series['nav'] = analyzer.data['归一化净值'].to_numpy()
+    series['drawdown'] = analyzer.data['回撤'].to_numpy()
+    series['cumulative_return'] = analyzer.data['累计收益率'].to_numpy()
+    tmp_path = os.path.join(output_dir, 'series.tmp.npy')
+    np.save(tmp_path, series)
+    os.replace(tmp_path, os.path.join(output_dir, 'series.npy'))
+
+    _write_atomic(os.path.join(output_dir, 'manifest.json'),
+                  json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="为 Serverless 函数预先计算并序列化分析结果")
+    parser.add_argument('--data-file', help="Excel数据文件 (默认使用示例数据)")
+    parser.add_argument('--output', default=ARTIFACT_DIR, help="输出目录")
+    parser.add_argument('--risk-free-rate', type=float, default=0.015, help="无风险利率")
+    args = parser.parse_args()
+
+    manifest = build_artifact(args.data_file, args.output, args.risk_free_rate)
+    if manifest is None:
+        print("数据加载失败，未生成预计算结果")
+        return
+    print(f"预计算结果已保存到: {args.output} ({manifest['rows']} 条记录)")
+
+
+if __name__ == "__main__":
+    main()
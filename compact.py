@@ -0,0 +1,114 @@
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+# 指标名称 -> 槽位名称
+METRIC_SLOTS = {
+    '总收益率': 'total_return',
+    '年化收益率': 'annual_return',
+    '年化波动率': 'annual_volatility',
+    '夏普比率': 'sharpe_ratio',
+    '最大回撤': 'max_drawdown',
+    '卡玛比率': 'calmar_ratio',
+    '数据天数': 'days',
+    '开始日期': 'start_day',
+    '基准收益率': 'benchmark_return',
+    '超额收益率': 'excess_return',
+    '贝塔': 'beta',
+    '阿尔法': 'alpha',
+    '跟踪误差': 'tracking_error',
+    '信息比率': 'information_ratio',
+    '上行捕获率': 'upside_capture',
+    '下行捕获率': 'downside_capture'
+}
+
+
+def to_day_numbers(dates):
+    """日期 -> 自 1970-01-01 起的天数 (int32)"""
+    return pd.to_datetime(dates).values.astype('datetime64[D]').astype(np.int32)
+
+
+class CompactSeries:
+    __slots__ = ('days', 'nav')
+
+    def __init__(self, days, nav):
+        """
+        紧凑的净值序列: 只保存日期 (int32 天数) 与单元资产净值，
+        归一化净值、日收益率、累计收益率、滚动最大净值、回撤在 to_frame 时计算
+        """
+        self.days = days
+        self.nav = nav
+
+    @classmethod
+    def from_frame(cls, data, dtype=np.float64):
+        return cls(to_day_numbers(data['统计日期']), data['单元资产净值(净价)'].to_numpy(dtype=dtype))
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + self.nav.nbytes
+
+    def __len__(self):
+        return len(self.nav)
+
+    def extend(self, other):
+        """追加另一段序列，返回新的 CompactSeries"""
+        return CompactSeries(np.concatenate([self.days, other.days]),
+                             np.concatenate([self.nav, other.nav.astype(self.nav.dtype)]))
+
+    def to_frame(self):
+        """展开为与 calculate_performance_metrics 结果相同列的 DataFrame (派生列按 float64 计算)"""
+        nav = self.nav.astype(np.float64)
+        normalized = nav / nav[0]
+        returns = np.empty_like(normalized)
+        returns[0] = np.nan
+        returns[1:] = normalized[1:] / normalized[:-1] - 1
+        running_max = np.maximum.accumulate(normalized)
+        return pd.DataFrame({
+            '统计日期': (EPOCH + self.days).astype('datetime64[ns]'),
+            '单元资产净值(净价)': nav,
+            '归一化净值': normalized,
+            '日收益率': returns,
+            '累计收益率': normalized - 1,
+            '滚动最大净值': running_max,
+            '回撤': (normalized - running_max) / running_max
+        })
+
+
+class PeriodMetrics(Mapping):
+    __slots__ = tuple(METRIC_SLOTS.values())
+
+    def __init__(self, metrics):
+        """
+        单个时间段的业绩指标，以槽位保存，按只读字典方式访问 (metrics['夏普比率'])；
+        开始日期保存为天数，读取时转换为 Timestamp
+        """
+        for key, slot in METRIC_SLOTS.items():
+            value = metrics.get(key)
+            if value is not None:
+                if key == '开始日期':
+                    value = int(to_day_numbers([value])[0])
+                elif key == '数据天数':
+                    value = int(value)
+                else:
+                    value = float(value)
+            setattr(self, slot, value)
+
+    def __getitem__(self, key):
+        slot = METRIC_SLOTS.get(key)
+        value = getattr(self, slot) if slot is not None else None
+        if value is None:
+            raise KeyError(key)
+        if key == '开始日期':
+            return pd.Timestamp(EPOCH + value)
+        return value
+
+    def __iter__(self):
+        return (key for key, slot in METRIC_SLOTS.items() if getattr(self, slot) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"PeriodMetrics({dict(self)!r})"
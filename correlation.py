@@ -0,0 +1,201 @@
+import os
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.cluster.hierarchy import linkage, leaves_list
+    from scipy.spatial.distance import squareform
+except ImportError:
+    linkage = None
+
+
+def returns_matrix(series, dtype=np.float64):
+    """
+    将多个单元的日收益率对齐到日期并集
+
+    参数:
+    series: 单元标识 -> 包含 '统计日期' 与 '日收益率' 列的DataFrame，或 (日期数组, 日收益率数组)
+    dtype: 矩阵的浮点类型 (np.float32 内存减半)
+
+    返回:
+    (单元标识列表, 日期数组, 日期 × 单元 的日收益率矩阵，缺失为NaN)
+    """
+    labels = list(series.keys())
+    columns = []
+    for label in labels:
+        data = series[label]
+        if isinstance(data, tuple):
+            dates, values = data
+        else:
+            dates, values = data['统计日期'], data['日收益率']
+        columns.append((pd.to_datetime(dates).values.astype('datetime64[ns]'), np.asarray(values)))
+
+    all_dates = np.unique(np.concatenate([dates for dates, _ in columns])) if columns else np.array([], 'M8[ns]')
+    matrix = np.full((len(all_dates), len(labels)), np.nan, dtype=dtype)
+    for j, (dates, values) in enumerate(columns):
+        matrix[np.searchsorted(all_dates, dates), j] = values
+    return labels, all_dates, matrix
+
+
+def _correlation_block(x_i, x_j, min_periods):
+    """
+    计算两个列块之间的成对完整相关系数: 只使用两列都有数据的日期
+
+    参数:
+    x_i / x_j: 日期 × 列 的收益率块 (缺失为NaN)
+    min_periods: 共同数据点少于该值的列对返回NaN
+    """
+    # 缺失值置零，有效数据掩码以浮点参与矩阵乘法
+    m_i, m_j = (~np.isnan(x_i)).astype(x_i.dtype), (~np.isnan(x_j)).astype(x_j.dtype)
+    x_i, x_j = np.nan_to_num(x_i), np.nan_to_num(x_j)
+    sq_i, sq_j = x_i * x_i, x_j * x_j
+
+    # 每个列对在共同日期上的样本数、和、平方和与交叉积之和
+    n = m_i.T @ m_j
+    sum_i, sum_j = x_i.T @ m_j, m_i.T @ x_j
+    sum_ii, sum_jj = sq_i.T @ m_j, m_i.T @ sq_j
+    sum_ij = x_i.T @ x_j
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_ij - sum_i * sum_j / n
+        var_i = sum_ii - sum_i * sum_i / n
+        var_j = sum_jj - sum_j * sum_j / n
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[(n < max(min_periods, 2)) | ~(var_i > 0) | ~(var_j > 0)] = np.nan
+    return np.clip(corr, -1, 1, out=corr)
+
+
+def _compute_block(args):
+    (i, j), x_i, x_j, min_periods = args
+    return i, j, _correlation_block(x_i, x_j, min_periods)
+
+
+def correlation_matrix(returns, block_size=512, dtype=np.float64, min_periods=20, max_workers=1):
+    """
+    分块计算日收益率的成对完整相关系数矩阵 (缺失值按列对处理，与 DataFrame.corr 一致)
+
+    参数:
+    returns: 日期 × 单元 的日收益率矩阵 (缺失为NaN，可以是 float32)
+    block_size: 每块的单元数，单次矩阵乘法的中间结果为 block_size × block_size
+    dtype: 计算与结果的浮点类型 (np.float32 内存减半)
+    min_periods: 每个列对至少需要的共同数据点数
+    max_workers: 工作进程数 (1 表示在当前进程计算，None 表示CPU核数)
+
+    返回:
+    单元 × 单元 的相关系数矩阵 (数据不足的列对为NaN)
+    """
+    returns = np.asarray(returns)
+    n_units = returns.shape[1]
+    starts = range(0, n_units, block_size)
+
+    # 先减去各列均值再计算，降低 float32 下求和相消的误差 (平移不改变相关系数)；
+    # 均值与中心化都按列块进行，不复制整个矩阵
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        column_means = np.concatenate([np.nan_to_num(np.nanmean(returns[:, i:i + block_size], axis=0, dtype=np.float64))
+                                       for i in starts]) if n_units else np.zeros(0)
+
+    def centered(i):
+        return (returns[:, i:i + block_size].astype(np.float64) - column_means[i:i + block_size]).astype(dtype)
+
+    def tasks():
+        for i in starts:
+            x_i = centered(i)
+            for j in starts[i // block_size:]:
+                yield (i, j), x_i, x_i if j == i else centered(j), min_periods
+
+    result = np.full((n_units, n_units), np.nan, dtype=dtype)
+
+    def store(i, j, block):
+        result[i:i + block.shape[0], j:j + block.shape[1]] = block
+        result[j:j + block.shape[1], i:i + block.shape[0]] = block.T
+
+    n_blocks = len(starts) * (len(starts) + 1) // 2
+    if max_workers == 1 or n_blocks == 1:
+        for task in tasks():
+            store(*_compute_block(task))
+    else:
+        context = multiprocessing.get_context('spawn')
+        workers = min(max_workers or os.cpu_count() or 1, n_blocks)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            for i, j, block in executor.map(_compute_block, tasks(), chunksize=max(1, n_blocks // (workers * 4))):
+                store(i, j, block)
+    return result
+
+
+def top_pairs(corr, labels, k=20, block_size=1024):
+    """
+    相关系数最高的 k 个单元对 (按行分块选取候选，不展开整个上三角)
+
+    返回:
+    [(单元A, 单元B, 相关系数)] 按相关系数从高到低排列
+    """
+    n_units = corr.shape[0]
+    candidates = []
+    for start in range(0, n_units, block_size):
+        block = corr[start:start + block_size].astype(np.float64)
+        rows, cols = np.indices(block.shape)
+        keep = (cols > rows + start) & ~np.isnan(block)
+        values = block[keep]
+        if len(values) == 0:
+            continue
+        pick = np.argpartition(-values, min(k, len(values)) - 1)[:k] if len(values) > k else np.arange(len(values))
+        candidates.extend(zip(values[pick], (rows[keep] + start)[pick], cols[keep][pick]))
+
+    candidates.sort(key=lambda item: -item[0])
+    return [(labels[i], labels[j], float(value)) for value, i, j in candidates[:k]]
+
+
+def _single_linkage_order(distance):
+    """单链接层次聚类的叶节点顺序: Prim 最小生成树的边按距离依次合并簇 (O(n²))"""
+    n_units = distance.shape[0]
+    in_tree = np.zeros(n_units, dtype=bool)
+    best = np.full(n_units, np.inf)
+    parent = np.zeros(n_units, dtype=np.int64)
+    edges = []
+    current = 0
+    for _ in range(n_units - 1):
+        in_tree[current] = True
+        closer = ~in_tree & (distance[current] < best)
+        best[closer] = distance[current][closer]
+        parent[closer] = current
+        candidates = np.where(in_tree, np.inf, best)
+        nearest = int(np.argmin(candidates))
+        edges.append((candidates[nearest], parent[nearest], nearest))
+        current = nearest
+
+    # 按距离从小到大合并，每个簇保存其叶节点顺序
+    clusters = {i: [i] for i in range(n_units)}
+    owner = np.arange(n_units)
+    for _, a, b in sorted(edges):
+        root_a, root_b = owner[a], owner[b]
+        merged = clusters.pop(root_a) + clusters.pop(root_b)
+        owner[merged] = root_a
+        clusters[root_a] = merged
+    return [leaf for members in clusters.values() for leaf in members]
+
+
+def cluster_order(corr, method='average'):
+    """
+    按相关性距离 sqrt((1 - ρ)/2) 做层次聚类，返回叶节点顺序 (相近的单元排在一起)
+
+    参数:
+    corr: 相关系数矩阵 (NaN 视为不相关)
+    method: scipy 的链接方法；未安装 scipy 时退化为单链接 (最小生成树)
+
+    返回:
+    (叶节点下标列表, 实际使用的链接方法)
+    """
+    n_units = corr.shape[0]
+    if n_units < 2:
+        return list(range(n_units)), method
+    distance = np.sqrt(np.clip((1 - np.nan_to_num(corr.astype(np.float64), nan=0.0)) / 2, 0, 1))
+    np.fill_diagonal(distance, 0)
+    if linkage is None:
+        return _single_linkage_order(distance), 'single'
+    tree = linkage(squareform(distance, checks=False), method=method)
+    return leaves_list(tree).tolist(), method
@@ -1,36 +1,311 @@
-import pandas as pd
+import os
+import json
+import argparse
 import numpy as np
-from datetime import datetime, timedelta
-
-# 创建示例数据
-np.random.seed(42)
-start_date = datetime(2024, 1, 1)
-days = 250  # 一年的交易日
-
-# 生成日期序列
-dates = [start_date + timedelta(days=i) for i in range(days)]
-
-# 生成净值数据 (模拟正收益的净值曲线)
-initial_nav = 1.0
-daily_returns = np.random.normal(0.0005, 0.01, days)  # 日均收益率0.05%, 波动率1%
-nav_values = [initial_nav]
-
-for ret in daily_returns[1:]:
-    nav_values.append(nav_values[-1] * (1 + ret))
-
-# 创建DataFrame
-df = pd.DataFrame({
-    '统计日期': dates,
-    '单元资产净值(净价)': nav_values
-})
-
-# 保存到Excel
-output_file = "示例投资数据.xlsx"
-with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-    df.to_excel(writer, sheet_name='单元资产2025', index=False)
-
-print(f"示例数据已创建: {output_file}")
-print(f"数据范围: {df['统计日期'].min()} 到 {df['统计日期'].max()}")
-print(f"起始净值: {df['单元资产净值(净价)'].iloc[0]:.4f}")
-print(f"最终净值: {df['单元资产净值(净价)'].iloc[-1]:.4f}")
-print(f"总收益率: {(df['单元资产净值(净价)'].iloc[-1] / df['单元资产净值(净价)'].iloc[0] - 1):.2%}")
+import pandas as pd
+
+# 市场状态: 名称 -> (日均收益率, 日波动率)
+REGIMES = {
+    '牛市': (0.0008, 0.008),
+    '震荡': (0.0002, 0.010),
+    '熊市': (-0.0007, 0.016)
+}
+
+# 暴跌情景: 持续天数范围与期间的日均收益率、日波动率
+CRASH_DAYS = (3, 10)
+CRASH_RETURN = (-0.025, 0.03)
+
+# 二进制存储的记录格式 (日期为自 1970-01-01 起的天数)
+BINARY_DTYPE = np.dtype([('portfolio', '<i4'), ('date', '<i4'), ('nav', '<f8')])
+
+
+def sample_data():
+    """原示例数据: 2024-01-01 起 250 个自然日，日均收益率0.05%、波动率1%，固定随机种子"""
+    np.random.seed(42)
+    days = 250
+    daily_returns = np.random.normal(0.0005, 0.01, days)
+    daily_returns[0] = 0.0
+    return pd.DataFrame({
+        '统计日期': pd.date_range('2024-01-01', periods=days),
+        '单元资产净值(净价)': np.cumprod(1 + daily_returns)
+    })
+
+
+def cn_holidays(first_year, last_year):
+    """简化的A股休市日 (元旦、劳动节 5月1-3日、国庆节 10月1-7日)"""
+    holidays = []
+    for year in range(first_year, last_year + 1):
+        holidays.append(np.datetime64(f'{year}-01-01'))
+        holidays.extend(np.datetime64(f'{year}-05-01') + np.arange(3))
+        holidays.extend(np.datetime64(f'{year}-10-01') + np.arange(7))
+    return np.array(holidays, dtype='datetime64[D]')
+
+
+class SeriesGenerator:
+    def __init__(self, seed, regime_days=120, crash_rate=0.0, gap_rate=0.0, initial_nav=1.0):
+        """
+        单个组合的合成净值序列，按块生成 (市场状态、暴跌与净值在块之间延续)
+
+        市场状态、收益率、暴跌与数据缺失各用一条由 seed 派生的独立随机流，每条流每个交易日固定抽取一个数，
+        因此生成结果与分块大小无关
+
+        参数:
+        seed: numpy SeedSequence (或整数种子)
+        regime_days: 市场状态的平均持续交易日数 (为0时不切换，始终为 '震荡')
+        crash_rate: 每年发生暴跌的期望次数
+        gap_rate: 每个交易日数据缺失的概率
+        initial_nav: 初始净值
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.regime_rng, self.return_rng, self.crash_rng, self.gap_rng = \
+            (np.random.default_rng(child) for child in seed.spawn(4))
+        self.regime_days = regime_days
+        self.crash_rate = crash_rate
+        self.gap_rate = gap_rate
+        self.mu = np.array([mu for mu, _ in REGIMES.values()])
+        self.sigma = np.array([sigma for _, sigma in REGIMES.values()])
+
+        self.offset = 0  # 已生成的交易日数
+        self.nav = initial_nav
+        self.regime = list(REGIMES).index('震荡')
+        self.crash_left = 0
+
+    def _regimes(self, n):
+        """
+        各交易日的市场状态编号: 每日以 1/regime_days 的概率切换 (持续期服从几何分布)，
+        切换到其余状态之一 (由同一个均匀随机数决定)
+        """
+        if not self.regime_days:
+            return np.full(n, self.regime)
+        u = self.regime_rng.random(n)
+        p = 1 / self.regime_days
+        switch = u < p
+        steps = np.where(switch, 1 + np.minimum((u / p * (len(REGIMES) - 1)).astype(np.int64), len(REGIMES) - 2), 0)
+        regimes = (self.regime + np.cumsum(steps)) % len(REGIMES)
+        self.regime = int(regimes[-1]) if n else self.regime
+        return regimes
+
+    def _crashes(self, n):
+        """处于暴跌情景的交易日掩码 (暴跌开始日按每日概率抽取，持续天数由同一个均匀随机数决定)"""
+        active = np.zeros(n + 1, dtype=np.int64)
+        active[0] += 1 if self.crash_left else 0
+        active[min(self.crash_left, n)] -= 1 if self.crash_left else 0
+        self.crash_left = max(self.crash_left - n, 0)
+        if self.crash_rate:
+            u = self.crash_rng.random(n)
+            p = self.crash_rate / 252
+            starts = np.flatnonzero(u < p)
+            spread = CRASH_DAYS[1] - CRASH_DAYS[0] + 1
+            lengths = CRASH_DAYS[0] + np.minimum((u[starts] / p * spread).astype(np.int64), spread - 1)
+            ends = starts + lengths
+            np.add.at(active, starts, 1)
+            np.add.at(active, np.minimum(ends, n), -1)
+            if len(ends):
+                self.crash_left = max(self.crash_left, int(ends.max()) - n)
+        return np.cumsum(active[:n]) > 0
+
+    def next_chunk(self, dates):
+        """生成接下来各交易日 dates 的净值，返回 (日期, 净值)，已剔除缺失的交易日"""
+        n = len(dates)
+        regimes = self._regimes(n)
+        noise = self.return_rng.standard_normal(n)
+        returns = self.mu[regimes] + self.sigma[regimes] * noise
+        crash = self._crashes(n)
+        # 暴跌期间的收益率使用当日同一个标准正态随机数
+        returns[crash] = CRASH_RETURN[0] + CRASH_RETURN[1] * noise[crash]
+        returns = np.maximum(returns, -0.5)
+        keep = self.gap_rng.random(n) >= self.gap_rate if self.gap_rate else np.ones(n, dtype=bool)
+        if self.offset == 0 and n:
+            returns[0] = 0.0
+            keep[0] = True
+
+        # 从上一块的最后净值起逐日连乘 (与一次生成全部交易日的运算顺序相同)
+        nav = np.cumprod(np.concatenate([[self.nav], 1 + returns]))[1:]
+        self.nav = nav[-1] if n else self.nav
+        self.offset += n
+        return dates[keep], nav[keep]
+
+
+def trading_dates(start, n, holidays=None):
+    """从 start 起 (遇休市日顺延) 的 n 个交易日"""
+    calendar = np.busdaycalendar(holidays=[] if holidays is None else holidays)
+    first = np.busday_offset(np.datetime64(start, 'D'), 0, roll='forward', busdaycal=calendar)
+    return np.busday_offset(first, np.arange(n), busdaycal=calendar)
+
+
+def generate(n_portfolios=1, n_rows=2520, seed=0, chunk_size=100_000, start='2015-01-05',
+             holidays='cn', regime_days=120, crash_rate=0.0, gap_rate=0.0):
+    """
+    逐块生成多个组合的合成净值，每次产出 (组合ID, DataFrame)，内存占用只与块大小有关
+
+    参数:
+    n_portfolios: 组合数
+    n_rows: 每个组合的交易日数 (缺失率 gap_rate 会使实际行数略少)
+    seed: 随机种子 (每个组合由 SeedSequence 派生独立的随机流，结果可复现)
+    chunk_size: 每块的交易日数 (只影响内存占用，不影响生成结果)
+    holidays: 'cn' 使用简化的A股休市日，None 只排除周末，或传入日期列表
+    regime_days / crash_rate / gap_rate: 见 SeriesGenerator
+    """
+    first_year = pd.Timestamp(start).year
+    last_year = first_year + n_rows // 240 + 1
+    if last_year > 2261:
+        raise ValueError(f"{n_rows} 个交易日超出 pandas 支持的日期范围，请减少行数或提前起始日期")
+    if isinstance(holidays, str):
+        holidays = cn_holidays(first_year, last_year)
+    # 所有组合共用同一交易日历 (最多约14万个交易日，8字节/天)
+    dates = trading_dates(start, n_rows, holidays).astype('datetime64[ns]')
+
+    width = len(str(n_portfolios - 1))
+    for index, child in enumerate(np.random.SeedSequence(seed).spawn(n_portfolios)):
+        portfolio_id = f'P{index:0{width}d}'
+        generator = SeriesGenerator(child, regime_days=regime_days,
+                                    crash_rate=crash_rate, gap_rate=gap_rate)
+        for chunk_start in range(0, n_rows, chunk_size):
+            chunk_dates, nav = generator.next_chunk(dates[chunk_start:chunk_start + chunk_size])
+            yield portfolio_id, pd.DataFrame({
+                '统计日期': chunk_dates,
+                '单元资产净值(净价)': nav
+            })
+
+
+def _with_id(portfolio_id, chunk):
+    chunk = chunk.copy()
+    chunk.insert(0, '组合ID', portfolio_id)
+    return chunk
+
+
+def write_xlsx(chunks, output_dir, single_file=None):
+    """每个组合写出一个 <组合ID>.xlsx (工作表 '单元资产2025')，以只写模式流式写出"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from excel_writer import DATE_FORMAT
+
+    def save(workbook, portfolio_id):
+        workbook.save(single_file or os.path.join(output_dir, f'{portfolio_id}.xlsx'))
+
+    workbook = worksheet = current = None
+    for portfolio_id, chunk in chunks:
+        if portfolio_id != current:
+            if workbook is not None:
+                save(workbook, current)
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet('单元资产2025')
+            worksheet.append(list(chunk.columns))
+            current = portfolio_id
+        for date, nav in zip(chunk['统计日期'].dt.to_pydatetime(), chunk['单元资产净值(净价)'].tolist()):
+            cell = WriteOnlyCell(worksheet, value=date)
+            cell.number_format = DATE_FORMAT
+            worksheet.append([cell, nav])
+    if workbook is not None:
+        save(workbook, current)
+
+
+def write_csv(chunks, path, with_id):
+    """所有组合写入一个CSV (多组合时带 组合ID 列)"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        header = True
+        for portfolio_id, chunk in chunks:
+            if with_id:
+                chunk = _with_id(portfolio_id, chunk)
+            chunk.to_csv(f, header=header, index=False, date_format='%Y-%m-%d')
+            header = False
+    return path
+
+
+def write_parquet(chunks, path, with_id):
+    """所有组合写入一个Parquet文件 (每块一个 row group)；未安装 pyarrow 时改为 CSV，返回实际路径"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("未安装pyarrow，改为导出CSV")
+        return write_csv(chunks, path.rsplit('.', 1)[0] + '.csv', with_id)
+
+    writer = None
+    try:
+        for portfolio_id, chunk in chunks:
+            if with_id:
+                chunk = _with_id(portfolio_id, chunk)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def write_binary(chunks, path):
+    """
+    追加写出定长二进制记录 (BINARY_DTYPE: 组合序号、日期天数、净值)，
+    另写 <path>.json 记录格式与组合ID列表，可用 np.memmap(path, dtype=BINARY_DTYPE) 读取
+    """
+    portfolio_ids = []
+    with open(path, 'wb') as f:
+        for portfolio_id, chunk in chunks:
+            if not portfolio_ids or portfolio_ids[-1] != portfolio_id:
+                portfolio_ids.append(portfolio_id)
+            records = np.empty(len(chunk), dtype=BINARY_DTYPE)
+            records['portfolio'] = len(portfolio_ids) - 1
+            records['date'] = chunk['统计日期'].values.astype('datetime64[D]').astype(np.int64)
+            records['nav'] = chunk['单元资产净值(净价)'].to_numpy()
+            f.write(records.tobytes())
+    with open(path + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'dtype': BINARY_DTYPE.descr, 'portfolios': portfolio_ids}, f, ensure_ascii=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成示例/合成投资净值数据")
+    parser.add_argument('--rows', type=int, help="每个组合的交易日数 (不指定时生成原250行示例数据)")
+    parser.add_argument('--portfolios', type=int, default=1, help="组合数")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--start', default='2015-01-05', help="起始日期")
+    parser.add_argument('--format', choices=['xlsx', 'csv', 'parquet', 'bin'], default='xlsx', help="输出格式")
+    parser.add_argument('--output', help="输出文件 (xlsx 多组合时为目录)")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="每块生成与写出的交易日数")
+    parser.add_argument('--regime-days', type=int, default=120, help="市场状态平均持续交易日数 (0 表示不切换)")
+    parser.add_argument('--crash-rate', type=float, default=0.0, help="每年暴跌情景的期望次数")
+    parser.add_argument('--gap-rate', type=float, default=0.0, help="交易日数据缺失概率")
+    parser.add_argument('--no-holidays', action='store_true', help="只排除周末，不排除节假日")
+    args = parser.parse_args()
+
+    if args.rows is None and args.portfolios == 1 and args.format == 'xlsx':
+        # 创建示例数据
+        df = sample_data()
+        output_file = args.output or "示例投资数据.xlsx"
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name='单元资产2025', index=False)
+
+        print(f"示例数据已创建: {output_file}")
+        print(f"数据范围: {df['统计日期'].min()} 到 {df['统计日期'].max()}")
+        print(f"起始净值: {df['单元资产净值(净价)'].iloc[0]:.4f}")
+        print(f"最终净值: {df['单元资产净值(净价)'].iloc[-1]:.4f}")
+        print(f"总收益率: {(df['单元资产净值(净价)'].iloc[-1] / df['单元资产净值(净价)'].iloc[0] - 1):.2%}")
+        return
+
+    chunks = generate(args.portfolios, args.rows or 2520, seed=args.seed, chunk_size=args.chunk_size,
+                      start=args.start, holidays=None if args.no_holidays else 'cn',
+                      regime_days=args.regime_days, crash_rate=args.crash_rate, gap_rate=args.gap_rate)
+    with_id = args.portfolios > 1
+    if args.format == 'xlsx':
+        if with_id:
+            output = args.output or '合成数据'
+            os.makedirs(output, exist_ok=True)
+            write_xlsx(chunks, output)
+        else:
+            output = args.output or '合成数据.xlsx'
+            write_xlsx(chunks, None, single_file=output)
+    elif args.format == 'csv':
+        output = write_csv(chunks, args.output or '合成数据.csv', with_id)
+    elif args.format == 'parquet':
+        output = write_parquet(chunks, args.output or '合成数据.parquet', with_id)
+    else:
+        output = write_binary(chunks, args.output or '合成数据.bin')
+    print(f"合成数据已创建: {output} ({args.portfolios} 个组合，每个 {args.rows or 2520} 个交易日)")
+
+
+if __name__ == "__main__":
+    main()
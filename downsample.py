@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的下标 (含首尾点)
+
+    参数:
+    y: 数值序列 (x 轴按等间距处理)
+    n_out: 目标点数
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 1)]
+
+    x = np.arange(n, dtype=np.float64)
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for b in range(n_out - 2):
+        start = int(b * every) + 1
+        end = int((b + 1) * every) + 1
+        next_end = min(int((b + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[b + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def minmax_indices(y, bucket):
+    """最小/最大值分桶降采样: 每个桶保留最小值与最大值所在的点，返回排序后的下标"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_buckets = -(-n // bucket)
+    padded = np.full(n_buckets * bucket, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(n_buckets, bucket)
+    offsets = np.arange(n_buckets) * bucket
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    return np.unique(np.concatenate([lows, highs, [n - 1]]))
+
+
+class DownsamplePyramid:
+    def __init__(self, data, min_points=256):
+        """
+        净值曲线的降采样金字塔: 第 k 层按 2^(k+1) 行分桶保留最小/最大值，约 n/2^k 个点，
+        构建一次后任意日期范围的查询只需选层 + searchsorted
+
+        参数:
+        data: 已执行 calculate_performance_metrics 的DataFrame
+        min_points: 最粗一层的点数下限
+        """
+        self.dates = pd.to_datetime(data['统计日期']).values.astype('datetime64[ns]')
+        self.nav = data['归一化净值'].to_numpy(dtype=np.float64)
+        # 保存滚动最大净值而非回撤: 两者可互相推出，按 calculate_performance_metrics 的公式可精确还原回撤
+        self.running_max = data['滚动最大净值'].to_numpy(dtype=np.float64)
+
+        n = len(self.nav)
+        self.levels = [np.arange(n)]
+        bucket = 4
+        while n / bucket * 2 > min_points:
+            self.levels.append(minmax_indices(self.nav, bucket))
+            bucket *= 2
+
+    @property
+    def nbytes(self):
+        return self.dates.nbytes + self.nav.nbytes + self.running_max.nbytes + sum(level.nbytes for level in self.levels)
+
+    def frame(self, rows, nav):
+        """
+        由保存的数组生成选中行的分析数据 (列与 calculate_performance_metrics 的结果相同，索引为行号)，
+        紧凑模式下无需展开整个序列
+
+        参数:
+        rows: select 返回的行号
+        nav: 这些行的单元资产净值(净价)
+        """
+        normalized = self.nav[rows]
+        running_max = self.running_max[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.where(rows > 0, normalized / self.nav[np.maximum(rows - 1, 0)] - 1, np.nan)
+        return pd.DataFrame({
+            '统计日期': self.dates[rows],
+            '单元资产净值(净价)': np.asarray(nav, dtype=np.float64),
+            '归一化净值': normalized,
+            '日收益率': returns,
+            '累计收益率': normalized - 1,
+            '滚动最大净值': running_max,
+            '回撤': (normalized - running_max) / running_max
+        }, index=rows)
+
+    def select(self, start=None, end=None, max_points=None):
+        """
+        返回 [start, end] 日期范围内降采样后的行号 (升序)，
+        始终保留范围内的首尾点 (最新点) 与最大回撤的谷底
+        """
+        i = 0 if start is None else int(np.searchsorted(self.dates, pd.Timestamp(start).to_datetime64(), side='left'))
+        j = len(self.dates) - 1 if end is None else \
+            int(np.searchsorted(self.dates, pd.Timestamp(end).to_datetime64(), side='right')) - 1
+        if j < i:
+            return np.array([], dtype=np.int64)
+        if max_points is None or j - i + 1 <= max_points:
+            return np.arange(i, j + 1)
+
+        nav, running_max = self.nav[i:j + 1], self.running_max[i:j + 1]
+        trough = i + int(np.argmin((nav - running_max) / running_max))
+        budget = max(max_points - 3, 1)
+        # 从细到粗选择第一层点数不超过预算的层
+        selected = None
+        for level in self.levels:
+            lo = np.searchsorted(level, i, side='left')
+            hi = np.searchsorted(level, j, side='right')
+            if hi - lo <= budget:
+                selected = level[lo:hi]
+                break
+        if selected is None:
+            # 最粗一层仍超出预算时，对该层再做 LTTB
+            coarsest = self.levels[-1]
+            candidates = coarsest[np.searchsorted(coarsest, i):np.searchsorted(coarsest, j, side='right')]
+            selected = candidates[lttb_indices(self.nav[candidates], budget)]
+        return np.unique(np.concatenate([selected, [i, trough, j]]))
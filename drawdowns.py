@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# 回撤事件: 峰值、谷底、恢复日的行号 (未恢复为 -1) 与回撤幅度
+EPISODE_DTYPE = np.dtype([('peak', '<i4'), ('trough', '<i4'), ('recovery', '<i4'), ('depth', '<f8')])
+
+
+def extract_episodes(drawdown):
+    """
+    一次线性扫描提取全部回撤事件: 回撤为0的行即滚动最大净值处 (新高)，
+    连续的水下区间为一次回撤，区间前一行为峰值，其后第一个新高为恢复日
+
+    参数:
+    drawdown: '回撤' 列 (按日期升序)
+
+    返回:
+    EPISODE_DTYPE 结构化数组 (按峰值日期排序)
+    """
+    drawdown = np.asarray(drawdown, dtype=np.float64)
+    underwater = drawdown < 0
+    # 水下区间的起止位置
+    edges = np.diff(np.concatenate([[False], underwater, [False]]).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)  # 区间后第一行 (恢复日)，等于 n 表示尚未恢复
+
+    episodes = np.empty(len(starts), dtype=EPISODE_DTYPE)
+    if len(starts) == 0:
+        return episodes
+
+    # 各区间的最低回撤及其首次出现的位置
+    depth = np.minimum.reduceat(drawdown, starts)
+    # reduceat 的分段包含区间之间的非水下行 (回撤为0)，不影响最小值
+    segment = np.cumsum(edges[:-1] == 1) - 1
+    rows = np.flatnonzero(underwater & (drawdown == depth[np.maximum(segment, 0)]))
+    _, first = np.unique(segment[rows], return_index=True)
+
+    episodes['peak'] = np.maximum(starts - 1, 0)
+    episodes['trough'] = rows[first]
+    episodes['recovery'] = np.where(ends < len(drawdown), ends, -1)
+    episodes['depth'] = depth
+    return episodes
+
+
+class DrawdownIndex:
+    def __init__(self, data):
+        """
+        回撤事件索引: 构建时提取一次，之后按幅度取前k个或按日期范围查询都不再扫描分析数据
+
+        参数:
+        data: 已执行 calculate_performance_metrics 的DataFrame
+        """
+        self.dates = data['统计日期'].values.astype('datetime64[ns]')
+        self.episodes = extract_episodes(data['回撤'].to_numpy())
+        self.last_row = len(self.dates) - 1
+        # 按幅度从深到浅的顺序，以及各事件结束行 (未恢复的事件到最后一行)，用于二分查找
+        self.by_depth = np.argsort(self.episodes['depth'], kind='stable')
+        self.end_rows = np.where(self.episodes['recovery'] >= 0, self.episodes['recovery'], self.last_row)
+
+    def __len__(self):
+        return len(self.episodes)
+
+    @property
+    def nbytes(self):
+        return self.episodes.nbytes + self.by_depth.nbytes + self.end_rows.nbytes
+
+    def top(self, k=None):
+        """回撤幅度最大的 k 个事件 (为空表示全部)，从深到浅排列"""
+        return self.episodes[self.by_depth[:k]]
+
+    def between(self, start=None, end=None):
+        """与 [start, end] 日期范围有重叠的事件，按峰值日期排列"""
+        lo = 0 if start is None else int(np.searchsorted(
+            self.end_rows, np.searchsorted(self.dates, pd.Timestamp(start).to_datetime64(), side='left')))
+        hi = len(self.episodes) if end is None else int(np.searchsorted(
+            self.episodes['peak'], np.searchsorted(self.dates, pd.Timestamp(end).to_datetime64(), side='right') - 1,
+            side='right'))
+        return self.episodes[lo:max(lo, hi)]
+
+    def to_records(self, episodes):
+        """
+        转换为字典列表: 峰值/谷底/恢复日期、回撤幅度，以及下跌、恢复与持续的交易日数
+        (未恢复的事件恢复日期与恢复天数为None，持续天数计到最后一条数据)
+        """
+        records = []
+        for peak, trough, recovery, depth in episodes.tolist():
+            recovered = recovery >= 0
+            records.append({
+                '峰值日期': pd.Timestamp(self.dates[peak]),
+                '谷底日期': pd.Timestamp(self.dates[trough]),
+                '恢复日期': pd.Timestamp(self.dates[recovery]) if recovered else None,
+                '回撤幅度': depth,
+                '下跌天数': trough - peak,
+                '恢复天数': recovery - trough if recovered else None,
+                '持续天数': (recovery if recovered else self.last_row) - peak
+            })
+        return records
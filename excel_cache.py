@@ -0,0 +1,108 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+
+
+def cache_path_for(data_file, sheet_name):
+    """缓存文件与工作簿放在同一目录: .<工作簿名>.<sheet名>.cache.npz"""
+    directory, filename = os.path.split(os.path.abspath(data_file))
+    return os.path.join(directory, f".{filename}.{sheet_name}.cache.npz")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_file):
+    """读取缓存文件，返回 (元数据, 日期int64数组, 净值float64数组)，失败返回None"""
+    try:
+        with np.load(cache_file, allow_pickle=False) as cache:
+            meta = {
+                'version': int(cache['version']),
+                'path': str(cache['path']),
+                'mtime_ns': int(cache['mtime_ns']),
+                'size': int(cache['size']),
+                'sha256': str(cache['sha256'])
+            }
+            return meta, cache['dates'], cache['nav']
+    except Exception:
+        return None
+
+
+def _write_cache(cache_file, meta, dates, nav):
+    """写入缓存 (先写临时文件再替换，避免读到半写入的文件)"""
+    tmp_file = cache_file + '.tmp.npz'
+    try:
+        np.savez(tmp_file,
+                 version=np.int64(CACHE_VERSION),
+                 path=np.str_(meta['path']),
+                 mtime_ns=np.int64(meta['mtime_ns']),
+                 size=np.int64(meta['size']),
+                 sha256=np.str_(meta['sha256']),
+                 dates=dates,
+                 nav=nav)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"缓存写入失败: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _to_frame(dates, nav):
+    return pd.DataFrame({
+        '统计日期': pd.to_datetime(dates.astype('datetime64[ns]')),
+        '单元资产净值(净价)': nav
+    })
+
+
+def read_excel_cached(data_file, sheet_name='单元资产2025'):
+    """
+    读取工作簿中的净值数据，优先使用列式二进制缓存
+
+    缓存以 文件路径 + 修改时间 + 内容哈希 为键: 路径/修改时间/大小一致时直接使用缓存；
+    修改时间变化但内容哈希一致时仅刷新缓存元数据；内容变化时重新解析Excel并重建缓存。
+    缓存中只保存 '统计日期' (int64 纳秒) 与 '单元资产净值(净价)' (float64) 两列，工作表中的其他列不会返回。
+
+    参数:
+    data_file: Excel文件路径
+    sheet_name: 工作表名称
+    """
+    path = os.path.abspath(data_file)
+    stat = os.stat(path)
+    cache_file = cache_path_for(path, sheet_name)
+
+    cached = _read_cache(cache_file) if os.path.exists(cache_file) else None
+    digest = None
+    if cached is not None:
+        meta, dates, nav = cached
+        if meta['version'] == CACHE_VERSION and meta['path'] == path and meta['size'] == stat.st_size:
+            if meta['mtime_ns'] == stat.st_mtime_ns:
+                return _to_frame(dates, nav)
+            # 修改时间变化 (如复制、touch)，内容未变时复用缓存
+            digest = file_digest(path)
+            if meta['sha256'] == digest:
+                meta['mtime_ns'] = stat.st_mtime_ns
+                _write_cache(cache_file, meta, dates, nav)
+                return _to_frame(dates, nav)
+
+    # 缓存不存在或已失效: 解析Excel并重建缓存
+    data = pd.read_excel(path, sheet_name=sheet_name, usecols=['统计日期', '单元资产净值(净价)'],
+                         dtype={'单元资产净值(净价)': np.float64})
+    dates = pd.to_datetime(data['统计日期']).values.astype('datetime64[ns]').astype(np.int64)
+    nav = data['单元资产净值(净价)'].to_numpy(dtype=np.float64)
+    meta = {
+        'path': path,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest or file_digest(path)
+    }
+    _write_cache(cache_file, meta, dates, nav)
+    return _to_frame(dates, nav)
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+# 业绩指标表各列的单元格格式
+METRICS_FORMATS = {
+    '总收益率': '0.0000%',
+    '年化收益率': '0.0000%',
+    '年化波动率': '0.0000%',
+    '夏普比率': '0.0000',
+    '最大回撤': '0.0000%',
+    '卡玛比率': '0.0000',
+    '数据天数': '0',
+    '开始日期': 'yyyy-mm-dd',
+    '基准收益率': '0.0000%',
+    '超额收益率': '0.0000%',
+    '贝塔': '0.0000',
+    '阿尔法': '0.0000%',
+    '跟踪误差': '0.0000%',
+    '信息比率': '0.0000',
+    '上行捕获率': '0.0000',
+    '下行捕获率': '0.0000',
+    '峰值日期': 'yyyy-mm-dd',
+    '谷底日期': 'yyyy-mm-dd',
+    '恢复日期': 'yyyy-mm-dd',
+    '回撤幅度': '0.0000%'
+}
+
+DATE_FORMAT = 'yyyy-mm-dd'
+
+
+def apply_metrics_formats(worksheet, columns):
+    """为 pandas 写出的业绩指标表设置百分比/小数/日期格式 (表头在第1行)"""
+    for col_idx, column in enumerate(columns, start=1):
+        number_format = METRICS_FORMATS.get(column)
+        if number_format is None:
+            continue
+        for row in worksheet.iter_rows(min_row=2, min_col=col_idx, max_col=col_idx):
+            for cell in row:
+                cell.number_format = number_format
+
+
+def _formatted_cell(worksheet, value, number_format):
+    from openpyxl.cell import WriteOnlyCell
+    cell = WriteOnlyCell(worksheet, value=value)
+    cell.number_format = number_format
+    return cell
+
+
+def _write_data_rows(worksheet, data, chunk_size):
+    """按块写出分析数据: 日期列使用原生日期格式，数值列写原始浮点数"""
+    from openpyxl.cell import WriteOnlyCell
+    columns = list(data.columns)
+    worksheet.append(columns)
+
+    date_columns = [pd.api.types.is_datetime64_any_dtype(data[c]) for c in columns]
+    for start in range(0, len(data), chunk_size):
+        chunk = data.iloc[start:start + chunk_size]
+        values = []
+        for column, is_date in zip(columns, date_columns):
+            series = chunk[column]
+            if is_date:
+                values.append([None if pd.isna(v) else v.to_pydatetime() for v in series])
+            elif pd.api.types.is_float_dtype(series):
+                # NaN 写为空单元格
+                array = series.to_numpy(dtype=np.float64)
+                values.append([None if v != v else v for v in array.tolist()])
+            else:
+                values.append(series.tolist())
+
+        for row in zip(*values):
+            cells = []
+            for value, is_date in zip(row, date_columns):
+                if is_date and value is not None:
+                    cell = WriteOnlyCell(worksheet, value=value)
+                    cell.number_format = DATE_FORMAT
+                    cells.append(cell)
+                else:
+                    cells.append(value)
+            worksheet.append(cells)
+
+
+def _write_formatted_rows(worksheet, rows):
+    """写出字典列表 (首行为列名)，数值单元格按 METRICS_FORMATS 设置格式"""
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    worksheet.append(columns)
+    for values in rows:
+        row = []
+        for column in columns:
+            value = values.get(column)
+            number_format = METRICS_FORMATS.get(column)
+            if value is None or number_format is None:
+                row.append(value)
+            else:
+                if isinstance(value, pd.Timestamp):
+                    value = value.to_pydatetime()
+                row.append(_formatted_cell(worksheet, value, number_format))
+        worksheet.append(row)
+
+
+def write_streaming_workbook(output_excel, data, metrics_rows, calculation_details, chunk_size=10000,
+                             drawdown_rows=None):
+    """
+    以 openpyxl 只写模式流式写出结果工作簿，内存占用不随数据行数增长
+
+    参数:
+    output_excel: 输出文件路径
+    data: 分析数据 (为None时不写 '分析数据' 表)
+    metrics_rows: 业绩指标行 (字典列表，数值为原始数字)
+    calculation_details: 计算参数 {'参数': [...], '数值': [...]}
+    chunk_size: 每次写出的行数
+    drawdown_rows: 回撤事件行 (字典列表，为空时不写 '回撤事件' 表)
+    """
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+
+    if data is not None:
+        _write_data_rows(workbook.create_sheet('分析数据'), data, chunk_size)
+
+    _write_formatted_rows(workbook.create_sheet('业绩指标'), metrics_rows)
+    if drawdown_rows:
+        _write_formatted_rows(workbook.create_sheet('回撤事件'), drawdown_rows)
+
+    worksheet = workbook.create_sheet('计算参数')
+    worksheet.append(list(calculation_details.keys()))
+    for row in zip(*calculation_details.values()):
+        worksheet.append(list(row))
+
+    workbook.save(output_excel)
+
+
+def export_data_file(data, path, data_format):
+    """
+    将分析数据导出为 CSV 或 Parquet (大数据量时替代Excel中的 '分析数据' 表)；
+    未安装 pyarrow 时 Parquet 改为 CSV，返回实际写出的文件路径
+    """
+    if data_format == 'parquet':
+        try:
+            data.to_parquet(path, index=False)
+            return path
+        except ImportError:
+            print("未安装pyarrow，分析数据改为导出CSV")
+            path = path.rsplit('.', 1)[0] + '.csv'
+    data.to_csv(path, index=False, encoding='utf-8-sig', date_format='%Y-%m-%d')
+    return path
@@ -0,0 +1,170 @@
+import os
+import time
+import uuid
+import shutil
+import pickle
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from rendering import init_worker
+
+# 导出文件名 (每个任务一个独立目录，避免并发导出相互覆盖)
+REPORT_EXCEL = "投资业绩分析报告.xlsx"
+REPORT_PNG = "净值曲线图.png"
+REPORT_HTML = "净值曲线图.html"
+
+
+def run_export(payload, output_dir):
+    """在工作进程中生成报告，返回生成的文件路径"""
+    analyzer = pickle.loads(payload)
+    os.makedirs(output_dir, exist_ok=True)
+    files = {
+        'excel': os.path.join(output_dir, REPORT_EXCEL),
+        'png': os.path.join(output_dir, REPORT_PNG),
+        'html': os.path.join(output_dir, REPORT_HTML)
+    }
+    analyzer.save_results(output_excel=files['excel'], chart_png=files['png'], chart_html=files['html'])
+    return files
+
+
+def data_hash(analyzer):
+    """分析数据与参数的哈希，相同数据的导出请求共用同一个任务"""
+    digest = hashlib.sha256()
+    columns = analyzer.data[['统计日期', '单元资产净值(净价)']]
+    digest.update(pd.util.hash_pandas_object(columns, index=False).values.tobytes())
+    digest.update(repr((analyzer.risk_free_rate, analyzer.days_trade, analyzer.chart_title)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ExportJob:
+    def __init__(self, job_id, key, output_dir):
+        self.job_id = job_id
+        self.key = key
+        self.output_dir = output_dir
+        self.future = None
+        self.files = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def status(self):
+        """pending / running / done / failed"""
+        if self.error is not None:
+            return 'failed'
+        if self.files is not None:
+            return 'done'
+        if self.future is not None and self.future.running():
+            return 'running'
+        return 'pending'
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class ExportJobManager:
+    def __init__(self, output_root='exports', max_workers=2, max_pending=16, max_jobs=100):
+        """
+        异步导出任务管理: 有界进程池生成报告，按数据哈希去重
+
+        参数:
+        output_root: 导出文件根目录 (每个任务一个子目录)
+        max_workers: 工作进程数
+        max_pending: 排队与运行中任务的上限，超出后拒绝新任务
+        max_jobs: 保留的任务记录数，超出后清理最早完成的任务及其文件
+        """
+        self.output_root = output_root
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        # 首次提交时才启动进程池；使用 spawn 避免在多线程服务中 fork
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker
+            )
+        return self._executor
+
+    def submit(self, analyzer, prefix=None):
+        """
+        提交导出任务，返回 (任务, 是否新建)；队列已满时返回 (None, False)；
+        序列化或提交到进程池失败时任务标记为失败并重新抛出异常
+
+        参数:
+        analyzer: 已计算指标的分析器 (提交时即序列化快照，之后的数据变化不影响该任务)
+        prefix: 去重键前缀 (如组合ID)
+        """
+        key = f"{prefix or ''}:{data_hash(analyzer)}"
+        with self._lock:
+            existing = self._by_key.get(key)
+            if existing is not None and existing.status != 'failed' and \
+                    (existing.files is None or os.path.exists(existing.files['excel'])):
+                return existing, False
+
+            active = sum(1 for job in self._jobs.values() if job.status in ('pending', 'running'))
+            if active >= self.max_pending:
+                return None, False
+
+            job_id = uuid.uuid4().hex
+            job = ExportJob(job_id, key, os.path.join(self.output_root, job_id))
+            self._jobs[job_id] = job
+            self._by_key[key] = job
+            self._prune()
+
+        try:
+            payload = pickle.dumps(analyzer)
+            job.future = self._get_executor().submit(run_export, payload, job.output_dir)
+        except Exception as e:
+            # 提交失败的任务标记为失败: 不再被去重复用，也不占用排队名额
+            with self._lock:
+                job.error = f"提交导出任务失败: {e}"
+                job.finished_at = time.time()
+                if isinstance(e, BrokenProcessPool):
+                    self._executor = None  # 进程池已损坏，下次提交时重新创建
+            raise
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job, True
+
+    def _finish(self, job, future):
+        try:
+            job.files = future.result()
+        except Exception as e:
+            job.error = str(e)
+        job.finished_at = time.time()
+
+    def _prune(self):
+        """清理超出保留数量的已完成任务 (调用方持有锁)"""
+        finished = [job for job in self._jobs.values() if job.status in ('done', 'failed')]
+        for job in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job.job_id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+            shutil.rmtree(job.output_dir, ignore_errors=True)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,183 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """Welford 在线均值/方差，支持移除样本 (用于滑动窗口)"""
+
+    def __init__(self, values=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        if values is not None and len(values) > 0:
+            values = np.asarray(values, dtype=np.float64)
+            self.count = len(values)
+            self.mean = float(values.mean())
+            self.m2 = float(((values - self.mean) ** 2).sum())
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+
+    def std(self):
+        """样本标准差 (ddof=1)，不足2个样本时返回NaN，与 pandas 一致"""
+        if self.count < 2:
+            return np.nan
+        return np.sqrt(self.m2 / (self.count - 1))
+
+
+class PeriodWindow:
+    """
+    单个统计时间段的滑动窗口: 保存窗口内的 (日期, 归一化净值, 日收益率, 回撤)，
+    收益率用 Welford 统计，区间最小回撤用单调队列维护
+    """
+
+    def __init__(self, delta):
+        self.delta = pd.Timedelta(delta)
+        self.rows = deque()
+        self.return_stats = RunningStats()
+        self.min_drawdown = deque()  # 单调递增队列 (日期, 回撤)
+
+    def push(self, date, nav, ret, drawdown):
+        self.rows.append((date, nav, ret, drawdown))
+        if not np.isnan(ret):
+            self.return_stats.add(ret)
+        while self.min_drawdown and self.min_drawdown[-1][1] >= drawdown:
+            self.min_drawdown.pop()
+        self.min_drawdown.append((date, drawdown))
+
+    def evict(self, end_date):
+        """移除早于 end_date - delta 的数据"""
+        start_date = end_date - self.delta
+        while self.rows and self.rows[0][0] < start_date:
+            date, _, ret, _ = self.rows.popleft()
+            if not np.isnan(ret):
+                self.return_stats.remove(ret)
+            if self.min_drawdown and self.min_drawdown[0][0] == date:
+                self.min_drawdown.popleft()
+
+    def metrics(self, last_nav, risk_free_rate, days_trade):
+        """计算窗口指标，与 calculate_period_metrics 的口径一致；数据不足2条时返回None"""
+        period_days = len(self.rows)
+        if period_days < 2:
+            return None
+        period_return = last_nav / self.rows[0][1] - 1
+        metrics = _summary_metrics(period_return, period_days, self.return_stats.std(),
+                                   self.min_drawdown[0][1], risk_free_rate, days_trade)
+        metrics['开始日期'] = self.rows[0][0]
+        return metrics
+
+
+def _summary_metrics(total_return, days, daily_volatility, max_drawdown, risk_free_rate, days_trade):
+    """由区间收益率、天数、日波动率、最大回撤计算年化指标"""
+    years = days / days_trade
+    annual_return = (1 + total_return) ** (1 / years) - 1 if years > 0 else 0
+    annual_volatility = daily_volatility * np.sqrt(days_trade)
+    sharpe_ratio = (annual_return - risk_free_rate) / annual_volatility if annual_volatility > 0 else 0
+    calmar_ratio = annual_return / abs(max_drawdown) if max_drawdown != 0 else 0
+    return {
+        '总收益率': total_return,
+        '年化收益率': annual_return,
+        '年化波动率': annual_volatility,
+        '夏普比率': sharpe_ratio,
+        '最大回撤': max_drawdown,
+        '卡玛比率': calmar_ratio,
+        '数据天数': days
+    }
+
+
+class IncrementalMetrics:
+    def __init__(self, data, periods, risk_free_rate=0.02, days_trade=251):
+        """
+        增量计算状态: 由已计算指标的数据构建一次，之后每次追加一条记录为 O(1) 更新
+
+        参数:
+        data: 已执行 calculate_performance_metrics 的DataFrame
+        periods: 时间段定义 (名称 -> timedelta)
+        risk_free_rate: 无风险年化收益率
+        days_trade: 年交易日数
+        """
+        self.risk_free_rate = risk_free_rate
+        self.days_trade = days_trade
+
+        nav = data['归一化净值'].to_numpy(dtype=np.float64)
+        returns = data['日收益率'].to_numpy(dtype=np.float64)
+        drawdown = data['回撤'].to_numpy(dtype=np.float64)
+        dates = pd.to_datetime(data['统计日期'])
+
+        self.initial_nav = data['单元资产净值(净价)'].iloc[0]
+        self.count = len(data)
+        self.last_date = dates.iloc[-1]
+        self.last_nav = nav[-1]
+        self.peak = data['滚动最大净值'].iloc[-1]
+        self.worst_drawdown = drawdown.min()
+        self.return_stats = RunningStats(returns[~np.isnan(returns)])
+
+        # 各时间段窗口只装入尾部数据
+        self.windows = {}
+        for period_name, delta in periods.items():
+            window = PeriodWindow(delta)
+            start = np.searchsorted(dates.values, (self.last_date - window.delta).to_datetime64())
+            for i in range(start, len(data)):
+                window.push(dates.iloc[i], nav[i], returns[i], drawdown[i])
+            self.windows[period_name] = window
+
+    def append(self, date, nav):
+        """
+        追加一条净值记录，返回该行的计算列
+
+        参数:
+        date: 统计日期 (须晚于最后一条记录)
+        nav: 单元资产净值(净价)
+        """
+        date = pd.Timestamp(date)
+        if date <= self.last_date:
+            raise ValueError(f"追加日期 {date} 必须晚于最后日期 {self.last_date}")
+
+        normalized = nav / self.initial_nav
+        ret = normalized / self.last_nav - 1
+        self.peak = max(self.peak, normalized)
+        drawdown = (normalized - self.peak) / self.peak
+        self.worst_drawdown = min(self.worst_drawdown, drawdown)
+        self.return_stats.add(ret)
+
+        self.count += 1
+        self.last_date = date
+        self.last_nav = normalized
+
+        for window in self.windows.values():
+            window.push(date, normalized, ret, drawdown)
+            window.evict(date)
+
+        return {
+            '统计日期': date,
+            '单元资产净值(净价)': nav,
+            '归一化净值': normalized,
+            '日收益率': ret,
+            '累计收益率': normalized - 1,
+            '滚动最大净值': self.peak,
+            '回撤': drawdown
+        }
+
+    def update_results(self, results):
+        """用当前状态更新 results 字典 ('总体指标' 与各时间段)"""
+        results['总体指标'] = _summary_metrics(self.last_nav - 1, self.count, self.return_stats.std(),
+                                           self.worst_drawdown, self.risk_free_rate, self.days_trade)
+        for period_name, window in self.windows.items():
+            metrics = window.metrics(self.last_nav, self.risk_free_rate, self.days_trade)
+            if metrics is None:
+                results.pop(period_name, None)
+            else:
+                results[period_name] = metrics
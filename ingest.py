@@ -0,0 +1,172 @@
+import os
+import re
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from excel_cache import read_excel_cached
+
+# 默认匹配按年份拆分的工作表: 单元资产2023、单元资产2024 ...
+SHEET_PATTERN = r'^单元资产\d{4}$'
+DATE_COLUMN = '统计日期'
+NAV_COLUMN = '单元资产净值(净价)'
+
+
+def discover_sheets(workbooks, pattern=SHEET_PATTERN):
+    """
+    列出各工作簿中名称匹配 pattern 的工作表 (只读模式打开，不解析单元格)
+
+    返回:
+    [(工作簿路径, 工作表名)]，按工作簿顺序与表名排序
+    """
+    from openpyxl import load_workbook
+    regex = re.compile(pattern)
+    sheets = []
+    for path in workbooks:
+        workbook = load_workbook(path, read_only=True)
+        try:
+            sheets.extend((path, name) for name in sorted(workbook.sheetnames) if regex.search(name))
+        finally:
+            workbook.close()
+    return sheets
+
+
+def read_sheet(path, sheet_name, use_cache=True):
+    """
+    读取一个工作表的日期与净值两列 (显式指定列与类型)，返回按日期排序的数组与耗时
+
+    返回:
+    (工作簿路径, 工作表名, 日期int64纳秒数组, 净值float64数组, 耗时秒)
+    """
+    start = time.perf_counter()
+    if use_cache:
+        data = read_excel_cached(path, sheet_name=sheet_name)
+    else:
+        data = pd.read_excel(path, sheet_name=sheet_name, usecols=[DATE_COLUMN, NAV_COLUMN],
+                             dtype={NAV_COLUMN: np.float64})
+    dates = pd.to_datetime(data[DATE_COLUMN]).values.astype('datetime64[ns]').astype(np.int64)
+    nav = data[NAV_COLUMN].to_numpy(dtype=np.float64)
+    # 单个工作表通常已按日期排列，只在乱序时排序
+    if len(dates) > 1 and not np.all(dates[1:] >= dates[:-1]):
+        order = np.argsort(dates, kind='stable')
+        dates, nav = dates[order], nav[order]
+    return path, sheet_name, dates, nav, time.perf_counter() - start
+
+
+def _read_sheet_task(args):
+    return read_sheet(*args)
+
+
+def _merge_two(a, b):
+    """合并两个有序序列 (日期相同时 a 在前)，O(n + m) 次写入"""
+    (dates_a, nav_a), (dates_b, nav_b) = a, b
+    pos_a = np.arange(len(dates_a)) + np.searchsorted(dates_b, dates_a, side='left')
+    pos_b = np.arange(len(dates_b)) + np.searchsorted(dates_a, dates_b, side='right')
+    dates = np.empty(len(dates_a) + len(dates_b), dtype=np.int64)
+    nav = np.empty(len(dates), dtype=np.float64)
+    dates[pos_a], dates[pos_b] = dates_a, dates_b
+    nav[pos_a], nav[pos_b] = nav_a, nav_b
+    return dates, nav
+
+
+def merge_sorted(runs):
+    """
+    k 路有序合并并按日期去重 (同一日期保留靠后的数据源，即 runs 中位置靠后的值)
+
+    参数:
+    runs: [(日期int64数组, 净值数组)]，每段已按日期排序
+
+    返回:
+    (日期数组, 净值数组)
+    """
+    runs = [run for run in runs if len(run[0])]
+    if not runs:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+    # 常见情形: 每年一个工作表，各段日期互不重叠，按起始日期排列后直接拼接
+    order = sorted(range(len(runs)), key=lambda i: runs[i][0][0])
+    if all(runs[i][0][0] > runs[j][0][-1] for j, i in zip(order, order[1:])):
+        dates = np.concatenate([runs[i][0] for i in order])
+        nav = np.concatenate([runs[i][1] for i in order])
+    else:
+        # 两两合并 (合并树深度 log k)，相邻段合并保持数据源顺序
+        while len(runs) > 1:
+            merged = [_merge_two(runs[i], runs[i + 1]) for i in range(0, len(runs) - 1, 2)]
+            if len(runs) % 2:
+                merged.append(runs[-1])
+            runs = merged
+        dates, nav = runs[0]
+    keep = np.append(dates[1:] != dates[:-1], True)
+    return dates[keep], nav[keep]
+
+
+def load_workbooks(workbooks, sheet_pattern=SHEET_PATTERN, max_workers=None, use_processes=True, use_cache=True):
+    """
+    并行读取多个工作簿中所有匹配的工作表，合并为按日期排序、去重后的净值数据
+
+    参数:
+    workbooks: 工作簿路径列表 (日期重复时靠后的工作簿/工作表优先)
+    sheet_pattern: 工作表名称的正则表达式
+    max_workers: 并发数 (默认CPU核数)
+    use_processes: True 使用进程池 (Excel解析受GIL限制)，False 使用线程池
+    use_cache: 是否使用每个工作表的二进制缓存
+
+    返回:
+    (包含 '统计日期' 与 '单元资产净值(净价)' 的DataFrame, 各工作簿的读取统计列表)
+    """
+    sheets = discover_sheets(workbooks, sheet_pattern)
+    if not sheets:
+        raise ValueError(f"未找到名称匹配 {sheet_pattern} 的工作表")
+
+    start = time.perf_counter()
+    tasks = [(path, sheet_name, use_cache) for path, sheet_name in sheets]
+    if len(tasks) == 1 or max_workers == 1:
+        results = [_read_sheet_task(task) for task in tasks]
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        if use_processes:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+        with executor:
+            results = list(executor.map(_read_sheet_task, tasks))
+    elapsed = time.perf_counter() - start
+
+    dates, nav = merge_sorted([(dates, nav) for _, _, dates, nav, _ in results])
+    data = pd.DataFrame({DATE_COLUMN: pd.to_datetime(dates.astype('datetime64[ns]')), NAV_COLUMN: nav})
+
+    # 各工作簿的读取统计 (耗时为各工作表读取耗时之和)
+    report = []
+    for path in dict.fromkeys(path for path, _ in sheets):
+        rows = [result for result in results if result[0] == path]
+        seconds = sum(result[4] for result in rows)
+        n_rows = sum(len(result[2]) for result in rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        report.append({
+            '工作簿': os.path.basename(path),
+            '工作表数': len(rows),
+            '记录数': n_rows,
+            '耗时(秒)': seconds,
+            '记录/秒': n_rows / seconds if seconds > 0 else float('inf'),
+            'MB/秒': size_mb / seconds if seconds > 0 else float('inf')
+        })
+    total_mb = sum(os.path.getsize(path) for path in workbooks) / 1024 / 1024
+    report.append({
+        '工作簿': '合计',
+        '工作表数': len(results),
+        '记录数': len(data),
+        '耗时(秒)': elapsed,
+        '记录/秒': len(data) / elapsed if elapsed > 0 else float('inf'),
+        'MB/秒': total_mb / elapsed if elapsed > 0 else float('inf')
+    })
+    return data, report
+
+
+def print_report(report):
+    """打印各工作簿的读取统计"""
+    for row in report:
+        print(f"{row['工作簿']}: {row['工作表数']} 个工作表，{row['记录数']} 条记录，"
+              f"{row['耗时(秒)']:.2f} 秒 ({row['记录/秒']:,.0f} 条/秒，{row['MB/秒']:.2f} MB/秒)")
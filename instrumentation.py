@@ -0,0 +1,111 @@
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+
+# 默认直方图分桶 (秒)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class StageTimer:
+    def __init__(self, sinks=None):
+        """
+        阶段计时器: 记录每个阶段的耗时并分发给各个输出 (日志、回调、直方图)
+
+        参数:
+        sinks: 输出列表，每个输出实现 record(stage, seconds, labels)
+        """
+        self.sinks = list(sinks or [])
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """计时上下文: with timer.stage('excel_parse'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            for sink in self.sinks:
+                sink.record(name, elapsed, labels)
+
+
+class LogSink:
+    """将阶段耗时写入日志"""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger('investment.timing')
+        self.level = level
+
+    def record(self, stage, seconds, labels):
+        suffix = ''.join(f' {k}={v}' for k, v in sorted(labels.items()))
+        self.logger.log(self.level, f"阶段 {stage} 耗时 {seconds * 1000:.1f}ms{suffix}")
+
+
+class CallbackSink:
+    """将阶段耗时传给回调函数 callback(stage, seconds, labels)"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record(self, stage, seconds, labels):
+        self.callback(stage, seconds, labels)
+
+
+class HistogramSink:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """内存直方图: 按 (阶段, 标签) 累计分桶计数、总和与次数，线程安全"""
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, value, labels=None):
+        key = (stage, tuple(sorted((labels or {}).items())))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self):
+        """返回 {(阶段, 标签元组): {'counts', 'sum', 'count'}} 的副本"""
+        with self._lock:
+            return {key: {'counts': list(s['counts']), 'sum': s['sum'], 'count': s['count']}
+                    for key, s in self._series.items()}
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    escaped = [(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in pairs]
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+def format_histogram(metric, description, histogram, label='stage'):
+    """将直方图格式化为 Prometheus 文本格式 (阶段名作为 label 标签)"""
+    lines = [f'# HELP {metric} {description}', f'# TYPE {metric} histogram']
+    for (name, labels), series in sorted(histogram.snapshot().items()):
+        pairs = ([(label, name)] if label else []) + list(labels)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, series['counts']):
+            cumulative += count
+            lines.append(f'{metric}_bucket{_format_labels(pairs + [("le", repr(float(bound)))])} {cumulative}')
+        lines.append(f'{metric}_bucket{_format_labels(pairs + [("le", "+Inf")])} {series["count"]}')
+        lines.append(f'{metric}_sum{_format_labels(pairs)} {series["sum"]}')
+        lines.append(f'{metric}_count{_format_labels(pairs)} {series["count"]}')
+    return lines
+
+
+def format_gauge(metric, description, values, metric_type='gauge'):
+    """将 {标签元组: 数值} 格式化为 Prometheus 文本格式的 gauge/counter"""
+    lines = [f'# HELP {metric} {description}', f'# TYPE {metric} {metric_type}']
+    for labels, value in sorted(values.items()):
+        lines.append(f'{metric}{_format_labels(list(labels))} {value}')
+    return lines
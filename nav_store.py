@@ -0,0 +1,240 @@
+import os
+import glob
+import json
+import time
+import struct
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+
+from compact import EPOCH, to_day_numbers
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 文件头: 魔数、格式版本、记录长度、已提交记录数、首个/最后一个日期 (天数)，共32字节
+MAGIC = b'NAVSTORE'
+STORE_VERSION = 1
+HEADER = struct.Struct('<8sIIqii')
+# 每条记录: 日期 (自 1970-01-01 起的天数) + 单元资产净值，紧凑排列
+RECORD_DTYPE = np.dtype([('day', '<i4'), ('nav', '<f8')])
+SUFFIX = '.nav'
+INDEX_FILE = 'index.json'
+
+
+def _read_header(f):
+    f.seek(0)
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise ValueError("文件头不完整")
+    magic, version, record_size, count, first_day, last_day = HEADER.unpack(raw)
+    if magic != MAGIC or version != STORE_VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError("不是有效的净值存储文件")
+    return count, first_day, last_day
+
+
+def read_nav_file(path):
+    """
+    以只读内存映射打开一个净值存储文件，只包含文件头中已提交的记录 (不复制数据)
+
+    返回:
+    RECORD_DTYPE 结构化数组 (np.memmap，无记录时为空数组)
+    """
+    with open(path, 'rb') as f:
+        count, _, _ = _read_header(f)
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+
+def records_to_frame(records):
+    """存储记录 -> 包含 '统计日期' 与 '单元资产净值(净价)' 列的DataFrame，可直接赋给 analyzer.data"""
+    return pd.DataFrame({
+        '统计日期': (EPOCH + records['day']).astype('datetime64[ns]'),
+        '单元资产净值(净价)': records['nav'].astype(np.float64)
+    })
+
+
+class NavStore:
+    def __init__(self, root):
+        """
+        本地净值存储: 每个组合一个只追加的二进制文件 (<组合ID>.nav)，另有 index.json 汇总各组合的记录数与日期范围
+
+        追加时先写记录并 fsync，再更新文件头中的已提交记录数；写入中途崩溃留下的不完整记录
+        不会被读到，并在下次追加时截断。同一组合的并发追加以文件锁串行化 (不支持 fcntl 的平台只在进程内加锁)。
+
+        参数:
+        root: 存储目录
+        """
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, portfolio_id):
+        if not portfolio_id or os.path.basename(portfolio_id) != portfolio_id or portfolio_id.startswith('.'):
+            raise ValueError(f"组合ID不合法: {portfolio_id}")
+        return os.path.join(self.root, portfolio_id + SUFFIX)
+
+    def portfolios(self):
+        """存储中的组合ID列表"""
+        return sorted(os.path.basename(path)[:-len(SUFFIX)] for path in glob.glob(os.path.join(self.root, '*' + SUFFIX)))
+
+    def __contains__(self, portfolio_id):
+        try:
+            return os.path.isfile(self.path_for(portfolio_id))
+        except ValueError:
+            return False
+
+    def open(self, portfolio_id):
+        """只读内存映射组合的全部记录"""
+        return read_nav_file(self.path_for(portfolio_id))
+
+    def read_frame(self, portfolio_id, start=None, end=None):
+        """
+        读取组合在 [start, end] 日期范围内的净值 (按日期二分定位，只复制范围内的记录)
+
+        返回:
+        包含 '统计日期' 与 '单元资产净值(净价)' 列的DataFrame
+        """
+        records = self.open(portfolio_id)
+        i = 0 if start is None else int(np.searchsorted(records['day'], to_day_numbers([start])[0], side='left'))
+        j = len(records) if end is None else int(np.searchsorted(records['day'], to_day_numbers([end])[0], side='right'))
+        return records_to_frame(records[i:j])
+
+    def info(self, portfolio_id):
+        """组合的记录数与日期范围"""
+        with open(self.path_for(portfolio_id), 'rb') as f:
+            count, first_day, last_day = _read_header(f)
+        return {
+            'records': count,
+            'first_date': str(EPOCH + first_day) if count else None,
+            'last_date': str(EPOCH + last_day) if count else None
+        }
+
+    def append(self, portfolio_id, dates, navs):
+        """
+        追加净值记录，日期须严格递增且晚于已有的最后日期
+
+        参数:
+        portfolio_id: 组合ID (不存在时创建)
+        dates: 日期序列
+        navs: 单元资产净值序列
+
+        返回:
+        追加后的记录数
+        """
+        days = to_day_numbers(dates)
+        navs = np.asarray(navs, dtype=np.float64)
+        if len(days) != len(navs):
+            raise ValueError("日期与净值的数量不一致")
+        if len(days) > 1 and not np.all(np.diff(days) > 0):
+            raise ValueError("追加的日期须严格递增")
+
+        path = self.path_for(portfolio_id)
+        with self._lock:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, 'r+b') as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                if os.fstat(f.fileno()).st_size < HEADER.size:
+                    count, first_day, last_day = 0, 0, 0
+                    f.write(HEADER.pack(MAGIC, STORE_VERSION, RECORD_DTYPE.itemsize, 0, 0, 0))
+                else:
+                    count, first_day, last_day = _read_header(f)
+
+                if len(days) == 0:
+                    return count
+                if count and days[0] <= last_day:
+                    raise ValueError(f"追加的日期须晚于已有的最后日期 {EPOCH + last_day}")
+
+                # 丢弃上次崩溃留下的未提交记录，再写入新记录并落盘
+                end = HEADER.size + count * RECORD_DTYPE.itemsize
+                f.truncate(end)
+                records = np.empty(len(days), dtype=RECORD_DTYPE)
+                records['day'] = days
+                records['nav'] = navs
+                f.seek(end)
+                f.write(records.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+                # 记录落盘后才提交: 更新文件头中的记录数与日期范围
+                count += len(days)
+                first_day = first_day if count > len(days) else int(days[0])
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, STORE_VERSION, RECORD_DTYPE.itemsize, count, first_day, int(days[-1])))
+                f.flush()
+                os.fsync(f.fileno())
+            self._update_index(portfolio_id)
+        return count
+
+    def import_frame(self, portfolio_id, data):
+        """
+        导入包含 '统计日期' 与 '单元资产净值(净价)' 列的数据，只追加晚于已有最后日期的记录 (可重复执行)
+
+        返回:
+        新追加的记录数
+        """
+        data = data.sort_values('统计日期').drop_duplicates('统计日期', keep='last')
+        days = to_day_numbers(data['统计日期'])
+        if portfolio_id in self:
+            info = self.info(portfolio_id)
+            if info['records']:
+                last_day = to_day_numbers([info['last_date']])[0]
+                data = data[days > last_day]
+        self.append(portfolio_id, data['统计日期'], data['单元资产净值(净价)'])
+        return len(data)
+
+    def _update_index(self, portfolio_id):
+        """更新 index.json 中该组合的汇总 (先写临时文件再替换)；索引只用于列出，以各文件头为准"""
+        index_path = os.path.join(self.root, INDEX_FILE)
+        try:
+            with open(index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index[portfolio_id] = dict(self.info(portfolio_id), updated_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, index_path)
+
+
+def import_workbooks(store, paths, sheet_pattern=None):
+    """
+    将现有的 <组合ID>.xlsx 导入净值存储 (组合ID取文件名)，已导入的组合只追加新日期
+
+    返回:
+    组合ID -> 新追加的记录数
+    """
+    from ingest import SHEET_PATTERN, load_workbooks
+
+    imported = {}
+    for path in paths:
+        portfolio_id = os.path.splitext(os.path.basename(path))[0]
+        data, _ = load_workbooks([path], sheet_pattern or SHEET_PATTERN, max_workers=1)
+        imported[portfolio_id] = store.import_frame(portfolio_id, data)
+        print(f"{portfolio_id}: 追加 {imported[portfolio_id]} 条记录")
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将 Excel 净值数据导入本地二进制净值存储")
+    parser.add_argument('inputs', nargs='+', help="Excel 文件或包含 <组合ID>.xlsx 的目录")
+    parser.add_argument('--store', default='navstore', help="存储目录")
+    parser.add_argument('--sheet-pattern', help="工作表名称的正则表达式 (默认 单元资产+年份)")
+    args = parser.parse_args()
+
+    paths = []
+    for item in args.inputs:
+        paths.extend(sorted(glob.glob(os.path.join(item, '*.xlsx'))) if os.path.isdir(item) else [item])
+    imported = import_workbooks(NavStore(args.store), paths, args.sheet_pattern)
+    print(f"导入完成: {len(imported)} 个组合，共 {sum(imported.values())} 条记录，存储目录 {args.store}")
+
+
+if __name__ == "__main__":
+    main()
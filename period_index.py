@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+class PeriodIndex:
+    def __init__(self, data, risk_free_rate=0.02, days_trade=251):
+        """
+        区间指标索引: 构建一次 (O(n log n))，之后任意 [start, end] 区间的
+        收益率、波动率、夏普比率、最大回撤只需一次 searchsorted 加 O(1) 计算
+
+        参数:
+        data: 已执行 calculate_performance_metrics 的DataFrame
+        risk_free_rate: 无风险年化收益率
+        days_trade: 年交易日数
+        """
+        self.risk_free_rate = risk_free_rate
+        self.days_trade = days_trade
+        self.dates = pd.to_datetime(data['统计日期']).values.astype('datetime64[ns]')
+        self.nav = data['归一化净值'].to_numpy(dtype=np.float64)
+
+        # 收益率前缀和 (减去整体均值后累加，降低大数相减的精度损失)
+        returns = data['日收益率'].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(returns)
+        self.shift = returns[valid].mean() if valid.any() else 0.0
+        centered = np.where(valid, returns - self.shift, 0.0)
+        self.prefix_count = np.concatenate([[0], np.cumsum(valid)])
+        self.prefix_sum = np.concatenate([[0.0], np.cumsum(centered)])
+        self.prefix_sq = np.concatenate([[0.0], np.cumsum(centered * centered)])
+
+        # 回撤的稀疏表: table[k][i] = min(回撤[i : i + 2^k])
+        drawdown = data['回撤'].to_numpy(dtype=np.float64)
+        self.sparse_table = [drawdown]
+        length = 1
+        while length * 2 <= len(drawdown):
+            prev = self.sparse_table[-1]
+            self.sparse_table.append(np.minimum(prev[:-length], prev[length:]))
+            length *= 2
+
+    @property
+    def nbytes(self):
+        arrays = [self.dates, self.nav, self.prefix_count, self.prefix_sum, self.prefix_sq] + self.sparse_table
+        return sum(array.nbytes for array in arrays)
+
+    def locate(self, start=None, end=None):
+        """返回区间 [start, end] 对应的行号范围 [i, j]，起止日期为空表示不限"""
+        i = 0 if start is None else int(np.searchsorted(self.dates, pd.Timestamp(start).to_datetime64(), side='left'))
+        j = len(self.dates) - 1 if end is None else \
+            int(np.searchsorted(self.dates, pd.Timestamp(end).to_datetime64(), side='right')) - 1
+        return i, j
+
+    def range_min_drawdown(self, i, j):
+        """行号区间 [i, j] 内的最小回撤 (O(1))"""
+        k = (j - i + 1).bit_length() - 1
+        table = self.sparse_table[k]
+        return min(table[i], table[j - (1 << k) + 1])
+
+    def range_volatility(self, i, j):
+        """行号区间 [i, j] 内日收益率的样本标准差 (ddof=1)"""
+        n = self.prefix_count[j + 1] - self.prefix_count[i]
+        if n < 2:
+            return np.nan
+        s1 = self.prefix_sum[j + 1] - self.prefix_sum[i]
+        s2 = self.prefix_sq[j + 1] - self.prefix_sq[i]
+        return np.sqrt(max(s2 - s1 * s1 / n, 0.0) / (n - 1))
+
+    def metrics_between(self, start=None, end=None):
+        """
+        计算 [start, end] 日期区间的业绩指标，口径与 calculate_period_metrics 一致；
+        区间内不足2个数据点时返回None
+        """
+        i, j = self.locate(start, end)
+        if j - i + 1 < 2:
+            return None
+
+        trading_days_per_year = self.days_trade
+        period_return = self.nav[j] / self.nav[i] - 1
+        period_days = j - i + 1
+        period_years = period_days / trading_days_per_year
+        annual_return = (1 + period_return) ** (1 / period_years) - 1 if period_years > 0 else 0
+        annual_volatility = self.range_volatility(i, j) * np.sqrt(trading_days_per_year)
+        sharpe_ratio = (annual_return - self.risk_free_rate) / annual_volatility if annual_volatility > 0 else 0
+        max_drawdown = self.range_min_drawdown(i, j)
+        calmar_ratio = annual_return / abs(max_drawdown) if max_drawdown != 0 else 0
+
+        return {
+            '总收益率': period_return,
+            '年化收益率': annual_return,
+            '年化波动率': annual_volatility,
+            '夏普比率': sharpe_ratio,
+            '最大回撤': max_drawdown,
+            '卡玛比率': calmar_ratio,
+            '数据天数': period_days,
+            '开始日期': pd.Timestamp(self.dates[i]),
+            '结束日期': pd.Timestamp(self.dates[j])
+        }
@@ -0,0 +1,106 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# 相对基准的指标名称
+RELATIVE_KEYS = ('基准收益率', '超额收益率', '贝塔', '阿尔法', '跟踪误差', '信息比率', '上行捕获率', '下行捕获率')
+
+
+def benchmark_arrays(benchmark):
+    """
+    将基准净值转换为按日期排序的 (日期 int64 纳秒, 净值) 数组
+
+    参数:
+    benchmark: 以日期为索引的 Series，或包含 '统计日期' 与 '基准净值' (或 '单元资产净值(净价)') 列的DataFrame
+    """
+    if isinstance(benchmark, pd.Series):
+        dates, nav = benchmark.index, benchmark.to_numpy(dtype=np.float64)
+    else:
+        column = '基准净值' if '基准净值' in benchmark else '单元资产净值(净价)'
+        dates, nav = benchmark['统计日期'], benchmark[column].to_numpy(dtype=np.float64)
+    dates = pd.to_datetime(dates).values.astype('datetime64[ns]').astype(np.int64)
+    order = np.argsort(dates, kind='stable')
+    return dates[order], nav[order]
+
+
+def align_benchmark(dates, benchmark_dates, benchmark_nav):
+    """有序合并: 每个日期取不晚于该日的最近一个基准净值 (此前没有基准数据时为NaN)"""
+    pos = np.searchsorted(benchmark_dates, dates, side='right') - 1
+    return np.where(pos >= 0, benchmark_nav[np.maximum(pos, 0)], np.nan)
+
+
+def benchmark_returns(aligned, mask):
+    """
+    基准在每个单元相邻两个有效日期之间的收益率，与单元的日收益率区间一一对应
+
+    参数:
+    aligned: 对齐到日期网格的基准净值 (长度为日期数)
+    mask: 日期 × 单元 的有效数据掩码
+    """
+    rows = np.arange(mask.shape[0])
+    last_valid = np.maximum.accumulate(np.where(mask, rows[:, None], -1), axis=0)
+    prev_pos = np.empty_like(last_valid)
+    prev_pos[0] = -1
+    prev_pos[1:] = last_valid[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = aligned[:, None] / aligned[np.maximum(prev_pos, 0)] - 1
+    return np.where(mask & (prev_pos >= 0), returns, np.nan)
+
+
+def _masked_mean(values, valid, count):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, values, 0.0).sum(axis=0) / count
+
+
+def window_relative_metrics(window, returns, bench_returns, aligned, first, last, period_return, annual_return,
+                            risk_free_rate, days_trade, period_years=None):
+    """
+    对掩码窗口内的数据计算各单元相对基准的指标 (数组形式)
+
+    参数:
+    window: 日期 × 单元 的窗口掩码
+    returns / bench_returns: 单元与基准的日收益率 (日期 × 单元)
+    aligned: 对齐到日期网格的基准净值
+    first / last: 各单元窗口内首个、最后一个数据的行号
+    period_return / annual_return: 各单元的区间收益率与年化收益率
+    period_years: 各单元的区间年数 (为空时按窗口行数 / days_trade；有交易日历时由调用方按日历计算)
+    """
+    valid = window & ~np.isnan(returns) & ~np.isnan(bench_returns)
+    count = valid.sum(axis=0)
+    if period_years is None:
+        period_years = window.sum(axis=0) / days_trade
+
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        bench_return = aligned[last] / aligned[first] - 1
+        bench_annual = np.where(period_years > 0, (1 + bench_return) ** (1 / period_years) - 1, 0.0)
+
+        # 样本协方差、方差与跟踪误差 (ddof=1)
+        centered_p = np.where(valid, returns - _masked_mean(returns, valid, count), 0.0)
+        centered_b = np.where(valid, bench_returns - _masked_mean(bench_returns, valid, count), 0.0)
+        covariance = (centered_p * centered_b).sum(axis=0) / (count - 1)
+        bench_variance = (centered_b ** 2).sum(axis=0) / (count - 1)
+        beta = np.where(bench_variance > 0, covariance / bench_variance, 0.0)
+        active = centered_p - centered_b
+        tracking_error = np.sqrt((active ** 2).sum(axis=0) / (count - 1)) * np.sqrt(days_trade)
+        tracking_error = np.where(count > 1, tracking_error, 0.0)
+        information_ratio = np.where(tracking_error > 0, (annual_return - bench_annual) / tracking_error, 0.0)
+        alpha = annual_return - (risk_free_rate + beta * (bench_annual - risk_free_rate))
+
+        # 上行/下行捕获率: 基准上涨 (下跌) 日单元平均收益与基准平均收益之比
+        captures = []
+        for days in (valid & (bench_returns > 0), valid & (bench_returns < 0)):
+            days_count = days.sum(axis=0)
+            bench_mean = _masked_mean(bench_returns, days, days_count)
+            captures.append(np.where(days_count > 0, _masked_mean(returns, days, days_count) / bench_mean, 0.0))
+
+    return {
+        '基准收益率': bench_return,
+        '超额收益率': period_return - bench_return,
+        '贝塔': beta,
+        '阿尔法': alpha,
+        '跟踪误差': tracking_error,
+        '信息比率': information_ratio,
+        '上行捕获率': captures[0],
+        '下行捕获率': captures[1]
+    }
@@ -0,0 +1,287 @@
+import sys
+
+_matplotlib_configured = False
+
+
+def _configure_matplotlib():
+    """首次绘图时导入 matplotlib 并设置中文字体 (模块导入时不加载 matplotlib)"""
+    global _matplotlib_configured
+    import matplotlib
+    if not _matplotlib_configured:
+        matplotlib.rcParams['font.family'] = 'simHei'
+        matplotlib.rcParams['font.sans-serif'] = 'simHei'
+        matplotlib.rcParams['axes.unicode_minus'] = False
+        _matplotlib_configured = True
+    return matplotlib
+
+
+def init_worker():
+    """进程池工作进程的初始化函数: 使用无界面的 Agg 后端 (报告导出与批量报告共用)"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+class ChartTemplate:
+    def __init__(self):
+        """
+        可复用的图表模板: 一次创建 15×14 的图与三个子图 (净值图、回撤图、指标表格)，
+        批量生成报告时每个组合只清空子图后重绘，不再重复创建图与 GridSpec
+        """
+        from matplotlib.figure import Figure
+        self.fig = Figure(figsize=(15, 14))
+        gs = self.fig.add_gridspec(3, 1, height_ratios=[3, 1, 1.5])
+        self.ax1 = self.fig.add_subplot(gs[0])  # 净值图
+        self.ax2 = self.fig.add_subplot(gs[1])  # 回撤图
+        self.ax_table = self.fig.add_subplot(gs[2])  # 指标表格
+    
+    def reset(self):
+        """清空子图内容，返回 (fig, ax1, ax2, ax_table)"""
+        for ax in (self.ax1, self.ax2, self.ax_table):
+            ax.clear()
+            ax.axis('on')
+        return self.fig, self.ax1, self.ax2, self.ax_table
+
+
+def create_performance_chart(analyzer, template=None):
+    """
+    绘制业绩图表: 净值曲线、回撤图与指标表格
+
+    参数:
+    analyzer: 已计算指标的 InvestmentPerformanceAnalyzer
+    template: 可复用的 ChartTemplate (为空时新建图表)
+    """
+    _configure_matplotlib()
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
+    data = analyzer.data  # 紧凑模式下每次访问都会重建，只取一次
+    if template is not None:
+        fig, ax1, ax2, ax_table = template.reset()
+    else:
+        # 创建图表，调整布局为三个部分：净值图、回撤图、指标表格
+        fig = plt.figure(figsize=(15, 14))
+        gs = plt.GridSpec(3, 1, height_ratios=[3, 1, 1.5])
+
+        ax1 = plt.subplot(gs[0])  # 净值图
+        ax2 = plt.subplot(gs[1])  # 回撤图
+        ax_table = plt.subplot(gs[2])  # 指标表格
+
+    # 净值曲线
+    ax1.plot(data['统计日期'], data['归一化净值'], 
+            linewidth=2, color='#1f77b4', label='净值曲线')
+
+    # 标记最后一个点的数值
+    last_date = data['统计日期'].iloc[-1]
+    last_value = data['归一化净值'].iloc[-1]
+    ax1.plot(last_date, last_value, 'ro', markersize=8)
+    ax1.annotate(f'{last_value:.3f}', 
+                xy=(last_date, last_value),
+                xytext=(10, 10), textcoords='offset points',
+                fontsize=12, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7),
+                arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0'))
+
+    ax1_chart_title = analyzer.chart_title + ' 截止日期：' + data['统计日期'].max().strftime('%Y-%m-%d')
+    ax1.set_title(ax1_chart_title, fontsize=16, fontweight='bold')
+    ax1.set_ylabel('净值', fontsize=12)
+    ax1.grid(True, alpha=0.3)
+    ax1.legend()
+
+    # 设置x轴格式
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+    ax1.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
+
+    # 回撤图
+    ax2.fill_between(data['统计日期'], data['回撤']*100, 0, 
+                    alpha=0.3, color='red', label='回撤')
+    ax2.plot(data['统计日期'], data['回撤']*100, 
+            linewidth=1, color='red', alpha=0.8)
+    ax2.set_ylabel('回撤 (%)', fontsize=12)
+    ax2.set_xlabel('日期', fontsize=12)
+    ax2.grid(True, alpha=0.3)
+    ax2.legend()
+
+    # 在图表下方添加指标表格
+    add_metrics_table(ax_table, analyzer.results)
+
+    fig.tight_layout()
+    return fig
+
+
+def add_metrics_table(ax_table, results):
+    """在图表下方添加指标表格"""
+    # 确定可用的时间段 - 按时间从短到长排序
+    all_periods = ['近三个月', '近半年', '近一年', '近三年', '成立以来']
+    available_periods = []
+
+    for period in all_periods:
+        if period in results:
+            available_periods.append(period)
+
+    if not available_periods:
+        ax_table.axis('off')
+        ax_table.text(0.5, 0.5, '无足够数据计算指标', 
+                     ha='center', va='center', transform=ax_table.transAxes)
+        return
+
+    # 准备表格数据
+    table_data = []
+    columns = ['时间段', '总收益率', '年化收益率', '年化波动率', 
+              '夏普比率', '最大回撤', '卡玛比率']
+
+    for period in available_periods:
+        metrics = results[period]
+        row = [
+            period,
+            f"{metrics['总收益率']:.2%}",
+            f"{metrics['年化收益率']:.2%}",
+            f"{metrics['年化波动率']:.2%}",
+            f"{metrics['夏普比率']:.2f}",
+            f"{metrics['最大回撤']:.2%}",
+            f"{metrics['卡玛比率']:.2f}"
+        ]
+        table_data.append(row)
+
+    # 创建表格
+    ax_table.axis('off')
+    table = ax_table.table(cellText=table_data,
+                          colLabels=columns,
+                          cellLoc='center',
+                          loc='center',
+                          bbox=[0, 0, 1, 1])
+
+    table.auto_set_font_size(False)
+    table.set_fontsize(10)
+    table.scale(1, 1.8)
+
+    # 设置表头样式
+    for i in range(len(columns)):
+        table[(0, i)].set_facecolor('#4C72B0')
+        table[(0, i)].set_text_props(weight='bold', color='white')
+
+
+def save_html_chart(analyzer, chart_html):
+    """保存交互式HTML图表 (使用plotly)"""
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        import plotly.offline as pyo
+
+        data = analyzer.data
+        # 确定可用的时间段
+        all_periods = ['近三个月', '近半年', '近一年', '近三年', '成立以来']
+        available_periods = [p for p in all_periods if p in analyzer.results]
+
+        # 创建Plotly图表 - 使用3个子图
+        fig_plotly = make_subplots(
+            rows=3, cols=1,
+            subplot_titles=(analyzer.chart_title, "回撤", "业绩指标"),
+            vertical_spacing=0.08,
+            row_heights=[0.5, 0.2, 0.3],
+            specs=[
+                [{"type": "scatter"}],
+                [{"type": "scatter"}],
+                [{"type": "table"}]
+            ]
+        )
+
+        # 净值曲线
+        fig_plotly.add_trace(
+            go.Scatter(
+                x=data['统计日期'], 
+                y=data['归一化净值'],
+                name='净值曲线', 
+                line=dict(color='#1f77b4', width=2),
+                hovertemplate='日期: %{x}<br>净值: %{y:.3f}<extra></extra>'
+            ),
+            row=1, col=1
+        )
+
+        # 标记最后一个点
+        last_date = data['统计日期'].iloc[-1]
+        last_value = data['归一化净值'].iloc[-1]
+        fig_plotly.add_trace(
+            go.Scatter(
+                x=[last_date], 
+                y=[last_value],
+                mode='markers+text',
+                marker=dict(size=12, color='red'),
+                text=[f'最新净值: {last_value:.3f}'],
+                textposition="top center",
+                showlegend=False,
+                hovertemplate=f'最新净值: {last_value:.3f}<extra></extra>'
+            ),
+            row=1, col=1
+        )
+
+        # 回撤图
+        fig_plotly.add_trace(
+            go.Scatter(
+                x=data['统计日期'], 
+                y=data['回撤']*100,
+                name='回撤', 
+                fill='tozeroy', 
+                line=dict(color='red', width=1),
+                hovertemplate='日期: %{x}<br>回撤: %{y:.2f}%<extra></extra>'
+            ),
+            row=2, col=1
+        )
+
+        # 添加指标表格
+        if available_periods:
+            # 准备表格数据
+            header_values = ['时间段', '总收益率', '年化收益率', '年化波动率', '夏普比率', '最大回撤', '卡玛比率']
+            cell_values = [[] for _ in range(len(header_values))]
+
+            for period in available_periods:
+                metrics = analyzer.results[period]
+                cell_values[0].append(period)
+                cell_values[1].append(f"{metrics['总收益率']:.2%}")
+                cell_values[2].append(f"{metrics['年化收益率']:.2%}")
+                cell_values[3].append(f"{metrics['年化波动率']:.2%}")
+                cell_values[4].append(f"{metrics['夏普比率']:.2f}")
+                cell_values[5].append(f"{metrics['最大回撤']:.2%}")
+                cell_values[6].append(f"{metrics['卡玛比率']:.2f}")
+
+            # 添加表格
+            fig_plotly.add_trace(
+                go.Table(
+                    header=dict(
+                        values=header_values,
+                        fill_color='#4C72B0',
+                        align='center',
+                        font=dict(color='white', size=12)
+                    ),
+                    cells=dict(
+                        values=cell_values,
+                        fill_color='white',
+                        align='center',
+                        font=dict(size=11)
+                    )
+                ),
+                row=3, col=1
+            )
+
+        # 更新布局
+        fig_plotly.update_layout(
+            height=1000,
+            showlegend=True,
+            title_text=f"{analyzer.chart_title} (无风险利率: {analyzer.risk_free_rate:.2%})",
+            title_x=0.5
+        )
+
+        # 更新子图标题位置
+        fig_plotly.update_annotations(font_size=14)
+
+        # 保存HTML文件
+        pyo.plot(fig_plotly, filename=chart_html, auto_open=False)
+        print(f"HTML图表已保存为: {chart_html}")
+
+    except ImportError:
+        print("Plotly未安装，无法生成HTML图表")
+
+
+def close_figures():
+    """关闭 pyplot 打开的所有图表 (未导入 pyplot 时无需处理)"""
+    if 'matplotlib.pyplot' in sys.modules:
+        sys.modules['matplotlib.pyplot'].close('all')
@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import threading
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CachedPayload:
+    """预序列化的响应体: 原始字节及 gzip/brotli 压缩版本，附强 ETag"""
+
+    def __init__(self, body, version):
+        self.version = version
+        self.bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=6)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(body)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # 不同编码的字节不同，强 ETag 按编码区分
+        self.etags = {encoding: f'"{digest}"' if encoding == 'identity' else f'"{digest}-{encoding}"'
+                      for encoding in self.bodies}
+
+    @property
+    def size(self):
+        return len(self.bodies['identity'])
+
+
+class ResponseCache:
+    def __init__(self):
+        """按 (键, 数据版本) 缓存序列化后的响应，数据版本变化时重建"""
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version, build):
+        """
+        获取缓存的响应，缺失或版本过期时调用 build() 重新生成
+
+        参数:
+        key: 缓存键，如 ('default', 'data')
+        version: 数据版本号 (分析器数据变化时递增)
+        build: 无参函数，返回序列化后的 bytes
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = CachedPayload(build(), version)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def discard(self, prefix):
+        """移除键首元素为 prefix 的全部缓存 (如某个组合的所有接口)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == prefix]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _choose_encoding(accept_encoding, available):
+    """按 br > gzip > identity 的优先级选择客户端支持的编码"""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        parts = item.strip().split(';')
+        name = parts[0].strip().lower()
+        quality = 1.0
+        for param in parts[1:]:
+            param = param.strip()
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name] = quality
+    for encoding in ('br', 'gzip'):
+        if encoding in available and accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return 'identity'
+
+
+def make_cached_response(payload, request, mimetype='application/json'):
+    """根据请求头返回 304 或压缩后的缓存响应"""
+    encoding = _choose_encoding(request.headers.get('Accept-Encoding', ''), payload.bodies)
+    etag = payload.etags[encoding]
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    client_tags = {tag.strip() for tag in if_none_match.split(',')}
+    if '*' in client_tags or client_tags & set(payload.etags.values()):
+        response = Response(status=304)
+    else:
+        response = Response(payload.bodies[encoding], mimetype=mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
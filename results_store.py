@@ -0,0 +1,226 @@
+import json
+import time
+import hashlib
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from relative_metrics import RELATIVE_KEYS
+
+# 计算列在 series 表中的字段名
+SERIES_COLUMNS = {
+    '单元资产净值(净价)': 'nav',
+    '归一化净值': 'normalized',
+    '日收益率': 'daily_return',
+    '累计收益率': 'cumulative',
+    '滚动最大净值': 'running_max',
+    '回撤': 'drawdown'
+}
+
+# compute 的返回状态说明
+STATUS_LABELS = {
+    'hit': '输入未变，直接读取已保存的结果',
+    'windows': '计算列未变，重算各时间段指标',
+    'append': '只追加了新数据，增量计算尾部',
+    'full': '全量计算'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolios (
+    portfolio TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series (
+    portfolio TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    nav REAL, normalized REAL, daily_return REAL, cumulative REAL, running_max REAL, drawdown REAL,
+    PRIMARY KEY (portfolio, row)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    portfolio TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    risk_free_rate REAL NOT NULL,
+    days_trade REAL NOT NULL,
+    period TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    PRIMARY KEY (portfolio, content_hash, risk_free_rate, days_trade, period)
+) WITHOUT ROWID;
+"""
+
+
+def content_hash(dates, nav, n_rows=None):
+    """前 n_rows 行 (默认全部) 日期与净值的 SHA-256，追加数据后可用旧行数验证前缀未变"""
+    digest = hashlib.sha256()
+    digest.update(dates[:n_rows].tobytes())
+    digest.update(nav[:n_rows].tobytes())
+    return digest.hexdigest()
+
+
+def results_hash(digest, calendar=None):
+    """指标的输入哈希: 数据内容哈希，设置交易日历时再合并日历指纹 (年化方式随日历变化)"""
+    if calendar is None:
+        return digest
+    return hashlib.sha256(f'{digest}:{calendar.fingerprint}'.encode('ascii')).hexdigest()
+
+
+def _encode_metrics(metrics):
+    encoded = {}
+    for key, value in metrics.items():
+        if key in RELATIVE_KEYS:
+            continue  # 相对基准的指标取决于基准，不入库
+        if key == '开始日期':
+            encoded[key] = pd.Timestamp(value).isoformat()
+        elif key == '数据天数':
+            encoded[key] = int(value)
+        else:
+            encoded[key] = float(value)
+    return json.dumps(encoded, ensure_ascii=False)
+
+
+def _decode_metrics(text):
+    metrics = {}
+    for key, value in json.loads(text).items():
+        if key == '开始日期':
+            metrics[key] = pd.Timestamp(value)
+        elif key == '数据天数':
+            metrics[key] = value
+        else:
+            metrics[key] = np.float64(value)
+    return metrics
+
+
+class ResultsStore:
+    def __init__(self, path):
+        """
+        SQLite 结果库: 保存各组合的计算列 (series) 与指标 (results)，
+        指标以 (组合, 输入哈希, 无风险利率, 年交易日数) 为键: 输入哈希为数据内容哈希，
+        使用交易日历时合并日历指纹 (年交易日数为日历的平均值)；每个组合只保留当前输入哈希的指标
+
+        参数:
+        path: 数据库文件路径
+        """
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+        self.hits = 0
+        self.appends = 0
+        self.full = 0
+
+    def _connect(self):
+        # 每次操作使用独立连接，可在多个线程/进程间共用一个结果库
+        return sqlite3.connect(self.path, timeout=30)
+
+    def compute(self, analyzer, portfolio_id):
+        """
+        为分析器填充计算列与指标: 输入未变时直接读取结果库；只追加了新行时只计算尾部的计算列，
+        再重算各时间段指标；其他情况全量计算。新结果在一个事务中批量写回
+
+        返回:
+        'hit' (直接读取)、'windows' (计算列已有，只重算指标)、'append' (尾部增量) 或 'full' (全量)
+        """
+        data = analyzer.data
+        dates = data['统计日期'].values.astype('datetime64[ns]').astype(np.int64)
+        nav = data['单元资产净值(净价)'].to_numpy(dtype=np.float64)
+        digest = content_hash(dates, nav)
+        key = (portfolio_id, results_hash(digest, getattr(analyzer, 'calendar', None)),
+               float(analyzer.risk_free_rate), float(analyzer.days_trade))
+
+        with closing(self._connect()) as conn:
+            state = conn.execute('SELECT content_hash, n_rows FROM portfolios WHERE portfolio = ?',
+                                 (portfolio_id,)).fetchone()
+            if state is not None and state[0] == digest:
+                analyzer.data = self._load_series(conn, portfolio_id)
+                results = self._load_results(conn, key)
+                if results:
+                    self.hits += 1
+                    analyzer.results = results
+                    if analyzer.benchmark is not None:
+                        analyzer.calculate_relative_metrics()
+                    return 'hit'
+                status, new_rows = 'windows', None
+            elif state is not None and state[1] < len(nav) and content_hash(dates, nav, state[1]) == state[0]:
+                # 只追加了新行: 已有行的计算列不变，只计算尾部
+                stored = self._load_series(conn, portfolio_id)
+                tail = extend_series(stored, data.iloc[state[1]:])
+                analyzer.data = pd.concat([stored, tail], ignore_index=True)
+                status, new_rows = 'append', (state[1], tail)
+                self.appends += 1
+            else:
+                analyzer.data = data[['统计日期', '单元资产净值(净价)']].reset_index(drop=True)
+                analyzer._calculate_all()
+                status, new_rows = 'full', (0, analyzer.data)
+                self.full += 1
+
+            if status != 'full':
+                analyzer.results = {}
+                analyzer.calculate_key_metrics()
+                analyzer.calculate_period_metrics()
+
+            with conn:
+                if new_rows is not None:
+                    self._save_series(conn, portfolio_id, digest, *new_rows)
+                # 数据或日历已变化的旧指标不会再被读取，在同一事务中删除
+                conn.execute('DELETE FROM results WHERE portfolio = ? AND content_hash != ?', key[:2])
+                conn.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                                 [key + (period, _encode_metrics(metrics))
+                                  for period, metrics in analyzer.results.items()])
+        return status
+
+    def _load_series(self, conn, portfolio_id):
+        columns = ', '.join(SERIES_COLUMNS.values())
+        rows = conn.execute(f'SELECT date, {columns} FROM series WHERE portfolio = ? ORDER BY row',
+                            (portfolio_id,)).fetchall()
+        # NaN 在 SQLite 中保存为 NULL，转换为 float 数组时恢复为 NaN
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(SERIES_COLUMNS))
+        frame = pd.DataFrame({'统计日期': pd.to_datetime(np.array([row[0] for row in rows], dtype=np.int64)
+                                                       .astype('datetime64[ns]'))})
+        for i, column in enumerate(SERIES_COLUMNS):
+            frame[column] = values[:, i]
+        return frame
+
+    def _load_results(self, conn, key):
+        rows = conn.execute('SELECT period, metrics FROM results WHERE portfolio = ? AND content_hash = ? '
+                            'AND risk_free_rate = ? AND days_trade = ?', key).fetchall()
+        return {period: _decode_metrics(metrics) for period, metrics in rows}
+
+    def _save_series(self, conn, portfolio_id, digest, start_row, frame):
+        """在调用方的事务中写入从 start_row 起的计算列 (全量时先删除旧数据)"""
+        if start_row == 0:
+            conn.execute('DELETE FROM series WHERE portfolio = ?', (portfolio_id,))
+        dates = frame['统计日期'].values.astype('datetime64[ns]').astype(np.int64).tolist()
+        columns = [frame[column].tolist() for column in SERIES_COLUMNS]
+        conn.executemany('INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         [(portfolio_id, start_row + i, date, *values)
+                          for i, (date, *values) in enumerate(zip(dates, *columns))])
+        conn.execute('INSERT OR REPLACE INTO portfolios VALUES (?, ?, ?, ?)',
+                     (portfolio_id, digest, start_row + len(frame), time.strftime('%Y-%m-%d %H:%M:%S')))
+
+
+def extend_series(stored, new_data):
+    """
+    由已有计算列的最后一行延续计算新行的计算列，与 calculate_performance_metrics 的逐元素运算相同
+
+    参数:
+    stored: 已有的计算列 (非空)
+    new_data: 新追加的行 ('统计日期' 与 '单元资产净值(净价)')
+    """
+    initial_nav = stored['单元资产净值(净价)'].iloc[0]
+    nav = new_data['单元资产净值(净价)'].to_numpy(dtype=np.float64)
+    normalized = nav / initial_nav
+    previous = np.concatenate([[stored['归一化净值'].iloc[-1]], normalized[:-1]])
+    running_max = np.maximum.accumulate(np.concatenate([[stored['滚动最大净值'].iloc[-1]], normalized]))[1:]
+    return pd.DataFrame({
+        '统计日期': pd.to_datetime(new_data['统计日期']).values.astype('datetime64[ns]'),
+        '单元资产净值(净价)': nav,
+        '归一化净值': normalized,
+        '日收益率': normalized / previous - 1,
+        '累计收益率': normalized - 1,
+        '滚动最大净值': running_max,
+        '回撤': (normalized - running_max) / running_max
+    })
@@ -0,0 +1,90 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# 默认滚动窗口 (交易日)
+ROLLING_WINDOWS = (60, 120, 250)
+
+
+def rolling_std(values, window):
+    """
+    滚动样本标准差 (ddof=1)，基于累积和 O(n) 计算，跳过缺失值；
+    第 t 个结果对应 [t-window+1, t] 行，窗口未满或有效值不足2个时为NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    # 减去整体均值后再累加，降低大数相减的精度损失
+    shift = values[valid].mean() if valid.any() else 0.0
+    centered = np.where(valid, values - shift, 0.0)
+    count = np.concatenate([[0], np.cumsum(valid)])
+    s1 = np.concatenate([[0.0], np.cumsum(centered)])
+    s2 = np.concatenate([[0.0], np.cumsum(centered * centered)])
+
+    result = np.full(len(values), np.nan)
+    if len(values) < window:
+        return result
+    n = count[window:] - count[:-window]
+    sum1 = s1[window:] - s1[:-window]
+    sum2 = s2[window:] - s2[:-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = np.maximum(sum2 - sum1 * sum1 / n, 0.0) / (n - 1)
+    result[window - 1:] = np.where(n >= 2, np.sqrt(var), np.nan)
+    return result
+
+
+def rolling_min(values, window):
+    """滚动最小值，单调队列 O(n)；窗口未满时为NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    candidates = deque()  # 保存下标，对应的值单调递增
+    for i, value in enumerate(values):
+        while candidates and values[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1:
+            result[i] = values[candidates[0]]
+    return result
+
+
+def calculate_rolling_metrics(data, window, risk_free_rate=0.02, days_trade=251):
+    """
+    计算滚动窗口指标，每个窗口的口径与 calculate_period_metrics 的区间指标一致
+
+    参数:
+    data: 已执行 calculate_performance_metrics 的DataFrame
+    window: 窗口长度 (交易日)
+    risk_free_rate: 无风险年化收益率
+    days_trade: 年交易日数
+
+    返回:
+    DataFrame，列为 滚动年化波动率/滚动夏普比率/滚动最大回撤 (带窗口长度后缀)
+    """
+    nav = data['归一化净值'].to_numpy(dtype=np.float64)
+    n = len(nav)
+
+    # 滚动区间收益率与年化收益率
+    period_return = np.full(n, np.nan)
+    if n >= window:
+        period_return[window - 1:] = nav[window - 1:] / nav[:n - window + 1] - 1
+    years = window / days_trade
+    annual_return = (1 + period_return) ** (1 / years) - 1
+
+    # 滚动年化波动率 (累积和方差)
+    annual_volatility = rolling_std(data['日收益率'].to_numpy(dtype=np.float64), window) * np.sqrt(days_trade)
+
+    # 滚动夏普比率
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = np.where(annual_volatility > 0,
+                                (annual_return - risk_free_rate) / annual_volatility,
+                                np.where(np.isnan(annual_volatility), np.nan, 0.0))
+
+    # 滚动最大回撤 (单调队列滚动最小值)
+    max_drawdown = rolling_min(data['回撤'].to_numpy(dtype=np.float64), window)
+
+    return pd.DataFrame({
+        f'滚动年化波动率({window}日)': annual_volatility,
+        f'滚动夏普比率({window}日)': sharpe_ratio,
+        f'滚动最大回撤({window}日)': max_drawdown
+    }, index=data.index)
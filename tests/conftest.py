@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# 测试直接导入仓库根目录下的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def portfolio_app(tmp_path, monkeypatch):
+    """
+    以临时数据目录中的三个组合 (P0/P1/P2.xlsx) 运行 Flask 应用，
+    注册表与响应缓存为每个测试新建，返回 (app 模块, 测试客户端)
+    """
+    import app as app_module
+    from analyzer_registry import AnalyzerRegistry
+    from response_cache import ResponseCache
+    from helpers import nav_frame
+
+    for i in range(3):
+        nav_frame(300, seed=i).to_excel(tmp_path / f'P{i}.xlsx', sheet_name='单元资产2025', index=False)
+    monkeypatch.setattr(app_module, 'PORTFOLIO_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, 'NAV_STORE_DIR', None)
+    monkeypatch.setattr(app_module, 'results_store', None)
+    monkeypatch.setattr(app_module, 'response_cache', ResponseCache())
+    monkeypatch.setattr(app_module, 'registry', AnalyzerRegistry(app_module.build_portfolio_analyzer,
+                                                               on_evict=app_module.registry.on_evict))
+    return app_module, app_module.app.test_client()
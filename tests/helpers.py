@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from Investment_evaluation import InvestmentPerformanceAnalyzer
+
+
+def nav_frame(n=800, seed=0, start='2021-01-04', gap_rate=0.0):
+    """合成的每日净值 (工作日，可按比例随机缺失)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n).astype('datetime64[ns]')
+    nav = np.cumprod(1 + rng.normal(3e-4, 0.01, n))
+    keep = rng.random(n) >= gap_rate
+    keep[0] = True
+    return pd.DataFrame({'统计日期': dates[keep], '单元资产净值(净价)': nav[keep]}).reset_index(drop=True)
+
+
+def analyze(data, **kwargs):
+    """以DataFrame代替Excel文件运行单序列分析器"""
+    analyzer = InvestmentPerformanceAnalyzer('test.xlsx', **kwargs)
+    analyzer.data = data.copy()
+    analyzer.calculate_performance_metrics()
+    return analyzer
+
+
+def assert_results_close(actual, expected, rtol=1e-9, atol=1e-12):
+    """两份 results (时间段 -> 指标) 的时间段、指标字段与数值一致"""
+    assert set(actual) == set(expected)
+    for period, metrics in expected.items():
+        assert set(actual[period].keys()) == set(metrics.keys()), period
+        for key in metrics.keys():
+            if key == '开始日期':
+                assert pd.Timestamp(actual[period][key]) == pd.Timestamp(metrics[key]), (period, key)
+            else:
+                np.testing.assert_allclose(float(actual[period][key]), float(metrics[key]), rtol=rtol, atol=atol,
+                                           err_msg=f'{period} {key}')
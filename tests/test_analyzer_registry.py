@@ -0,0 +1,62 @@
+import threading
+import time
+
+from analyzer_registry import AnalyzerRegistry
+
+
+class FakeAnalyzer:
+    def __init__(self, size):
+        self.size = size
+
+    def memory_usage(self):
+        return self.size
+
+
+def test_lru_eviction_by_bytes_and_entries():
+    evicted = []
+    registry = AnalyzerRegistry(lambda pid: None if pid == 'missing' else FakeAnalyzer(100), max_bytes=300,
+                                on_evict=lambda pid, _: evicted.append(pid))
+    for pid in ('A', 'B', 'C'):
+        registry.get(pid)
+    registry.get('A')  # A 变为最近使用
+    registry.get('D')
+    assert evicted == ['B']
+    assert 'A' in registry and 'B' not in registry and registry.total_bytes == 300
+    assert registry.get('missing') is None and 'missing' not in registry
+
+    registry.max_entries = 2
+    registry.get('E')
+    assert evicted == ['B', 'C', 'A']
+    assert len(registry) == 2
+
+
+def test_concurrent_first_requests_build_once():
+    builds = []
+
+    def builder(pid):
+        builds.append(pid)
+        time.sleep(0.05)
+        return FakeAnalyzer(10)
+
+    registry = AnalyzerRegistry(builder)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('A'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == ['A']
+    assert all(result is results[0] for result in results)
+
+
+def test_portfolio_routes_and_eviction(portfolio_app):
+    app_module, client = portfolio_app
+    assert client.get('/api/P0/data').status_code == 200
+    assert client.get('/api/P1/metrics').status_code == 200
+    assert client.get('/api/P9/summary').status_code == 404
+    assert client.get('/api/..%2FP0/data').status_code == 404
+    assert client.get('/api/portfolios').get_json()['portfolios'] == ['P0', 'P1', 'P2']
+
+    # 淘汰组合时一并清除其响应缓存
+    app_module.registry.discard('P0')
+    assert not any(key[0] == 'P0' for key in app_module.response_cache._entries)
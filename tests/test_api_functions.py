@@ -0,0 +1,19 @@
+import importlib
+
+import pytest
+
+from api._artifact_io import load_payload
+
+
+@pytest.mark.parametrize('name', ['data', 'metrics', 'summary'])
+def test_functions_serve_artifact(name):
+    module = importlib.import_module(f'api.{name}')
+    client = module.app.test_client()
+    response = client.get(f'/api/{name}')
+    assert response.status_code == 200
+    assert response.data == load_payload(f'{name}.json')
+    assert client.get(f'/api/{name}', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_missing_artifact_returns_none():
+    assert load_payload('不存在.json') is None
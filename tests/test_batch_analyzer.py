@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from batch_analyzer import BatchPerformanceAnalyzer
+from trading_calendar import TradingCalendar
+from helpers import nav_frame, analyze, assert_results_close
+
+
+@pytest.fixture(scope='module')
+def series():
+    # 起止日期与缺失各不相同的组合
+    return {f'P{i}': nav_frame(700 + 40 * i, seed=i, start=f'2020-0{i + 1}-01', gap_rate=0.03 * (i % 2))
+            for i in range(4)}
+
+
+def test_batch_matches_single(series):
+    batch = BatchPerformanceAnalyzer()
+    batch.load_series(series)
+    batch.calculate_performance_metrics()
+    for portfolio_id, data in series.items():
+        single = analyze(data)
+        assert_results_close(batch.results[portfolio_id], single.results)
+        pd.testing.assert_frame_equal(batch.get_data(portfolio_id), single.data, check_dtype=False)
+
+
+def test_batch_matches_single_with_benchmark(series):
+    benchmark = nav_frame(1200, seed=99, start='2019-12-02').set_index('统计日期')['单元资产净值(净价)']
+    batch = BatchPerformanceAnalyzer()
+    batch.load_series(series)
+    batch.set_benchmark(benchmark)
+    batch.calculate_performance_metrics()
+    for portfolio_id, data in series.items():
+        assert_results_close(batch.results[portfolio_id], analyze(data, benchmark=benchmark).results)
+
+
+def test_batch_matches_single_with_calendar(series):
+    calendar = TradingCalendar(pd.bdate_range('2019-01-01', '2024-12-31'))
+    batch = BatchPerformanceAnalyzer(calendar=calendar)
+    batch.load_series(series)
+    batch.calculate_performance_metrics()
+    for portfolio_id, data in series.items():
+        single = analyze(data, calendar=calendar)
+        assert_results_close(batch.results[portfolio_id], single.results)
+        # 日历切片的区间边界与按日期筛选一致
+        plain = analyze(data)
+        for period, metrics in plain.results.items():
+            assert single.results[period]['数据天数'] == metrics['数据天数']
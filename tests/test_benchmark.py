@@ -0,0 +1,18 @@
+from benchmark import compare
+
+
+def test_compare_gates_seconds_and_peak_memory():
+    baseline = {
+        'a': {'seconds': 1.0, 'peak_mb': 100.0},
+        'b': {'seconds': 1.0, 'peak_mb': 100.0},
+        'c': {'seconds': 1.0, 'peak_mb': None},
+    }
+    current = {
+        'a': {'seconds': 1.5, 'peak_mb': 100.0},
+        'b': {'seconds': 1.0, 'peak_mb': 150.0},
+        # 基线未测量内存时只比较耗时
+        'c': {'seconds': 1.1, 'peak_mb': 500.0},
+        'new': {'seconds': 9.0, 'peak_mb': 9.0},
+    }
+    assert compare(current, baseline, 0.2) == [('a', 'seconds', 1.0, 1.5, 1.5), ('b', 'peak_mb', 100.0, 150.0, 1.5)]
+    assert compare(current, baseline, 0.6) == []
@@ -0,0 +1,29 @@
+import numpy as np
+
+from bootstrap import block_indices, bootstrap_intervals
+from helpers import nav_frame, analyze
+
+
+def test_intervals_independent_of_worker_count():
+    returns = {'A': np.random.default_rng(0).normal(3e-4, 0.01, 300), 'B': np.random.default_rng(1).normal(0, 0.02, 90)}
+    serial = bootstrap_intervals(returns, n_resamples=600, seed=7, chunk_size=100, max_workers=1)
+    parallel = bootstrap_intervals(returns, n_resamples=600, seed=7, chunk_size=100, max_workers=3)
+    assert serial == parallel
+    assert serial != bootstrap_intervals(returns, n_resamples=600, seed=8, chunk_size=100)
+
+
+def test_block_indices_are_contiguous_blocks():
+    indices = block_indices(np.random.default_rng(0), 50, 20, 7)
+    assert indices.shape == (20, 50)
+    steps = np.diff(indices, axis=1) % 50
+    # 块内下标连续 (循环)，每7个位置才可能跳转
+    assert np.all(steps.reshape(20, -1)[:, [i for i in range(49) if i % 7 != 6]] == 1)
+
+
+def test_analyzer_intervals_contain_point_estimates():
+    analyzer = analyze(nav_frame(800, seed=3))
+    intervals = analyzer.bootstrap_intervals(n_resamples=400, seed=0)
+    assert set(intervals) == set(analyzer.results)
+    for period, metrics in intervals.items():
+        lower, upper = metrics['年化波动率']
+        assert lower <= analyzer.results[period]['年化波动率'] <= upper, period
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from analyzer_registry import AnalyzerRegistry
+from compact import CompactSeries
+from helpers import nav_frame, analyze, assert_results_close
+
+
+def test_compact_matches_standard():
+    data = nav_frame(800)
+    compact, standard = analyze(data, compact=True), analyze(data)
+    assert_results_close(compact.results, standard.results)
+    assert compact.memory_usage() < standard.memory_usage()
+
+
+def test_memory_usage_counts_derived_caches():
+    analyzer = analyze(nav_frame(5000), compact=True)
+    base = analyzer.memory_usage()
+    analyzer.downsample(max_points=200)
+    analyzer.metrics_between('2022-01-01', '2030-01-01')
+    analyzer.drawdown_episodes(k=3)
+    analyzer.rolling_metrics(60)
+    assert analyzer.memory_usage() > 10 * base
+
+
+def test_registry_resizes_when_caches_are_built():
+    analyzers = {f'P{i}': analyze(nav_frame(5000, seed=i), compact=True) for i in range(3)}
+    size = analyzers['P0'].memory_usage()
+    registry = AnalyzerRegistry(analyzers.get, max_bytes=4 * size)
+    for portfolio_id in analyzers:
+        registry.get(portfolio_id)
+    assert len(registry) == 3 and registry.total_bytes == 3 * size
+
+    # 构建派生缓存后超出预算，淘汰最久未使用的分析器
+    registry.get('P2').metrics_between()
+    assert registry.total_bytes == sum(analyzers[p].memory_usage() for p in analyzers if p in registry)
+    assert 'P0' not in registry and 'P2' in registry
+    assert registry.total_bytes <= 4 * size or len(registry) == 1
+
+
+def test_compact_downsample_matches_standard():
+    data = nav_frame(5000, seed=4)
+    compact, standard = analyze(data, compact=True), analyze(data)
+    for start, end, max_points in [(None, None, 300), ('2025-01-01', '2030-12-31', 100), (None, '2022-06-30', 50)]:
+        pd.testing.assert_frame_equal(compact.downsample(start, end, max_points),
+                                      standard.downsample(start, end, max_points), check_index_type=False)
+
+
+def test_compact_cached_paths_do_not_rebuild_frame(monkeypatch):
+    analyzer = analyze(nav_frame(3000), compact=True)
+    analyzer.downsample(max_points=100)
+    analyzer.metrics_between()
+    analyzer.drawdown_episodes(k=3)
+    analyzer.rolling_metrics(60)
+
+    def fail(self):
+        raise AssertionError('不应展开整个序列')
+    monkeypatch.setattr(CompactSeries, 'to_frame', fail)
+    analyzer.downsample('2022-01-01', '2023-01-01', 100)
+    analyzer.metrics_between('2022-01-01', '2023-01-01')
+    analyzer.drawdown_episodes(k=2, start='2022-01-01')
+    analyzer.rolling_metrics(60)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from correlation import returns_matrix, correlation_matrix, top_pairs
+from helpers import nav_frame, analyze
+
+
+def test_correlation_matches_pandas():
+    # 起止日期与缺失不同的组合: 缺失值成对处理
+    series = {f'P{i}': analyze(nav_frame(200 + 30 * i, seed=i, start=f'2021-0{i + 1}-01', gap_rate=0.1)).data
+              for i in range(5)}
+    labels, dates, matrix = returns_matrix(series)
+    expected = pd.DataFrame(matrix, columns=labels).corr(min_periods=20).to_numpy()
+    for dtype, rtol in ((np.float64, 1e-10), (np.float32, 1e-5)):
+        corr = correlation_matrix(matrix, block_size=2, dtype=dtype, min_periods=20)
+        np.testing.assert_allclose(corr, expected, rtol=rtol, atol=rtol)
+
+    pairs = top_pairs(expected, labels, k=3)
+    assert len(pairs) == 3
+
+
+def test_correlation_route_is_cached_without_loading(portfolio_app):
+    app_module, client = portfolio_app
+    first = client.get('/api/correlation?k=2&portfolios=P2,P0,P1')
+    assert first.status_code == 200
+
+    # 命中缓存时不访问注册表 (组合顺序不影响缓存键)
+    def fail(portfolio_id):
+        raise AssertionError('缓存命中时不应加载组合')
+    app_module.registry.get = fail
+    second = client.get('/api/correlation?k=2&portfolios=P0,P1,P2')
+    assert second.data == first.data
+    assert client.get('/api/correlation?k=2&portfolios=P0,P1,P2',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    assert client.get('/api/correlation?portfolios=P0,P9').status_code == 404
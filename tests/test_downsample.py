@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from helpers import nav_frame, analyze
+
+
+def test_downsample_keeps_endpoints_and_trough():
+    analyzer = analyze(nav_frame(5000, seed=2))
+    data = analyzer.data
+    for start, end, max_points in [(None, None, 200), ('2023-01-01', '2031-06-30', 150), (None, None, 10)]:
+        sampled = analyzer.downsample(start, end, max_points)
+        lo = data['统计日期'] >= pd.Timestamp(start) if start else np.ones(len(data), dtype=bool)
+        hi = data['统计日期'] <= pd.Timestamp(end) if end else np.ones(len(data), dtype=bool)
+        window = data[lo & hi]
+        assert len(sampled) <= max_points
+        assert sampled['统计日期'].is_monotonic_increasing
+        assert sampled.index[0] == window.index[0] and sampled.index[-1] == window.index[-1]
+        assert window['回撤'].idxmin() in sampled.index
+
+
+def test_downsample_small_range_unchanged():
+    analyzer = analyze(nav_frame(300))
+    pd.testing.assert_frame_equal(analyzer.downsample(max_points=1000), analyzer.data)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from drawdowns import DrawdownIndex, extract_episodes
+from helpers import nav_frame, analyze
+
+
+def brute_force_episodes(drawdown):
+    """逐行扫描的参考实现: [(峰值, 谷底, 恢复, 幅度)]"""
+    episodes = []
+    start = None
+    for i, value in enumerate(list(drawdown) + [0.0]):
+        if value < 0 and start is None:
+            start = i
+        elif value >= 0 and start is not None:
+            segment = drawdown[start:i]
+            trough = start + int(np.argmin(segment))
+            episodes.append((max(start - 1, 0), trough, i if i < len(drawdown) else -1, float(segment.min())))
+            start = None
+    return episodes
+
+
+def test_episodes_match_brute_force():
+    for seed in range(5):
+        drawdown = analyze(nav_frame(600, seed=seed)).data['回撤'].to_numpy()
+        assert extract_episodes(drawdown).tolist() == brute_force_episodes(drawdown)
+    assert len(extract_episodes(np.zeros(10))) == 0
+    # 最后一个事件尚未恢复
+    assert extract_episodes(np.array([0.0, -0.1, -0.2, 0.0, -0.05])).tolist() == \
+        [(0, 2, 3, -0.2), (3, 4, -1, -0.05)]
+
+
+def test_top_and_between_queries():
+    analyzer = analyze(nav_frame(800, seed=12))
+    index = DrawdownIndex(analyzer.data)
+    depths = index.top()['depth']
+    assert np.all(np.diff(depths) >= 0)
+    assert index.top(3).tolist() == index.top()[:3].tolist()
+
+    dates = analyzer.data['统计日期']
+    start, end = dates.iloc[200], dates.iloc[400]
+    expected = [episode for episode in index.episodes.tolist()
+                if dates.iloc[episode[0]] <= end and
+                dates.iloc[episode[2] if episode[2] >= 0 else len(dates) - 1] >= start]
+    assert index.between(start, end).tolist() == expected
+
+    records = index.to_records(index.top(1))
+    assert records[0]['回撤幅度'] == analyzer.data['回撤'].min()
+    assert records[0]['谷底日期'] == pd.Timestamp(dates.iloc[analyzer.data['回撤'].idxmin()])
@@ -0,0 +1,41 @@
+import os
+
+import pandas as pd
+import pytest
+
+from excel_cache import cache_path_for, read_excel_cached
+from Investment_evaluation import InvestmentPerformanceAnalyzer
+from helpers import nav_frame
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    data = nav_frame(50)
+    data['备注'] = [f'第{i}天' for i in range(len(data))]
+    path = str(tmp_path / '组合.xlsx')
+    data.to_excel(path, sheet_name='单元资产2025', index=False)
+    return path, data
+
+
+def test_default_load_keeps_all_columns(workbook):
+    path, data = workbook
+    analyzer = InvestmentPerformanceAnalyzer(path)
+    assert analyzer.load_data()
+    assert '备注' in analyzer.data
+    assert not os.path.exists(cache_path_for(path, '单元资产2025'))
+
+
+def test_cache_roundtrip_and_invalidation(workbook):
+    path, data = workbook
+    first = read_excel_cached(path)
+    pd.testing.assert_frame_equal(first, data[['统计日期', '单元资产净值(净价)']], check_dtype=False)
+    assert os.path.exists(cache_path_for(path, '单元资产2025'))
+
+    # 只改修改时间: 内容哈希一致，复用缓存
+    os.utime(path, ns=(0, 0))
+    pd.testing.assert_frame_equal(read_excel_cached(path), first)
+
+    # 内容变化: 重新解析
+    changed = data.iloc[:30]
+    changed.to_excel(path, sheet_name='单元资产2025', index=False)
+    assert len(read_excel_cached(path)) == 30
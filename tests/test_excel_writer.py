@@ -0,0 +1,28 @@
+import os
+
+import pandas as pd
+
+from helpers import nav_frame, analyze
+
+
+def test_streaming_workbook_matches_standard(tmp_path):
+    analyzer = analyze(nav_frame(500, seed=8))
+    standard, streaming = str(tmp_path / 'standard.xlsx'), str(tmp_path / 'streaming.xlsx')
+    analyzer._save_excel(standard, 'standard', 'xlsx')
+    analyzer._save_excel(streaming, 'streaming', 'xlsx')
+
+    expected = pd.read_excel(standard, sheet_name=None)
+    actual = pd.read_excel(streaming, sheet_name=None)
+    assert list(actual) == list(expected)
+    for sheet, frame in expected.items():
+        pd.testing.assert_frame_equal(actual[sheet], frame, check_dtype=False, obj=sheet)
+    pd.testing.assert_frame_equal(actual['分析数据'], analyzer.data, check_dtype=False)
+
+
+def test_data_exported_to_separate_csv(tmp_path):
+    analyzer = analyze(nav_frame(100, seed=9))
+    output = str(tmp_path / '结果.xlsx')
+    analyzer._save_excel(output, 'streaming', 'csv')
+    assert '分析数据' not in pd.read_excel(output, sheet_name=None)
+    data = pd.read_csv(os.path.splitext(output)[0] + '_分析数据.csv', parse_dates=['统计日期'])
+    pd.testing.assert_frame_equal(data, analyzer.data, check_dtype=False)
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from export_jobs import ExportJobManager
+from helpers import nav_frame, analyze
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ExportJobManager(output_root=str(tmp_path), max_workers=1)
+    yield manager
+    manager.shutdown()
+
+
+def test_export_runs_in_worker_and_deduplicates(manager):
+    analyzer = analyze(nav_frame(120))
+    job, created = manager.submit(analyzer)
+    assert created
+    job.future.result(timeout=120)
+    assert job.status == 'done'
+    assert os.path.exists(job.files['excel'])
+
+    # 相同数据复用已完成的任务，不同前缀 (组合) 新建任务
+    assert manager.submit(analyzer) == (job, False)
+    other, created = manager.submit(analyzer, prefix='P1')
+    assert created and other is not job
+    other.future.result(timeout=120)
+
+
+def test_submit_failure_marks_job_failed(manager):
+    analyzer = analyze(nav_frame(50))
+    analyzer.unpicklable = lambda: None
+    with pytest.raises(Exception):
+        manager.submit(analyzer)
+    failed = list(manager._jobs.values())[-1]
+    assert failed.status == 'failed' and failed.finished_at is not None
+
+    # 失败的任务不再被去重复用，也不占用排队名额
+    del analyzer.unpicklable
+    manager.max_pending = 1
+    job, created = manager.submit(analyzer)
+    assert created and job is not failed
+    assert manager.submit(analyze(nav_frame(60))) == (None, False)
+    job.future.result(timeout=120)
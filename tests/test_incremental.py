@@ -0,0 +1,26 @@
+import pytest
+
+from helpers import nav_frame, analyze, assert_results_close
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_append_matches_full_recompute(compact):
+    data = nav_frame(600)
+    analyzer = analyze(data.iloc[:560], compact=compact)
+    for date, nav in data.iloc[560:].itertuples(index=False):
+        assert analyzer.append(date, nav)
+    assert_results_close(analyzer.results, analyze(data).results)
+
+
+def test_append_keeps_relative_metrics():
+    data = nav_frame(600)
+    benchmark = nav_frame(600, seed=5).set_index('统计日期')['单元资产净值(净价)']
+    analyzer = analyze(data.iloc[:590], benchmark=benchmark)
+    for date, nav in data.iloc[590:].itertuples(index=False):
+        analyzer.append(date, nav)
+    assert_results_close(analyzer.results, analyze(data, benchmark=benchmark).results)
+
+
+def test_append_rejects_old_dates():
+    analyzer = analyze(nav_frame(100))
+    assert not analyzer.append(analyzer.data['统计日期'].iloc[-1], 1.0)
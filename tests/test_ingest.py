@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import merge_sorted, load_workbooks
+from helpers import nav_frame
+
+
+def reference_merge(runs):
+    """参考实现: 拼接后按日期稳定排序，同一日期保留靠后的数据源"""
+    frame = pd.concat([pd.DataFrame({'date': dates, 'nav': nav, 'source': i}) for i, (dates, nav) in enumerate(runs)])
+    frame = frame.sort_values(['date', 'source'], kind='stable').drop_duplicates('date', keep='last')
+    return frame['date'].to_numpy(), frame['nav'].to_numpy()
+
+
+@pytest.mark.parametrize('overlap', [False, True])
+def test_merge_sorted_matches_reference(overlap):
+    rng = np.random.default_rng(0)
+    runs = []
+    for i in range(5):
+        start = i * (50 if overlap else 200)
+        dates = np.sort(rng.choice(np.arange(start, start + 200), size=120, replace=False)).astype(np.int64)
+        runs.append((dates, rng.random(120) + i))
+    rng.shuffle(runs)
+    dates, nav = merge_sorted(runs)
+    expected_dates, expected_nav = reference_merge(runs)
+    np.testing.assert_array_equal(dates, expected_dates)
+    np.testing.assert_array_equal(nav, expected_nav)
+    assert len(merge_sorted([])[0]) == 0
+
+
+def test_load_workbooks_merges_matching_sheets(tmp_path):
+    data = nav_frame(500, seed=4)
+    first, second = str(tmp_path / 'a.xlsx'), str(tmp_path / 'b.xlsx')
+    with pd.ExcelWriter(first) as writer:
+        data.iloc[:200].to_excel(writer, sheet_name='单元资产2021', index=False)
+        data.iloc[150:300].to_excel(writer, sheet_name='单元资产2022', index=False)
+        data.iloc[:10].assign(**{'单元资产净值(净价)': 0.0}).to_excel(writer, sheet_name='备注', index=False)
+    with pd.ExcelWriter(second) as writer:
+        # 与第一个工作簿重叠的日期以靠后的工作簿为准
+        data.iloc[280:].assign(**{'单元资产净值(净价)': data['单元资产净值(净价)'].iloc[280:] * 2}).to_excel(
+            writer, sheet_name='单元资产2023', index=False)
+
+    expected = data.copy()
+    expected.loc[280:, '单元资产净值(净价)'] *= 2
+    for use_processes in (False, True):
+        merged, report = load_workbooks([first, second], max_workers=2, use_processes=use_processes, use_cache=False)
+        pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
+        assert [row['工作表数'] for row in report] == [2, 1, 3]
+
+    with pytest.raises(ValueError):
+        load_workbooks([first], sheet_pattern='^不存在$')
@@ -0,0 +1,34 @@
+from instrumentation import StageTimer, HistogramSink, CallbackSink, format_histogram, format_gauge
+from helpers import nav_frame, analyze
+
+
+def test_histogram_buckets_and_prometheus_format():
+    histogram = HistogramSink(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.record('excel_parse', value, {'portfolio': 'P"0'})
+    lines = format_histogram('stage_seconds', '阶段耗时', histogram)
+    assert 'stage_seconds_bucket{stage="excel_parse",portfolio="P\\"0",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="excel_parse",portfolio="P\\"0",le="1.0"} 3' in lines
+    assert 'stage_seconds_bucket{stage="excel_parse",portfolio="P\\"0",le="+Inf"} 4' in lines
+    assert 'stage_seconds_count{stage="excel_parse",portfolio="P\\"0"} 4' in lines
+    assert format_gauge('hits', '命中', {(('cache', 'a'),): 3}, metric_type='counter')[1:] == \
+        ['# TYPE hits counter', 'hits{cache="a"} 3']
+
+
+def test_analyzer_stages_are_timed():
+    records = []
+    timer = StageTimer([CallbackSink(lambda stage, seconds, labels: records.append((stage, seconds)))])
+    analyze(nav_frame(100), timer=timer)
+    stages = [stage for stage, _ in records]
+    assert stages and all(seconds >= 0 for _, seconds in records)
+    assert len(set(stages)) == len(stages)
+
+
+def test_metrics_endpoint(portfolio_app):
+    app_module, client = portfolio_app
+    client.get('/api/P0/summary')
+    client.get('/api/P0/summary')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'cache_requests_total{cache="analyzer",result="hit"} 1' in text
+    assert 'cache_requests_total{cache="analyzer",result="miss"} 1' in text
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark import IMPORT_BUDGETS, LAZY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS) + ['batch_reports', 'export_jobs'])
+def test_import_does_not_load_heavy_modules(module):
+    # 在新的解释器中导入，检查绘图与Excel写出库没有被提前导入
+    code = f"import sys, {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == ''
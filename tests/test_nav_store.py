@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nav_store import NavStore, HEADER, RECORD_DTYPE, read_nav_file
+from helpers import nav_frame
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NavStore(str(tmp_path))
+
+
+def test_append_and_read_roundtrip(store):
+    data = nav_frame(300, seed=2)
+    assert store.import_frame('P0', data.iloc[:200]) == 200
+    # 重复导入只追加新日期
+    assert store.import_frame('P0', data) == 100
+    pd.testing.assert_frame_equal(store.read_frame('P0'), data, check_dtype=False)
+    window = store.read_frame('P0', data['统计日期'].iloc[50], data['统计日期'].iloc[99])
+    pd.testing.assert_frame_equal(window, data.iloc[50:100].reset_index(drop=True), check_dtype=False)
+    assert store.info('P0')['records'] == 300 and store.portfolios() == ['P0']
+
+    with pytest.raises(ValueError):
+        store.append('P0', data['统计日期'].iloc[:1], [1.0])
+    with pytest.raises(ValueError):
+        store.path_for('../P0')
+
+
+def test_torn_tail_is_invisible_and_truncated(store):
+    data = nav_frame(100, seed=3)
+    store.import_frame('P0', data.iloc[:60])
+    path = store.path_for('P0')
+    # 模拟写入记录后、提交文件头前崩溃: 文件末尾有一条半写入的记录
+    with open(path, 'ab') as f:
+        f.write(np.zeros(1, dtype=RECORD_DTYPE).tobytes()[:7])
+    assert len(read_nav_file(path)) == 60
+
+    store.import_frame('P0', data)
+    pd.testing.assert_frame_equal(store.read_frame('P0'), data, check_dtype=False)
+    with open(path, 'rb') as f:
+        assert len(f.read()) == HEADER.size + 100 * RECORD_DTYPE.itemsize
+
+
+def test_analyzer_reads_nav_file(store):
+    from Investment_evaluation import InvestmentPerformanceAnalyzer
+    data = nav_frame(80, seed=4)
+    store.import_frame('P0', data)
+    analyzer = InvestmentPerformanceAnalyzer(store.path_for('P0'))
+    assert analyzer.load_data()
+    pd.testing.assert_frame_equal(analyzer.data, data, check_dtype=False)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from helpers import nav_frame, analyze, assert_results_close
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return analyze(nav_frame(1200, seed=11, gap_rate=0.05))
+
+
+def test_metrics_between_matches_period_metrics(analyzer):
+    for period, metrics in analyzer.results.items():
+        if period == '总体指标':
+            continue
+        between = analyzer.metrics_between(start=metrics['开始日期'])
+        del between['结束日期']
+        assert_results_close({period: between}, {period: metrics})
+
+
+def test_metrics_between_matches_slices(analyzer):
+    data = analyzer.data
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        i, j = sorted(rng.choice(len(data), size=2, replace=False))
+        window = data.iloc[i:j + 1]
+        metrics = analyzer.metrics_between(window['统计日期'].iloc[0], window['统计日期'].iloc[-1])
+        assert metrics['数据天数'] == len(window)
+        np.testing.assert_allclose(metrics['总收益率'],
+                                   window['归一化净值'].iloc[-1] / window['归一化净值'].iloc[0] - 1, rtol=1e-12)
+        np.testing.assert_allclose(metrics['年化波动率'], window['日收益率'].std() * np.sqrt(analyzer.days_trade),
+                                   rtol=1e-9)
+        assert metrics['最大回撤'] == window['回撤'].min()
+
+
+def test_metrics_between_short_range(analyzer):
+    first = analyzer.data['统计日期'].iloc[0]
+    assert analyzer.metrics_between(first, first) is None
+    with pytest.raises(ValueError):
+        analyzer.metrics_between('不是日期')
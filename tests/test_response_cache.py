@@ -0,0 +1,53 @@
+import gzip
+
+from response_cache import ResponseCache
+from helpers import nav_frame, analyze
+
+
+def test_cache_rebuilds_on_version_change():
+    cache = ResponseCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return b'{"value": %d}' % len(calls)
+
+    first = cache.get(('P0', 'data'), 1, build)
+    assert cache.get(('P0', 'data'), 1, build) is first
+    assert cache.get(('P0', 'data'), 2, build).bodies['identity'] == b'{"value": 2}'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.get(('P1', 'data'), 1, build)
+    cache.discard('P0')
+    cache.get(('P0', 'data'), 2, build)
+    assert len(calls) == 4
+    assert gzip.decompress(first.bodies['gzip']) == first.bodies['identity']
+
+
+def test_data_route_encoding_and_etag(portfolio_app, monkeypatch):
+    app_module, client = portfolio_app
+    monkeypatch.setattr(app_module, 'analyzer', analyze(nav_frame(300, seed=7)))
+
+    plain = client.get('/api/data')
+    compressed = client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    # 不同编码的强 ETag 不同，任一编码的 ETag 都可用于条件请求
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    assert client.get('/api/data', headers={'If-None-Match': compressed.headers['ETag']}).status_code == 304
+    assert client.get('/api/data', headers={'Accept-Encoding': 'gzip;q=0'}).headers.get('Content-Encoding') is None
+
+    for path in ('/api/metrics', '/api/summary'):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert client.get(path, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_data_route_validates_max_points(portfolio_app, monkeypatch):
+    app_module, client = portfolio_app
+    monkeypatch.setattr(app_module, 'analyzer', analyze(nav_frame(300, seed=7)))
+    for value in (0, -5, 2):
+        assert client.get(f'/api/data?max_points={value}').status_code == 400
+    payload = client.get('/api/data?max_points=50').get_json()
+    assert 3 <= len(payload['dates']) <= 50
+    assert client.get('/api/data?start=不是日期').status_code == 400
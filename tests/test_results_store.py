@@ -0,0 +1,46 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from results_store import ResultsStore
+from trading_calendar import TradingCalendar
+from helpers import nav_frame, analyze, assert_results_close
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(str(tmp_path / 'results.db'))
+
+
+def test_hit_matches_recompute(store):
+    data = nav_frame(700)
+    first = analyze(data, results_store=store, portfolio_id='P')
+    second = analyze(data, results_store=store, portfolio_id='P')
+    assert store.hits == 1
+    expected = analyze(data)
+    assert_results_close(first.results, expected.results)
+    assert_results_close(second.results, expected.results)
+    pd.testing.assert_frame_equal(second.data, expected.data)
+
+
+def test_append_matches_recompute_and_prunes(store):
+    data = nav_frame(700)
+    for n in range(680, 701, 5):
+        stored = analyze(data.iloc[:n], results_store=store, portfolio_id='P')
+    assert store.appends == 4
+    expected = analyze(data)
+    assert_results_close(stored.results, expected.results)
+    pd.testing.assert_frame_equal(stored.data, expected.data)
+    # 只保留最新输入的指标
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute('SELECT COUNT(DISTINCT content_hash) FROM results').fetchone()[0] == 1
+
+
+def test_calendar_change_recomputes(store):
+    data = nav_frame(700)
+    calendars = [TradingCalendar(pd.bdate_range('2021-01-01', '2023-12-31')),
+                 TradingCalendar(pd.bdate_range('2018-01-01', '2023-12-31').drop(pd.Timestamp('2018-03-01')))]
+    for calendar in calendars:
+        stored = analyze(data, results_store=store, portfolio_id='P', calendar=calendar)
+        assert_results_close(stored.results, analyze(data, calendar=calendar).results)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from compact import CompactSeries
+from rolling_metrics import rolling_std, rolling_min
+from helpers import nav_frame, analyze
+
+
+def test_rolling_route_matches_analyzer(portfolio_app, monkeypatch):
+    app_module, client = portfolio_app
+    analyzer = analyze(nav_frame(300, seed=4))
+    monkeypatch.setattr(app_module, 'analyzer', analyzer)
+
+    response = client.get('/api/rolling?window=20')
+    assert response.status_code == 200
+    payload = response.get_json()
+    rolling = analyzer.rolling_metrics(20)
+    volatility = np.array([np.nan if v is None else v for v in payload['volatility']])
+    np.testing.assert_allclose(volatility, rolling['滚动年化波动率(20日)'] * 100)
+    assert payload['volatility'][:19] == [None] * 19
+    assert payload['dates'][0] == f"{analyzer.data['统计日期'].iloc[0]:%Y-%m-%d}"
+
+    # 按窗口缓存并带 ETag
+    assert client.get('/api/rolling?window=20', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert client.get('/api/rolling?window=30').headers['ETag'] != response.headers['ETag']
+    assert client.get('/api/rolling?window=1').status_code == 400
+
+
+def test_portfolio_rolling_route(portfolio_app):
+    app_module, client = portfolio_app
+    response = client.get('/api/P1/rolling?window=60')
+    assert response.status_code == 200
+    assert len(response.get_json()['dates']) == 300
+    assert client.get('/api/P9/rolling').status_code == 404
+
+
+def test_compact_rolling_payload_does_not_rebuild_frame(portfolio_app, monkeypatch):
+    app_module, _ = portfolio_app
+    analyzer = analyze(nav_frame(200, seed=2), compact=True)
+    expected = app_module.build_rolling_payload(analyzer, 20)
+
+    def fail(self):
+        raise AssertionError('不应展开紧凑数据')
+    monkeypatch.setattr(CompactSeries, 'to_frame', fail)
+    assert app_module.build_rolling_payload(analyzer, 20) == expected
+
+
+def test_rolling_kernels_match_pandas():
+    rng = np.random.default_rng(3)
+    values = rng.normal(0, 0.01, 500)
+    values[rng.random(500) < 0.05] = np.nan
+    series = pd.Series(values)
+    for window in (2, 20, 250):
+        # 窗口未满时为NaN，窗口内有效值不少于2个即计算
+        expected = series.rolling(window, min_periods=2).std()
+        expected[:window - 1] = np.nan
+        np.testing.assert_allclose(rolling_std(values, window), expected, rtol=1e-8, atol=1e-10)
+        np.testing.assert_array_equal(rolling_min(np.nan_to_num(values), window),
+                                      pd.Series(np.nan_to_num(values)).rolling(window).min())
+
+
+def test_rolling_metrics_match_period_metrics():
+    analyzer = analyze(nav_frame(400, seed=6))
+    rolling = analyzer.rolling_metrics(60)
+    data = analyzer.data
+    for end in (59, 200, 399):
+        metrics = analyzer.metrics_between(data['统计日期'].iloc[end - 59], data['统计日期'].iloc[end])
+        np.testing.assert_allclose(rolling['滚动年化波动率(60日)'].iloc[end], metrics['年化波动率'], rtol=1e-9)
+        np.testing.assert_allclose(rolling['滚动夏普比率(60日)'].iloc[end], metrics['夏普比率'], rtol=1e-9)
+        assert rolling['滚动最大回撤(60日)'].iloc[end] == metrics['最大回撤']
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from create_sample_data import generate
+
+
+def _collect(chunk_size, **kwargs):
+    chunks = generate(3, 3000, seed=7, chunk_size=chunk_size, **kwargs)
+    return pd.concat([chunk.assign(组合ID=portfolio_id) for portfolio_id, chunk in chunks], ignore_index=True)
+
+
+def test_generate_independent_of_chunk_size():
+    """相同种子下，分块大小不影响生成结果 (含市场状态切换、暴跌与缺失)"""
+    kwargs = dict(crash_rate=1.0, gap_rate=0.03)
+    expected = _collect(100_000, **kwargs)
+    for chunk_size in (1000, 37):
+        pd.testing.assert_frame_equal(_collect(chunk_size, **kwargs), expected, check_exact=True)
+
+
+def test_generate_seed_reproducible():
+    pd.testing.assert_frame_equal(_collect(500), _collect(500), check_exact=True)
+    assert not _collect(500)['单元资产净值(净价)'].equals(
+        pd.concat([chunk for _, chunk in generate(3, 3000, seed=8)], ignore_index=True)['单元资产净值(净价)'])
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from batch_analyzer import BatchPerformanceAnalyzer
+from trading_calendar import TradingCalendar
+from helpers import nav_frame, analyze, assert_results_close
+
+
+def test_days_per_year_uses_complete_years():
+    # 不足一整年: 使用配置的年交易日数
+    short = TradingCalendar(pd.bdate_range('2024-01-01', '2024-06-30'))
+    assert short.days_per_year is None
+    data = nav_frame(100, start='2024-01-01')
+    assert analyze(data, calendar=short).days_trade == 251
+
+    # 只统计完整年份内的交易日，多出的零头不影响平均值
+    full = pd.bdate_range('2021-01-01', '2023-12-31')
+    assert TradingCalendar(full).days_per_year == len(full) / 3
+    assert TradingCalendar(pd.bdate_range('2021-01-01', '2024-03-31')).days_per_year == len(full) / 3
+
+
+def test_relative_metrics_follow_calendar():
+    calendar = TradingCalendar(pd.bdate_range('2019-01-01', '2024-12-31'))
+    benchmark = nav_frame(1500, seed=99, start='2019-01-01').set_index('统计日期')['单元资产净值(净价)']
+    series = {f'P{i}': nav_frame(800, seed=i, start='2020-06-01', gap_rate=0.05) for i in range(2)}
+    batch = BatchPerformanceAnalyzer(calendar=calendar)
+    batch.load_series(series)
+    batch.set_benchmark(benchmark)
+    batch.calculate_performance_metrics()
+    for portfolio_id, data in series.items():
+        assert_results_close(batch.results[portfolio_id],
+                             analyze(data, calendar=calendar, benchmark=benchmark).results)
+
+
+def test_bootstrap_years_follow_calendar():
+    data = nav_frame(600, seed=5, gap_rate=0.1)
+    calendar = TradingCalendar(pd.bdate_range('2020-01-01', '2024-12-31'))
+    analyzer = analyze(data, calendar=calendar)
+    # 201 次重抽样时 2.5% 与 97.5% 分位恰为顺序统计量，年化收益率与总收益率一一对应
+    intervals = analyzer.bootstrap_intervals(n_resamples=201, seed=1)
+
+    ordinals = calendar.ordinal(data['统计日期'])
+    first = int(np.searchsorted(data['统计日期'], analyzer.results['近一年']['开始日期']))
+    years = (ordinals[-1] + 1 - ordinals[first]) / analyzer.days_trade
+    total, annual = intervals['近一年']['总收益率'], intervals['近一年']['年化收益率']
+    np.testing.assert_allclose((1 + np.array(total)) ** (1 / years) - 1, annual, rtol=1e-12)
@@ -0,0 +1,91 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def _to_days(dates):
+    """单个日期或日期序列 -> datetime64[D]"""
+    if np.isscalar(dates) or isinstance(dates, (pd.Timestamp, np.datetime64)):
+        return np.datetime64(pd.Timestamp(dates).date())
+    return pd.to_datetime(dates).values.astype('datetime64[D]')
+
+
+class TradingCalendar:
+    def __init__(self, days):
+        """
+        交易日历: 交易日按顺序编号 (交易日序号)，各时间段的起止序号按截止日期预先计算并缓存，
+        同一截止日期的所有组合共用，区间查询为整数切片；
+        年化使用日历中完整年份平均每年的交易日数 (days_per_year，日历不足一整年时为 None)
+
+        参数:
+        days: 交易日 (任意顺序，重复会被去除)
+        """
+        self.days = np.unique(_to_days(days))
+        if len(self.days) == 0:
+            raise ValueError("交易日历不能为空")
+        self.days_per_year = self._complete_years_average()
+        # 日历内容的指纹 (结果库以此区分不同日历下的指标)
+        self.fingerprint = hashlib.sha256(self.days.astype('<i8').tobytes()).hexdigest()
+        self._bounds = {}
+
+    def _complete_years_average(self):
+        """
+        日历中完整年份平均每年的交易日数: 从第一个交易日起取整年数，只统计这些整年内的交易日
+        (年末最后几天可能不是交易日，允许差一周)；日历不足一整年时返回 None (由分析器使用配置的年交易日数)
+        """
+        first = pd.Timestamp(self.days[0])
+        last = pd.Timestamp(self.days[-1]) + pd.Timedelta(days=7)
+        full_years = 0
+        while first + pd.DateOffset(years=full_years + 1) <= last:
+            full_years += 1
+        if full_years == 0:
+            return None
+        end = _to_days(first + pd.DateOffset(years=full_years))
+        return int(np.searchsorted(self.days, end)) / full_years
+
+    @classmethod
+    def business_days(cls, start, end, holidays=()):
+        """
+        由 [start, end] 内的工作日 (周一至周五) 去除节假日构建交易日历
+
+        参数:
+        holidays: 节假日列表 (如 create_sample_data.cn_holidays 的结果)
+        """
+        days = np.arange(_to_days(start), _to_days(end) + 1, dtype='datetime64[D]')
+        return cls(days[np.is_busday(days, holidays=np.asarray(holidays, dtype='datetime64[D]'))])
+
+    def __len__(self):
+        return len(self.days)
+
+    def ordinal(self, dates):
+        """日期 -> 交易日序号 (非交易日取其后第一个交易日的序号)"""
+        return np.searchsorted(self.days, _to_days(dates), side='left')
+
+    def contains(self, dates):
+        """日期是否全部为日历中的交易日"""
+        days = _to_days(dates)
+        ordinals = np.minimum(np.searchsorted(self.days, days), len(self.days) - 1)
+        return bool(np.all(self.days[ordinals] == days))
+
+    def period_bounds(self, as_of, periods):
+        """
+        截止日期为 as_of 时各时间段的交易日序号区间 [起始, 结束)，
+        起始为不早于 as_of - delta 的第一个交易日，结束为不晚于 as_of 的最后一个交易日之后
+
+        参数:
+        as_of: 截止日期
+        periods: 时间段名称 -> timedelta
+
+        返回:
+        时间段名称 -> (起始序号, 结束序号)
+        """
+        key = (_to_days(as_of), tuple(periods.items()))
+        bounds = self._bounds.get(key)
+        if bounds is None:
+            as_of = pd.Timestamp(key[0])
+            end = int(np.searchsorted(self.days, key[0], side='right'))
+            bounds = {period_name: (min(int(self.ordinal(as_of - delta)), end), end)
+                      for period_name, delta in periods.items()}
+            self._bounds[key] = bounds
+        return bounds